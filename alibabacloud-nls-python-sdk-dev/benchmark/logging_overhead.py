@@ -0,0 +1,82 @@
+# Copyright (c) Alibaba, Inc. and its affiliates.
+
+"""
+Compare the per-frame logging cost of the old and the current NlsCore
+callbacks with tracing off.
+
+Usage: python benchmark/logging_overhead.py [--number N]
+"""
+
+import argparse
+import json
+import logging as std_logging
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nls
+from nls import core
+from nls import websocket
+
+_logger = std_logging.getLogger('nls')
+
+
+class _Callbacks:
+    """stands in for NlsCore, callbacks do nothing"""
+
+    def _NlsCore__issue_callback(self, which, exargs=[]):
+        pass
+
+
+def old_core_on_msg(ws, message, args):
+    # before: message formatted eagerly, isEnabledForDebug was broken
+    _logger.debug('core_on_msg:{}'.format(message))
+    if not args:
+        _logger.error('callback core_on_msg with null args')
+        return
+    nls = args[0]
+    nls._NlsCore__issue_callback('on_message', [message])
+
+
+def old_core_on_data(ws, data, opcode, flag, args):
+    _logger.debug('core_on_data opcode={}'.format(opcode))
+    if not args:
+        _logger.error('callback core_on_data with null args')
+        return
+    nls = args[0]
+    nls._NlsCore__issue_callback('on_data', [data, opcode, flag])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=200000,
+                        help='callback invocations per measurement')
+    args = parser.parse_args(argv)
+
+    nls.enableTrace(False)
+    callback_args = [_Callbacks()]
+    message = json.dumps({
+        'header': {'namespace': 'SpeechTranscriber', 'name': 'TranscriptionResultChanged',
+                   'status': 20000000, 'message_id': 'a' * 32, 'task_id': 'b' * 32},
+        'payload': {'index': 1, 'time': 1830, 'result': '请介绍一下你最近做的项目', 'confidence': 0.9}
+    }, ensure_ascii=False)
+    audio = b'\0' * 3200
+    cases = [
+        ('on_msg', lambda: old_core_on_msg(None, message, callback_args),
+         lambda: core.core_on_msg(None, message, callback_args)),
+        ('on_data', lambda: old_core_on_data(None, audio, websocket.ABNF.OPCODE_BINARY, True, callback_args),
+         lambda: core.core_on_data(None, audio, websocket.ABNF.OPCODE_BINARY, True, callback_args)),
+    ]
+    print('tracing off, {} calls each'.format(args.number))
+    print('{:<10}{:>14}{:>14}{:>10}'.format('callback', 'old ns/call', 'new ns/call', 'speedup'))
+    for name, old, new in cases:
+        old_time = min(timeit.repeat(old, number=args.number, repeat=5)) / args.number
+        new_time = min(timeit.repeat(new, number=args.number, repeat=5)) / args.number
+        print('{:<10}{:>14.0f}{:>14.0f}{:>9.1f}x'.format(
+            name, old_time * 1e9, new_time * 1e9, old_time / new_time))
+
+
+if __name__ == '__main__':
+    main()
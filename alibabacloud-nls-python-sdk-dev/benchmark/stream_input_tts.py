@@ -0,0 +1,118 @@
+# Copyright (c) Alibaba, Inc. and its affiliates.
+
+"""
+Measure the cost of encoding RunSynthesis commands, as sent by
+sendStreamInputTts for every text chunk, with the old per-call dict
+encoding and the current per-session template, and optionally stream
+chunks at a high rate through NlsStreamInputTtsSynthesizer to a gateway.
+
+Usage:
+    python benchmark/stream_input_tts.py [--number N]
+    python benchmark/stream_input_tts.py --url ws://127.0.0.1:8766/ws/v1 --chunks 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import timeit
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nls
+from nls.stream_input_tts import NlsStreamInputTtsRequest
+
+_NAMESPACE = 'FlowingSpeechSynthesizer'
+
+
+def old_send_cmd(task_id, appkey, text):
+    # before: the whole command dict was rebuilt and encoded for every chunk
+    cmd = {
+        'header': {
+            'message_id': uuid.uuid4().hex,
+            'task_id': task_id,
+            'name': 'RunSynthesis',
+            'namespace': _NAMESPACE,
+            'appkey': appkey,
+        },
+        'payload': {'text': text},
+    }
+    return json.dumps(cmd)
+
+
+def check_equivalent(request, text):
+    """the template output must parse to the same command as before"""
+    old = json.loads(old_send_cmd(request.task_id, request.appkey, text))
+    new = json.loads(request.getSendCMD(text))
+    old['header'].pop('message_id')
+    new['header'].pop('message_id')
+    return old == new
+
+
+def encode(args):
+    request = NlsStreamInputTtsRequest(uuid.uuid4().hex, uuid.uuid4().hex, 'appkey')
+    texts = ['这是第{}段需要合成的文本，'.format(i) for i in range(100)]
+    if not all(check_equivalent(request, text) for text in texts + ['"quoted"\n\\']):
+        print('template output differs from the old encoding')
+        return 1
+    state = {'i': 0}
+
+    def next_text():
+        state['i'] += 1
+        return texts[state['i'] % len(texts)]
+
+    old = min(timeit.repeat(lambda: old_send_cmd(request.task_id, request.appkey, next_text()),
+                            number=args.number, repeat=5)) / args.number
+    new = min(timeit.repeat(lambda: request.getSendCMD(next_text()),
+                            number=args.number, repeat=5)) / args.number
+    print('RunSynthesis encoding, {} calls each'.format(args.number))
+    print('old {:.2f} us/call, new {:.2f} us/call, {:.1f}x'.format(old * 1e6, new * 1e6, old / new))
+    return 0
+
+
+def stream(args):
+    completed = threading.Event()
+    received = {'bytes': 0}
+
+    def on_data(data, *args):
+        received['bytes'] += len(data)
+
+    def on_completed(message, *args):
+        completed.set()
+
+    synthesizer = nls.NlsStreamInputTtsSynthesizer(
+        url=args.url, token='token', appkey='appkey',
+        on_data=on_data, on_completed=on_completed)
+    synthesizer.startStreamInputTts(sample_rate=16000)
+    start = time.perf_counter()
+    for i in range(args.chunks):
+        synthesizer.sendStreamInputTts('第{}段，'.format(i))
+    send_time = time.perf_counter() - start
+    synthesizer.stopStreamInputTts()
+    total = time.perf_counter() - start
+    print('{} chunks: sendStreamInputTts {:.1f} us/call, {:.0f} chunks/s, '
+          'completed in {:.2f}s, {} audio bytes'.format(
+              args.chunks, send_time / args.chunks * 1e6, args.chunks / send_time,
+              total, received['bytes']))
+    return 0 if completed.is_set() else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=100000,
+                        help='encodings per measurement')
+    parser.add_argument('--url', help='gateway to stream chunks to, skipped if empty')
+    parser.add_argument('--chunks', type=int, default=2000,
+                        help='text chunks sent to the gateway')
+    args = parser.parse_args(argv)
+    result = encode(args)
+    if args.url:
+        result = result or stream(args)
+    return result
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -19,7 +19,8 @@ __FORMAT__ = '%(asctime)s - %(levelname)s - %(message)s'
 #__all__ = ['NlsCore']
 
 def core_on_msg(ws, message, args):
-    logging.debug('core_on_msg:{}'.format(message))
+    if logging.isEnabledForDebug():
+        logging.debug('core_on_msg:%s', message)
     if not args:
         logging.error('callback core_on_msg with null args')
         return
@@ -27,7 +28,7 @@ def core_on_msg(ws, message, args):
     nls._NlsCore__issue_callback('on_message', [message])
 
 def core_on_error(ws, message, args):
-    logging.debug('core_on_error:{}'.format(message))
+    logging.debug('core_on_error:%s', message)
     if not args:
         logging.error('callback core_on_error with null args')
         return
@@ -43,7 +44,7 @@ def core_on_close(ws, close_status_code, close_msg, args):
     nls._NlsCore__issue_callback('on_close')
 
 def core_on_open(ws, args):
-    logging.debug('core_on_open:{}'.format(args))
+    logging.debug('core_on_open:%s', args)
     if not args:
         logging.debug('callback with null args')
         ws.close()
@@ -56,7 +57,8 @@ def core_on_open(ws, args):
     nls._NlsCore__issue_callback('on_open')
 
 def core_on_data(ws, data, opcode, flag, args):
-    logging.debug('core_on_data opcode={}'.format(opcode))
+    if logging.isEnabledForDebug():
+        logging.debug('core_on_data opcode=%s', opcode)
     if not args:
         logging.error('callback core_on_data with null args')
         return
@@ -97,10 +99,9 @@ class NlsCore:
             self.__callbacks['on_data'] = on_data
         if not on_open and not on_message and not on_close and not on_error:
             raise InvalidParameter('Must provide at least one callback')
-        logging.debug('callback args:{}'.format(callback_args))
+        logging.debug('callback args:%s', callback_args)
         self.__callback_args = callback_args
         self.__header = __HEADER__ + ['X-NLS-Token: {}'.format(self.__token)]
-        websocket.enableTrace(True)
         self.__ws = websocket.WebSocketApp(self.__url,
                                            self.__header,
                                            on_message=core_on_msg,
@@ -135,7 +136,7 @@ class NlsCore:
         if which not in self.__callbacks:
             logging.error('no such callback:{}'.format(which))
             return
-        if which is 'on_close':
+        if which == 'on_close':
             with self.__cond:
                 self.__connection_status = NlsConnectionStatus.Disconnected
                 self.__cond.notify()
@@ -153,7 +154,8 @@ class NlsCore:
             if binary:
                 self.__ws.send(msg, opcode=websocket.ABNF.OPCODE_BINARY)
             else:
-                logging.debug('send {}'.format(msg))
+                if logging.isEnabledForDebug():
+                    logging.debug('send %s', msg)
                 self.__ws.send(msg)
     
     def shutdown(self):
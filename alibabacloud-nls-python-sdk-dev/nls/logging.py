@@ -1,6 +1,9 @@
 # Copyright (c) Alibaba, Inc. and its affiliates.
 
 import logging
+import threading
+
+from . import websocket
 
 _logger = logging.getLogger('nls')
 
@@ -13,28 +16,57 @@ except ImportError:
 
 _logger.addHandler(NullHandler())
 _traceEnabled = False
-__LOG_FORMAT__ = '%(asctime)s - %(levelname)s - %(message)s'
+_traceHandler = None
+_handlerLock = threading.Lock()
+__LOG_FORMAT__ = '%(asctime)s - %(levelname)s - %(threadName)s - %(message)s'
 
-__all__=['enableTrace', 'dump', 'error', 'warning', 'debug', 'trace',
+__all__=['enableTrace', 'setLevel', 'dump', 'error', 'warning', 'debug', 'trace',
         'isEnabledForError', 'isEnabledForDebug', 'isEnabledForTrace']
 
-def enableTrace(traceable, handler=logging.StreamHandler()):
+def enableTrace(traceable, handler=None, level=logging.DEBUG,
+                websocket_trace=False):
     """
     enable log print
 
+    Calling this repeatedly never stacks handlers: the handler installed by
+    the previous call is replaced, and disabling tracing removes it.
+
     Parameters
     ----------
     traceable: bool
         whether enable log print, default log level is logging.DEBUG
     handler: Handler object
         handle how to print out log, default to stdio
+    level: int
+        log level used while tracing is enabled
+    websocket_trace: bool
+        whether also enable trace of the underlying websocket library
     """
-    global _traceEnabled
-    _traceEnabled = traceable
-    if traceable:
-        _logger.addHandler(handler)
-        _logger.setLevel(logging.DEBUG)
-        handler.setFormatter(logging.Formatter(__LOG_FORMAT__))
+    global _traceEnabled, _traceHandler
+    with _handlerLock:
+        _traceEnabled = traceable
+        if traceable:
+            if handler is None:
+                handler = _traceHandler or logging.StreamHandler()
+            if handler is not _traceHandler:
+                if _traceHandler is not None:
+                    _logger.removeHandler(_traceHandler)
+                handler.setFormatter(logging.Formatter(__LOG_FORMAT__))
+                _logger.addHandler(handler)
+                _traceHandler = handler
+            _logger.setLevel(level)
+        else:
+            if _traceHandler is not None:
+                _logger.removeHandler(_traceHandler)
+                _traceHandler = None
+            _logger.setLevel(logging.NOTSET)
+    websocket.enableTrace(traceable and websocket_trace, handler)
+
+def setLevel(level):
+    """
+    set log level of sdk logger without touching handlers
+    """
+    _logger.setLevel(level)
 
 def dump(title, message):
     if _traceEnabled:
@@ -42,24 +74,27 @@ def dump(title, message):
         _logger.debug(message)
         _logger.debug('########################################')
 
-def error(msg):
-    _logger.error(msg)
+def error(msg, *args):
+    _logger.error(msg, *args)
 
-def warning(msg):
-    _logger.warning(msg)
+def warning(msg, *args):
+    _logger.warning(msg, *args)
 
-def debug(msg):
-    _logger.debug(msg)
+def debug(msg, *args):
+    """
+    log with lazy %-style args, so nothing is formatted when debug is off
+    """
+    _logger.debug(msg, *args)
 
-def trace(msg):
+def trace(msg, *args):
     if _traceEnabled:
-        _logger.debug(msg)
+        _logger.debug(msg, *args)
 
 def isEnabledForError():
     return _logger.isEnabledFor(logging.ERROR)
 
 def isEnabledForDebug():
-    return _logger.isEnabledFor(logging.Debug)
+    return _logger.isEnabledFor(logging.DEBUG)
 
 def isEnabledForTrace():
     return _traceEnabled
@@ -7,7 +7,7 @@ import threading
 
 from nls.core import NlsCore
 from . import logging
-from . import util
+from .command import NlsCommandTemplate
 from nls.exception import (StartTimeoutException,
                         StopTimeoutException,
                         InvalidParameter)
@@ -114,7 +114,7 @@ class NlsRealtimeMeeting:
         self.__on_close = on_close
 
     def __handle_message(self, message):
-        logging.debug('__handle_message {}'.format(message))
+        logging.debug('__handle_message %s', message)
         try:
             __result = json.loads(message)
             if __result['header']['name'] in self.__response_handler__:
@@ -133,11 +133,11 @@ class NlsRealtimeMeeting:
         logging.debug('__tr_core_on_open')
 
     def __tr_core_on_msg(self, msg, *args):
-        logging.debug('__tr_core_on_msg:msg={} args={}'.format(msg, args))
+        logging.debug('__tr_core_on_msg:msg=%s args=%s', msg, args)
         self.__handle_message(msg)
 
     def __tr_core_on_error(self, msg, *args):
-        logging.debug('__tr_core_on_error:msg={} args={}'.format(msg, args))
+        logging.debug('__tr_core_on_error:msg=%s args=%s', msg, args)
         with self.__start_cond:
             self.__start_flag = False
             self.__start_cond.notify()
@@ -226,27 +226,21 @@ class NlsRealtimeMeeting:
             on_error=self.__tr_core_on_error,
             callback_args=[])
 
-        __id4 = uuid.uuid4().hex
         self.__task_id = uuid.uuid4().hex
-        __header = {
-            'message_id': __id4,
-            'task_id': self.__task_id,
-            'namespace': __REALTIME_MEETING_NAMESPACE__,
-            'name': __REALTIME_MEETING_REQUEST_CMD__['start'],
-            'appkey': 'default'
-        }
+        self.__stop_cmd = NlsCommandTemplate(
+            __REALTIME_MEETING_NAMESPACE__,
+            __REALTIME_MEETING_REQUEST_CMD__['stop'],
+            self.__task_id, 'default')
         __payload = {
         }
 
         if ex:
             __payload.update(ex)
 
-        __msg = {
-            'header': __header,
-            'payload': __payload,
-            'context': util.GetDefaultContext()
-        }
-        __jmsg = json.dumps(__msg)
+        __jmsg = NlsCommandTemplate(
+            __REALTIME_MEETING_NAMESPACE__,
+            __REALTIME_MEETING_REQUEST_CMD__['start'],
+            self.__task_id, 'default', payload=__payload).render()
         with self.__start_cond:
             if self.__start_flag:
                 logging.debug('already start...')
@@ -267,19 +261,7 @@ class NlsRealtimeMeeting:
         timeout: int
             timeout for waiting completed message from cloud
         """
-        __id4 = uuid.uuid4().hex
-        __header = {
-            'message_id': __id4,
-            'task_id': self.__task_id,
-            'namespace': __REALTIME_MEETING_NAMESPACE__,
-            'name': __REALTIME_MEETING_REQUEST_CMD__['stop'],
-            'appkey': 'default'
-        }
-        __msg = {
-            'header': __header,
-            'context': util.GetDefaultContext()
-        }
-        __jmsg = json.dumps(__msg)
+        __jmsg = self.__stop_cmd.render()
         with self.__start_cond:
             if not self.__start_flag:
                 logging.debug('not start yet...')
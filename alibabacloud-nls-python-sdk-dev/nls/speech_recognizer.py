@@ -8,7 +8,7 @@ import threading
 
 from nls.core import NlsCore
 from . import logging
-from . import util
+from .command import NlsCommandTemplate
 from .exception import (StartTimeoutException,
                         StopTimeoutException,
                         NotStartException,
@@ -122,11 +122,11 @@ class NlsSpeechRecognizer:
         logging.debug('__sr_core_on_open')
 
     def __sr_core_on_msg(self, msg, *args):
-        logging.debug('__sr_core_on_msg:msg={} args={}'.format(msg, args))
+        logging.debug('__sr_core_on_msg:msg=%s args=%s', msg, args)
         self.__handle_message(msg)
 
     def __sr_core_on_error(self, msg, *args):
-        logging.debug('__sr_core_on_error:msg={} args={}'.format(msg, args))
+        logging.debug('__sr_core_on_error:msg=%s args=%s', msg, args)
 
     def __sr_core_on_close(self):
         logging.debug('__sr_core_on_close')
@@ -215,15 +215,11 @@ class NlsSpeechRecognizer:
         if aformat not in self.__allow_aformat:
             raise InvalidParameter(f'Format {aformat} not support')
 
-        __id4 = uuid.uuid4().hex
         self.__task_id = uuid.uuid4().hex
-        __header = {
-            'message_id': __id4,
-            'task_id': self.__task_id,
-            'namespace': __SPEECH_RECOGNIZER_NAMESPACE__,
-            'name': __SPEECH_RECOGNIZER_REQUEST_CMD__['start'],
-            'appkey': self.__appkey
-        }
+        self.__stop_cmd = NlsCommandTemplate(
+            __SPEECH_RECOGNIZER_NAMESPACE__,
+            __SPEECH_RECOGNIZER_REQUEST_CMD__['stop'],
+            self.__task_id, self.__appkey)
         __payload = {
             'format': aformat,
             'sample_rate': sample_rate,
@@ -235,12 +231,10 @@ class NlsSpeechRecognizer:
         if ex:
             __payload.update(ex)
 
-        __msg = {
-            'header': __header,
-            'payload': __payload,
-            'context': util.GetDefaultContext()
-        }
-        __jmsg = json.dumps(__msg)
+        __jmsg = NlsCommandTemplate(
+            __SPEECH_RECOGNIZER_NAMESPACE__,
+            __SPEECH_RECOGNIZER_REQUEST_CMD__['start'],
+            self.__task_id, self.__appkey, payload=__payload).render()
         with self.__start_cond:
             if self.__start_flag:
                 logging.debug('already start...')
@@ -261,19 +255,7 @@ class NlsSpeechRecognizer:
         timeout: int
             timeout for waiting completed message from cloud
         """
-        __id4 = uuid.uuid4().hex
-        __header = {
-            'message_id': __id4,
-            'task_id': self.__task_id,
-            'namespace': __SPEECH_RECOGNIZER_NAMESPACE__,
-            'name': __SPEECH_RECOGNIZER_REQUEST_CMD__['stop'],
-            'appkey': self.__appkey
-        }
-        __msg = {
-            'header': __header,
-            'context': util.GetDefaultContext()    
-        }
-        __jmsg = json.dumps(__msg)
+        __jmsg = self.__stop_cmd.render()
         with self.__start_cond:
             if not self.__start_flag:
                 logging.debug('not start yet...')
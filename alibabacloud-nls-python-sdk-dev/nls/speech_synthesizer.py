@@ -8,7 +8,7 @@ import threading
 
 from nls.core import NlsCore
 from . import logging
-from . import util
+from .command import NlsCommandTemplate
 from .exception import (StartTimeoutException,
                         CompleteTimeoutException,
                         InvalidParameter)
@@ -137,11 +137,11 @@ class NlsSpeechSynthesizer:
             self.__on_data(data, *self.__callback_args)
 
     def __syn_core_on_msg(self, msg, *args):
-        logging.debug('__syn_core_on_msg:msg={} args={}'.format(msg, args))
+        logging.debug('__syn_core_on_msg:msg=%s args=%s', msg, args)
         self.__handle_message(msg)
 
     def __syn_core_on_error(self, msg, *args):
-        logging.debug('__sr_core_on_error:msg={} args={}'.format(msg, args))
+        logging.debug('__sr_core_on_error:msg=%s args=%s', msg, args)
 
     def __syn_core_on_close(self):
         logging.debug('__sr_core_on_close')
@@ -239,18 +239,10 @@ class NlsSpeechSynthesizer:
         if pitch_rate < -500 or pitch_rate > 500:
             raise InvalidParameter('pitch rate {} not support'.format(pitch_rate))
 
-        __id4 = uuid.uuid4().hex
         self.__task_id = uuid.uuid4().hex
         __namespace = __SPEECH_SYNTHESIZER_NAMESPACE__
         if self.__long_tts:
             __namespace = __SPEECH_LONG_SYNTHESIZER_NAMESPACE__
-        __header = {
-            'message_id': __id4,
-            'task_id': self.__task_id,
-            'namespace': __namespace,
-            'name': __SPEECH_SYNTHESIZER_REQUEST_CMD__['start'],
-            'appkey': self.__appkey
-        }
         __payload = {
             'text': text,
             'voice': voice,
@@ -262,12 +254,10 @@ class NlsSpeechSynthesizer:
         }
         if ex:
             __payload.update(ex)
-        __msg = {
-            'header': __header,
-            'payload': __payload,
-            'context': util.GetDefaultContext()    
-        }
-        __jmsg = json.dumps(__msg)
+        __jmsg = NlsCommandTemplate(
+            __namespace,
+            __SPEECH_SYNTHESIZER_REQUEST_CMD__['start'],
+            self.__task_id, self.__appkey, payload=__payload).render()
         with self.__start_cond:
             if self.__start_flag:
                 logging.debug('already start...')
@@ -7,7 +7,7 @@ import threading
 
 from nls.core import NlsCore
 from . import logging
-from . import util
+from .command import NlsCommandTemplate
 from nls.exception import (StartTimeoutException,
                         StopTimeoutException,
                         NotStartException,
@@ -139,11 +139,11 @@ class NlsSpeechTranscriber:
         logging.debug('__tr_core_on_open')
 
     def __tr_core_on_msg(self, msg, *args):
-        logging.debug('__tr_core_on_msg:msg={} args={}'.format(msg, args))
+        logging.debug('__tr_core_on_msg:msg=%s args=%s', msg, args)
         self.__handle_message(msg)
 
     def __tr_core_on_error(self, msg, *args):
-        logging.debug('__tr_core_on_error:msg={} args={}'.format(msg, args))
+        logging.debug('__tr_core_on_error:msg=%s args=%s', msg, args)
 
     def __tr_core_on_close(self):
         logging.debug('__tr_core_on_close')
@@ -241,15 +241,16 @@ class NlsSpeechTranscriber:
             raise ValueError('not support channel: {}'.format(ch))
         if aformat not in self.__allow_aformat:
             raise ValueError('format {} not support'.format(aformat))
-        __id4 = uuid.uuid4().hex
         self.__task_id = uuid.uuid4().hex
-        __header = {
-            'message_id': __id4,
-            'task_id': self.__task_id,
-            'namespace': __SPEECH_TRANSCRIBER_NAMESPACE__,
-            'name': __SPEECH_TRANSCRIBER_REQUEST_CMD__['start'],
-            'appkey': self.__appkey
-        }
+        self.__stop_cmd = NlsCommandTemplate(
+            __SPEECH_TRANSCRIBER_NAMESPACE__,
+            __SPEECH_TRANSCRIBER_REQUEST_CMD__['stop'],
+            self.__task_id, self.__appkey)
+        # control may be sent many times per session, only payload changes
+        self.__ctrl_cmd = NlsCommandTemplate(
+            __SPEECH_TRANSCRIBER_NAMESPACE__,
+            __SPEECH_TRANSCRIBER_REQUEST_CMD__['control'],
+            self.__task_id, self.__appkey)
         __payload = {
             'format': aformat,
             'sample_rate': sample_rate,
@@ -261,12 +262,10 @@ class NlsSpeechTranscriber:
         if ex:
             __payload.update(ex)
 
-        __msg = {
-            'header': __header,
-            'payload': __payload,
-            'context': util.GetDefaultContext()
-        }
-        __jmsg = json.dumps(__msg)
+        __jmsg = NlsCommandTemplate(
+            __SPEECH_TRANSCRIBER_NAMESPACE__,
+            __SPEECH_TRANSCRIBER_REQUEST_CMD__['start'],
+            self.__task_id, self.__appkey, payload=__payload).render()
         with self.__start_cond:
             if self.__start_flag:
                 logging.debug('already start...')
@@ -287,19 +286,7 @@ class NlsSpeechTranscriber:
         timeout: int
             timeout for waiting completed message from cloud
         """
-        __id4 = uuid.uuid4().hex
-        __header = {
-            'message_id': __id4,
-            'task_id': self.__task_id,
-            'namespace': __SPEECH_TRANSCRIBER_NAMESPACE__,
-            'name': __SPEECH_TRANSCRIBER_REQUEST_CMD__['stop'],
-            'appkey': self.__appkey
-        }
-        __msg = {
-            'header': __header,
-            'context': util.GetDefaultContext()
-        }
-        __jmsg = json.dumps(__msg)
+        __jmsg = self.__stop_cmd.render()
         with self.__start_cond:
             if not self.__start_flag:
                 logging.debug('not start yet...')
@@ -323,26 +310,11 @@ class NlsSpeechTranscriber:
         """
         if not kwargs:
             raise InvalidParameter('Empty kwargs not allowed!')
-        __id4 = uuid.uuid4().hex
-        __header = {
-            'message_id': __id4,
-            'task_id': self.__task_id,
-            'namespace': __SPEECH_TRANSCRIBER_NAMESPACE__,
-            'name': __SPEECH_TRANSCRIBER_REQUEST_CMD__['control'],
-            'appkey': self.__appkey
-        }
-        payload = {}
-        payload.update(kwargs)
-        __msg = {
-            'header': __header,
-            'payload': payload,
-            'context': util.GetDefaultContext()
-        }
-        __jmsg = json.dumps(__msg)
         with self.__start_cond:
             if not self.__start_flag:
                 logging.debug('not start yet...')
                 return
+            __jmsg = self.__ctrl_cmd.render_payload(kwargs)
             self.__nls.send(__jmsg, False)
 
     def shutdown(self):
@@ -8,6 +8,7 @@ from enum import IntEnum
 
 from nls.core import NlsCore
 from . import logging
+from .command import NlsCommandTemplate
 from .exception import StartTimeoutException, WrongStateException, InvalidParameter
 
 __STREAM_INPUT_TTS_NAMESPACE__ = "FlowingSpeechSynthesizer"
@@ -36,6 +37,15 @@ class NlsStreamInputTtsRequest:
         self.task_id = task_id
         self.appkey = appkey
         self.session_id = session_id
+        # RunSynthesis is sent for every text chunk, only text changes
+        self.__send_cmd = NlsCommandTemplate(
+            __STREAM_INPUT_TTS_NAMESPACE__,
+            __STREAM_INPUT_TTS_REQUEST_CMD__["send"],
+            self.task_id, self.appkey, field="text", context=False)
+        self.__stop_cmd = NlsCommandTemplate(
+            __STREAM_INPUT_TTS_NAMESPACE__,
+            __STREAM_INPUT_TTS_REQUEST_CMD__["stop"],
+            self.task_id, self.appkey, context=False)
 
     def getStartCMD(self, voice, format, sample_rate, volumn, speech_rate, pitch_rate, ex):
         self.voice = voice
@@ -44,52 +54,27 @@ class NlsStreamInputTtsRequest:
         self.volumn = volumn
         self.speech_rate = speech_rate
         self.pitch_rate = pitch_rate
-        cmd = {
-            "header": {
-                "message_id": uuid.uuid4().hex,
-                "task_id": self.task_id,
-                "name": __STREAM_INPUT_TTS_REQUEST_CMD__["start"],
-                "namespace": __STREAM_INPUT_TTS_NAMESPACE__,
-                "appkey": self.appkey,
-            },
-            "payload": {
-                "session_id": self.session_id,
-                "voice": self.voice,
-                "format": self.format,
-                "sample_rate": self.sample_rate,
-                "volumn": self.volumn,
-                "speech_rate": self.speech_rate,
-                "pitch_rate": self.pitch_rate,
-            },
+        payload = {
+            "session_id": self.session_id,
+            "voice": self.voice,
+            "format": self.format,
+            "sample_rate": self.sample_rate,
+            "volumn": self.volumn,
+            "speech_rate": self.speech_rate,
+            "pitch_rate": self.pitch_rate,
         }
         if ex:
-            cmd["payload"].update(ex)        
-        return json.dumps(cmd)
+            payload.update(ex)
+        return NlsCommandTemplate(
+            __STREAM_INPUT_TTS_NAMESPACE__,
+            __STREAM_INPUT_TTS_REQUEST_CMD__["start"],
+            self.task_id, self.appkey, payload=payload, context=False).render()
 
     def getSendCMD(self, text):
-        cmd = {
-            "header": {
-                "message_id": uuid.uuid4().hex,
-                "task_id": self.task_id,
-                "name": __STREAM_INPUT_TTS_REQUEST_CMD__["send"],
-                "namespace": __STREAM_INPUT_TTS_NAMESPACE__,
-                "appkey": self.appkey,
-            },
-            "payload": {"text": text},
-        }
-        return json.dumps(cmd)
+        return self.__send_cmd.render(text)
 
     def getStopCMD(self):
-        cmd = {
-            "header": {
-                "message_id": uuid.uuid4().hex,
-                "task_id": self.task_id,
-                "name": __STREAM_INPUT_TTS_REQUEST_CMD__["stop"],
-                "namespace": __STREAM_INPUT_TTS_NAMESPACE__,
-                "appkey": self.appkey,
-            },
-        }
-        return json.dumps(cmd)
+        return self.__stop_cmd.render()
 
 
 class NlsStreamInputTtsStatus(IntEnum):
@@ -258,11 +243,11 @@ class NlsStreamInputTtsSynthesizer:
             self.__on_data(data, *self.__callback_args)
 
     def __syn_core_on_msg(self, msg, *args):
-        logging.debug("__syn_core_on_msg:msg={} args={}".format(msg, args))
+        logging.debug("__syn_core_on_msg:msg=%s args=%s", msg, args)
         self.__handle_message(msg)
 
     def __syn_core_on_error(self, msg, *args):
-        logging.debug("__sr_core_on_error:msg={} args={}".format(msg, args))
+        logging.debug("__sr_core_on_error:msg=%s args=%s", msg, args)
 
     def __syn_core_on_close(self):
         logging.debug("__sr_core_on_close")
@@ -370,11 +355,11 @@ class NlsStreamInputTtsSynthesizer:
         
         last_state = self.state.get()
         if last_state != NlsStreamInputTtsStatus.Begin:
-            logging.debug("start with wrong state {}".format(last_state))
+            logging.debug("start with wrong state %s", last_state)
             self.state.set(NlsStreamInputTtsStatus.Failed)
             raise WrongStateException("start with wrong state {}".format(last_state))
 
-        logging.debug("start with request: {}".format(request))
+        logging.debug("start with request: %s", request)
         self.__nls.start(request, ping_interval=0, ping_timeout=None)
         self.state.set(NlsStreamInputTtsStatus.Start)
         if not self.start_sended.wait(timeout=10):
@@ -382,7 +367,7 @@ class NlsStreamInputTtsSynthesizer:
             raise StartTimeoutException(f"Waiting Connection before Start over 10s")
 
         if last_state != NlsStreamInputTtsStatus.Begin:
-            logging.debug("start with wrong state {}".format(last_state))
+            logging.debug("start with wrong state %s", last_state)
             self.state.set(NlsStreamInputTtsStatus.Failed)
             raise WrongStateException("start with wrong state {}".format(last_state))
 
@@ -403,12 +388,12 @@ class NlsStreamInputTtsSynthesizer:
         """
         last_state = self.state.get()
         if last_state != NlsStreamInputTtsStatus.Started:
-            logging.debug("send with wrong state {}".format(last_state))
+            logging.debug("send with wrong state %s", last_state)
             self.state.set(NlsStreamInputTtsStatus.Failed)
             raise WrongStateException("send with wrong state {}".format(last_state))
 
         request = self.request.getSendCMD(text)
-        logging.debug("send with request: {}".format(request))
+        logging.debug("send with request: %s", request)
         self.__nls.send(request, None)
 
     def stopStreamInputTts(self):
@@ -418,13 +403,13 @@ class NlsStreamInputTtsSynthesizer:
 
         last_state = self.state.get()
         if last_state != NlsStreamInputTtsStatus.Started:
-            logging.debug("send with wrong state {}".format(last_state))
+            logging.debug("send with wrong state %s", last_state)
             self.state.set(NlsStreamInputTtsStatus.Failed)
             raise WrongStateException("stop with wrong state {}".format(last_state))
 
 
         request = self.request.getStopCMD()
-        logging.debug("stop with request: {}".format(request))
+        logging.debug("stop with request: %s", request)
         self.__nls.send(request, None)
         self.state.set(NlsStreamInputTtsStatus.WaitingComplete)
         self.complete_event.wait()
@@ -1,8 +1,9 @@
 # Copyright (c) Alibaba, Inc. and its affiliates.
 
+import mmap
 from struct import *
 
-__all__=['wav2pcm', 'GetDefaultContext']
+__all__=['wav2pcm', 'GetDefaultContext', 'WavFile']
 
 def GetDefaultContext():
     """
@@ -17,6 +18,115 @@ def GetDefaultContext():
     }
 
 
+class WavFile:
+    """
+    Memory-mapped WAV reader which walks the RIFF chunk list instead of
+    assuming a fixed 44-byte header, so files carrying LIST/fact/bext chunks
+    or a WAVE_FORMAT_EXTENSIBLE fmt chunk are handled.
+
+    Usage:
+        with WavFile('a.wav') as wav:
+            for chunk in wav.chunks(3200):
+                ...
+    """
+
+    def __init__(self, wavfile):
+        self.path = wavfile
+        self.__file = open(wavfile, 'rb')
+        try:
+            self.__map = mmap.mmap(self.__file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        except ValueError:
+            self.__file.close()
+            raise ValueError('empty file: {}'.format(wavfile))
+        try:
+            self.__parse()
+        except Exception:
+            self.close()
+            raise
+
+    def __parse(self):
+        buf = self.__map
+        if len(buf) < 12 or buf[0:4] != b'RIFF' or buf[8:12] != b'WAVE':
+            raise ValueError('not a wav!')
+        self.audio_format = None
+        self.data_offset = None
+        self.data_size = 0
+        pos = 12
+        end = len(buf)
+        while pos + 8 <= end:
+            _id = buf[pos:pos + 4]
+            _size, = unpack_from('<I', buf, pos + 4)
+            body = pos + 8
+            if _id == b'fmt ':
+                (self.audio_format, self.channels, self.sample_rate,
+                 self.byte_rate, self.block_align,
+                 self.bits_per_sample) = unpack_from('<HHIIHH', buf, body)
+                if self.audio_format == 0xFFFE and _size >= 26:
+                    # WAVE_FORMAT_EXTENSIBLE, real format is in SubFormat
+                    self.audio_format, = unpack_from('<H', buf, body + 24)
+            elif _id == b'data':
+                self.data_offset = body
+                # streamed wavs may carry 0 or 0xFFFFFFFF as data size
+                self.data_size = min(_size, end - body) if _size else end - body
+                break
+            # chunks are word aligned
+            pos = body + _size + (_size & 1)
+        if self.audio_format is None:
+            raise ValueError('wav without fmt chunk!')
+        if self.data_offset is None:
+            raise ValueError('wav without data chunk!')
+
+    @property
+    def data(self):
+        """
+        memoryview of the sample data, no copy is made
+        """
+        return memoryview(self.__map)[
+            self.data_offset:self.data_offset + self.data_size]
+
+    @property
+    def duration(self):
+        """
+        audio duration in seconds
+        """
+        if not self.byte_rate:
+            return 0.0
+        return self.data_size / self.byte_rate
+
+    def chunks(self, size):
+        """
+        Yield sample data in pieces of at most size bytes
+
+        Parameters
+        ----------
+        size: int
+            bytes per piece
+        """
+        data = self.data
+        try:
+            for i in range(0, len(data), size):
+                yield data[i:i + size]
+        finally:
+            data.release()
+
+    def close(self):
+        if self.__map is not None:
+            try:
+                self.__map.close()
+            except BufferError:
+                # caller still holds views, mapping is released with them
+                pass
+            self.__map = None
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
 def wav2pcm(wavfile, pcmfile):
     """
     Turn wav into pcm
@@ -28,17 +138,6 @@ def wav2pcm(wavfile, pcmfile):
     pcmfile: str
         output pcm file path
     """
-    with open(wavfile, 'rb') as i, open(pcmfile, 'wb') as o:
-        i.seek(0)
-        _id = i.read(4)
-        _id = unpack('>I', _id)
-        _size = i.read(4)
-        _size = unpack('<I', _size)
-        _type = i.read(4)
-        _type = unpack('>I', _type)
-        if _id[0] != 0x52494646 or _type[0] != 0x57415645:
-            raise ValueError('not a wav!')
-        i.read(32)
-        result = i.read()
-        o.write(result)
-
+    with WavFile(wavfile) as wav, open(pcmfile, 'wb') as o:
+        for chunk in wav.chunks(1 << 20):
+            o.write(chunk)
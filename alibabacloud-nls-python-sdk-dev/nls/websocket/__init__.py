@@ -21,6 +21,7 @@ from ._app import WebSocketApp
 from ._core import *
 from ._exceptions import *
 from ._logging import *
+from ._ping import *
 from ._socket import *
 
 __version__ = "1.2.1"
@@ -22,12 +22,12 @@ limitations under the License.
 """
 import selectors
 import sys
-import threading
 import time
 import traceback
 from ._abnf import ABNF
 from ._core import WebSocket, getdefaulttimeout
 from ._exceptions import *
+from ._ping import get_ping_scheduler
 from . import _logging
 
 
@@ -205,16 +205,6 @@ class WebSocketApp:
             self.sock.close(**kwargs)
             self.sock = None
 
-    def _send_ping(self, interval, event, payload):
-        while not event.wait(interval):
-            self.last_ping_tm = time.time()
-            if self.sock:
-                try:
-                    self.sock.ping(payload)
-                except Exception as ex:
-                    _logging.warning("send_ping routine terminated: {}".format(ex))
-                    break
-
     def run_forever(self, sockopt=None, sslopt=None,
                     ping_interval=0, ping_timeout=None,
                     ping_payload="",
@@ -222,7 +212,8 @@ class WebSocketApp:
                     http_no_proxy=None, http_proxy_auth=None,
                     skip_utf8_validation=False,
                     host=None, origin=None, dispatcher=None,
-                    suppress_origin=False, proxy_type=None):
+                    suppress_origin=False, proxy_type=None,
+                    ping_scheduler=None):
         """
         Run event loop for WebSocket framework.
 
@@ -260,6 +251,9 @@ class WebSocketApp:
             customize reading data from socket.
         suppress_origin: bool
             suppress outputting origin header.
+        ping_scheduler: PingScheduler object
+            scheduler which sends the periodic pings. Defaults to the
+            process-wide scheduler so no thread is spawned per connection.
 
         Returns
         -------
@@ -279,7 +273,8 @@ class WebSocketApp:
             sslopt = {}
         if self.sock:
             raise WebSocketException("socket is already opened")
-        thread = None
+        if ping_scheduler is None:
+            ping_scheduler = get_ping_scheduler()
         self.keep_running = True
         self.last_ping_tm = 0
         self.last_pong_tm = 0
@@ -297,9 +292,7 @@ class WebSocketApp:
             if self.has_teardown:
                 return
             self.has_teardown = True
-            if thread and thread.is_alive():
-                event.set()
-                thread.join()
+            ping_scheduler.unregister(self)
             self.keep_running = False
             if self.sock:
                 self.sock.close()
@@ -331,11 +324,7 @@ class WebSocketApp:
             self._callback(self.on_open, self.callback_args)
 
             if ping_interval:
-                event = threading.Event()
-                thread = threading.Thread(
-                    target=self._send_ping, args=(ping_interval, event, ping_payload))
-                thread.daemon = True
-                thread.start()
+                ping_scheduler.register(self, ping_interval, ping_payload)
 
             def read():
                 if not self.keep_running:
@@ -374,6 +363,7 @@ class WebSocketApp:
                     if (self.last_ping_tm and
                             has_timeout_expired and
                             (has_pong_not_arrived_after_last_ping or has_pong_arrived_too_late)):
+                        ping_scheduler.note_pong_timeout(self)
                         raise WebSocketTimeoutException("ping/pong timed out")
                 return True
 
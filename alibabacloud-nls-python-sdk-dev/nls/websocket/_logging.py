@@ -33,12 +33,13 @@ except ImportError:
 _logger.addHandler(NullHandler())
 
 _traceEnabled = False
+_traceHandler = None
 
 __all__ = ["enableTrace", "dump", "error", "warning", "debug", "trace",
            "isEnabledForError", "isEnabledForDebug", "isEnabledForTrace"]
 
 
-def enableTrace(traceable, handler=logging.StreamHandler()):
+def enableTrace(traceable, handler=None):
     """
     Turn on/off the traceability.
 
@@ -46,12 +47,25 @@ def enableTrace(traceable, handler=logging.StreamHandler()):
     ----------
     traceable: bool
         If set to True, traceability is enabled.
+    handler: Handler object
+        Handler to attach. Repeated calls replace the previously attached
+        handler instead of stacking a new one.
     """
-    global _traceEnabled
+    global _traceEnabled, _traceHandler
     _traceEnabled = traceable
     if traceable:
-        _logger.addHandler(handler)
-        _logger.setLevel(logging.ERROR)
+        if handler is None:
+            handler = _traceHandler or logging.StreamHandler()
+        if handler is not _traceHandler:
+            if _traceHandler is not None:
+                _logger.removeHandler(_traceHandler)
+            _logger.addHandler(handler)
+            _traceHandler = handler
+        _logger.setLevel(logging.DEBUG)
+    elif _traceHandler is not None:
+        _logger.removeHandler(_traceHandler)
+        _traceHandler = None
+        _logger.setLevel(logging.NOTSET)
 
 
 def dump(title, message):
@@ -0,0 +1,236 @@
+"""
+
+"""
+
+"""
+_ping.py
+websocket - WebSocket client library for Python
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import threading
+import time
+
+from . import _logging
+
+__all__ = ["PingScheduler", "get_ping_scheduler"]
+
+
+class _PingEntry:
+    """
+    One registered connection inside the timer wheel.
+    """
+    __slots__ = ("app", "interval", "payload", "slot", "rounds", "active")
+
+    def __init__(self, app, interval, payload):
+        self.app = app
+        self.interval = interval
+        self.payload = payload
+        self.slot = 0
+        self.rounds = 0
+        self.active = True
+
+
+class PingScheduler:
+    """
+    Hashed timer wheel which sends websocket pings for every registered
+    WebSocketApp from a single daemon thread.
+
+    The thread is started lazily on the first registration and parks on a
+    condition variable while no connection is registered, so an idle process
+    does not wake up at all.
+    """
+
+    def __init__(self, tick=0.5, wheel_size=256):
+        """
+        Parameters
+        ----------
+        tick: int or float
+            Granularity (in seconds) of the wheel. Ping deadlines are rounded
+            up to the next tick.
+        wheel_size: int
+            Number of slots. Intervals longer than tick * wheel_size wrap
+            around the wheel using a round counter.
+        """
+        if tick <= 0:
+            raise ValueError("Ensure tick > 0")
+        if wheel_size <= 0:
+            raise ValueError("Ensure wheel_size > 0")
+        self.tick = tick
+        self.wheel_size = wheel_size
+        self._slots = [[] for _ in range(wheel_size)]
+        self._entries = {}
+        self._cursor = 0
+        self._last_tick_tm = time.monotonic()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._wakeups = 0
+        self._pings_sent = 0
+        self._ping_errors = 0
+        self._pong_timeouts = 0
+
+    def register(self, app, interval, payload=""):
+        """
+        Start sending pings for app every interval seconds.
+
+        The first ping is sent one interval after registration, matching the
+        behaviour of the former per-connection ping thread.
+        """
+        if interval <= 0:
+            raise ValueError("Ensure interval > 0")
+        with self._cond:
+            if app in self._entries:
+                self._entries[app].active = False
+            entry = _PingEntry(app, interval, payload)
+            self._entries[app] = entry
+            self._schedule(entry)
+            self._ensure_thread()
+            self._cond.notify()
+        return entry
+
+    def unregister(self, app):
+        """
+        Stop sending pings for app. Unknown apps are ignored.
+        """
+        with self._cond:
+            entry = self._entries.pop(app, None)
+            if entry is not None:
+                entry.active = False
+                self._cond.notify()
+
+    def note_pong_timeout(self, app):
+        """
+        Called by the dispatcher check when a pong did not arrive in time.
+        """
+        with self._cond:
+            self._pong_timeouts += 1
+        self.unregister(app)
+
+    def stats(self):
+        """
+        Return a snapshot of scheduler metrics.
+
+        Returns
+        -------
+        stats: dict
+            threads: number of scheduler threads alive (0 or 1)
+            connections: number of registered connections
+            wakeups: number of times the scheduler thread woke up
+            pings_sent: number of pings sent successfully
+            ping_errors: number of pings which failed to send
+            pong_timeouts: number of ping/pong timeouts reported by dispatchers
+        """
+        with self._cond:
+            return {
+                "threads": 1 if self._thread and self._thread.is_alive() else 0,
+                "connections": len(self._entries),
+                "wakeups": self._wakeups,
+                "pings_sent": self._pings_sent,
+                "ping_errors": self._ping_errors,
+                "pong_timeouts": self._pong_timeouts,
+            }
+
+    def _schedule(self, entry):
+        ticks = max(1, int(-(-entry.interval // self.tick)))
+        entry.slot = (self._cursor + ticks) % self.wheel_size
+        entry.rounds = (ticks - 1) // self.wheel_size
+        self._slots[entry.slot].append(entry)
+
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._last_tick_tm = time.monotonic()
+        self._thread = threading.Thread(
+            target=self._run, name="websocket-ping-scheduler")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _ticks_to_next_slot(self):
+        for distance in range(1, self.wheel_size + 1):
+            if self._slots[(self._cursor + distance) % self.wheel_size]:
+                return distance
+        return None
+
+    def _run(self):
+        due = []
+        while True:
+            for entry in due:
+                self._send(entry)
+            due = []
+            with self._cond:
+                if not self._entries:
+                    for slot in self._slots:
+                        slot.clear()
+                    self._cond.wait()
+                    self._wakeups += 1
+                    self._last_tick_tm = time.monotonic()
+                    continue
+                distance = self._ticks_to_next_slot()
+                deadline = self._last_tick_tm + distance * self.tick
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    self._wakeups += 1
+                due = self._advance()
+
+    def _advance(self):
+        now = time.monotonic()
+        due = []
+        while self._last_tick_tm + self.tick <= now:
+            self._last_tick_tm += self.tick
+            self._cursor = (self._cursor + 1) % self.wheel_size
+            slot = self._slots[self._cursor]
+            pending = []
+            for entry in slot:
+                if not entry.active:
+                    continue
+                if entry.rounds > 0:
+                    entry.rounds -= 1
+                    pending.append(entry)
+                else:
+                    due.append(entry)
+            slot[:] = pending
+        for entry in due:
+            self._schedule(entry)
+        return due
+
+    def _send(self, entry):
+        app = entry.app
+        app.last_ping_tm = time.time()
+        if not app.sock:
+            return
+        try:
+            app.sock.ping(entry.payload)
+        except Exception as ex:
+            _logging.warning("send_ping routine terminated: {}".format(ex))
+            with self._cond:
+                self._ping_errors += 1
+            self.unregister(app)
+        else:
+            with self._cond:
+                self._pings_sent += 1
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_ping_scheduler():
+    """
+    Return the process-wide PingScheduler shared by all WebSocketApp objects.
+    """
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = PingScheduler()
+        return _default_scheduler
@@ -77,6 +77,64 @@ class ConfigLoader:
                 'temperature': 0.7,
                 'max_tokens': 2000,
                 'timeout': 60
+            },
+            'tts': {
+                'enabled': False,
+                'voice': 'longxiaochun',
+                'sample_rate': 16000
+            },
+            'question_filter': {
+                'enabled': False,
+                'type': 'keyword',
+                'model': '',
+                'keywords': []
+            },
+            'answer_cache': {
+                'enabled': False,
+                'path': 'answer_cache.json',
+                'warmup_file': '',
+                'max_entries': 2000,
+                'ttl_days': 30,
+                'similarity': 0.8
+            },
+            'sentence_aggregation': {
+                'enabled': False,
+                'silence_gap': 1.0,
+                'max_wait': 6.0
+            },
+            'llm_retry': {
+                'max_attempts': 3,
+                'latency_budget': 20.0,
+                'hedge': False,
+                'hedge_min_delay': 1.0
+            },
+            'llm_routing': {
+                'enabled': False,
+                'backends': [],
+                'window': 20,
+                'cooldown': 30.0
+            },
+            'llm_rate_limit': {
+                'requests_per_minute': 0,
+                'tokens_per_minute': 0
+            },
+            'screenshot': {
+                'image_format': 'JPEG',
+                'quality': 85,
+                'ocr': False,
+                'ocr_min_confidence': 0.85,
+                'ocr_min_chars': 20,
+                'cache': True,
+                'cache_size': 32,
+                'cache_distance': 6
+            },
+            'startup': {
+                'preload': True,
+                'warmup': True
+            },
+            'tracing': {
+                'enabled': True,
+                'export_dir': ''
             }
         }
     
@@ -123,6 +181,115 @@ class ConfigLoader:
             'timeout': self._config.get('openai', {}).get('timeout', 60)
         }
     
+    @property
+    def tts_config(self):
+        """获取语音朗读配置"""
+        tts_config = self._config.get('tts', {}) or {}
+        return {
+            'enabled': tts_config.get('enabled', False),
+            'voice': tts_config.get('voice', 'longxiaochun'),
+            'sample_rate': tts_config.get('sample_rate', 16000)
+        }
+    
+    @property
+    def question_filter_config(self):
+        """获取问题预判配置"""
+        filter_config = self._config.get('question_filter', {}) or {}
+        return {
+            'enabled': filter_config.get('enabled', False),
+            'type': filter_config.get('type', 'keyword'),
+            'model': filter_config.get('model', ''),
+            'keywords': filter_config.get('keywords', []) or []
+        }
+    
+    @property
+    def answer_cache_config(self):
+        """获取答案缓存配置"""
+        cache_config = self._config.get('answer_cache', {}) or {}
+        return {
+            'enabled': cache_config.get('enabled', False),
+            'path': cache_config.get('path', 'answer_cache.json'),
+            'warmup_file': cache_config.get('warmup_file', ''),
+            'max_entries': cache_config.get('max_entries', 2000),
+            'ttl_days': cache_config.get('ttl_days', 30),
+            'similarity': cache_config.get('similarity', 0.8)
+        }
+    
+    @property
+    def sentence_aggregation_config(self):
+        """获取句子聚合配置"""
+        aggregation_config = self._config.get('sentence_aggregation', {}) or {}
+        return {
+            'enabled': aggregation_config.get('enabled', False),
+            'silence_gap': aggregation_config.get('silence_gap', 1.0),
+            'max_wait': aggregation_config.get('max_wait', 6.0)
+        }
+    
+    @property
+    def llm_retry_config(self):
+        """获取LLM请求重试配置"""
+        retry_config = self._config.get('llm_retry', {}) or {}
+        return {
+            'max_attempts': retry_config.get('max_attempts', 3),
+            'latency_budget': retry_config.get('latency_budget', 20.0),
+            'hedge': retry_config.get('hedge', False),
+            'hedge_min_delay': retry_config.get('hedge_min_delay', 1.0)
+        }
+    
+    @property
+    def llm_routing_config(self):
+        """获取多后端路由配置"""
+        routing_config = self._config.get('llm_routing', {}) or {}
+        return {
+            'enabled': routing_config.get('enabled', False),
+            'backends': routing_config.get('backends', []) or [],
+            'window': routing_config.get('window', 20),
+            'cooldown': routing_config.get('cooldown', 30.0)
+        }
+    
+    @property
+    def llm_rate_limit_config(self):
+        """获取LLM请求限流配置，0表示按服务端返回的x-ratelimit-*头自动设置"""
+        limit_config = self._config.get('llm_rate_limit', {}) or {}
+        return {
+            'requests_per_minute': limit_config.get('requests_per_minute', 0),
+            'tokens_per_minute': limit_config.get('tokens_per_minute', 0)
+        }
+    
+    @property
+    def screenshot_config(self):
+        """获取截图识别配置"""
+        screenshot_config = self._config.get('screenshot', {}) or {}
+        return {
+            'image_format': screenshot_config.get('image_format', 'JPEG'),
+            'quality': screenshot_config.get('quality', 85),
+            'ocr': screenshot_config.get('ocr', False),
+            'ocr_min_confidence': screenshot_config.get('ocr_min_confidence', 0.85),
+            'ocr_min_chars': screenshot_config.get('ocr_min_chars', 20),
+            'cache': screenshot_config.get('cache', True),
+            'cache_size': screenshot_config.get('cache_size', 32),
+            'cache_distance': screenshot_config.get('cache_distance', 6)
+        }
+    
+    @property
+    def startup_config(self):
+        """获取启动配置，preload为窗口显示后是否在后台预先导入录音、识别和LLM模块，
+        warmup为是否在开始录音前就在后台创建录音设备、识别器和LLM客户端"""
+        startup_config = self._config.get('startup', {}) or {}
+        return {
+            'preload': startup_config.get('preload', True),
+            'warmup': startup_config.get('warmup', True)
+        }
+    
+    @property
+    def tracing_config(self):
+        """获取延迟追踪配置，export_dir为空时只在控制台输出统计，不导出文件"""
+        tracing_config = self._config.get('tracing', {}) or {}
+        return {
+            'enabled': tracing_config.get('enabled', True),
+            'export_dir': tracing_config.get('export_dir', '')
+        }
+    
     def create_default_config(self, path):
         """创建默认配置文件"""
         config_dir = path.parent
@@ -0,0 +1,135 @@
+import asyncio
+import importlib.util
+import threading
+import time
+import weakref
+from typing import Dict, Any
+
+import httpx
+
+from .rate_limiter import observe_response
+
+# 安装了h2时启用HTTP/2，同一个连接上可以并发多个请求
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_lock = threading.Lock()
+_client = None
+# 异步连接绑定在创建它的事件循环上，每个事件循环一个连接池
+_async_clients = weakref.WeakKeyDictionary()
+
+
+class RequestTimingStats:
+    """请求耗时统计
+
+    通过httpcore的trace扩展判断每个请求是否新建了TCP连接，
+    用新建/复用连接数和响应头到达耗时衡量连接池的效果。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.header_time_total = 0.0
+        self.header_time_new = 0.0
+        self.http_versions = {}
+
+    def on_request(self, request: httpx.Request, asynchronous: bool = False):
+        """
+        记录请求开始时间并安装trace回调
+        Args:
+            request: 请求
+            asynchronous: 是否为AsyncClient的请求，httpcore的异步连接池要求trace回调是协程函数
+        """
+        timing = {"start": time.perf_counter(), "new_connection": False}
+
+        def on_event(event_name):
+            if event_name.startswith("connection.connect_tcp.started"):
+                timing["new_connection"] = True
+
+        if asynchronous:
+            async def trace(event_name, info):
+                on_event(event_name)
+        else:
+            def trace(event_name, info):
+                on_event(event_name)
+
+        request.extensions["trace"] = trace
+        request.extensions["msbd_timing"] = timing
+
+    def on_response(self, response: httpx.Response):
+        timing = response.request.extensions.get("msbd_timing")
+        if not timing:
+            return
+        elapsed = time.perf_counter() - timing["start"]
+        with self._lock:
+            self.requests += 1
+            self.header_time_total += elapsed
+            if timing["new_connection"]:
+                self.new_connections += 1
+                self.header_time_new += elapsed
+            version = response.http_version
+            self.http_versions[version] = self.http_versions.get(version, 0) + 1
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            reused = self.requests - self.new_connections
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_ratio": reused / self.requests if self.requests else 0.0,
+                "avg_header_time_new": self.header_time_new / self.new_connections if self.new_connections else 0.0,
+                "avg_header_time_reused": (self.header_time_total - self.header_time_new) / reused if reused else 0.0,
+                "http_versions": dict(self.http_versions)
+            }
+
+
+timing_stats = RequestTimingStats()
+
+
+def _on_response(response):
+    timing_stats.on_response(response)
+    # 根据x-ratelimit-*头调整限流器
+    observe_response(response.request.url.host, response.status_code, response.headers)
+
+
+async def _on_request_async(request):
+    timing_stats.on_request(request, asynchronous=True)
+
+
+async def _on_response_async(response):
+    _on_response(response)
+
+
+def _client_options(on_request, on_response) -> Dict[str, Any]:
+    return {
+        "http2": HTTP2_AVAILABLE,
+        "limits": httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=120),
+        "timeout": httpx.Timeout(60, connect=10),
+        "event_hooks": {"request": [on_request], "response": [on_response]}
+    }
+
+
+def get_http_client() -> httpx.Client:
+    """
+    获取进程内共享的httpx连接池
+    所有OpenAI兼容客户端（对话、图像识别、问题预判）共用同一组keep-alive连接，
+    超时由openai客户端在每个请求上单独指定。
+    """
+    global _client
+    with _lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(**_client_options(timing_stats.on_request, _on_response))
+        return _client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """获取当前事件循环共享的httpx异步连接池，必须在事件循环中调用"""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(**_client_options(_on_request_async, _on_response_async))
+            _async_clients[loop] = client
+        return client
@@ -0,0 +1,125 @@
+import base64
+import io
+import math
+import time
+from typing import Union
+
+# 视觉模型的高精度模式会把图像缩放到2048x2048以内、短边768，更大的图像只会增加上传和编码时间
+MAX_LONG_SIDE = 2048
+MAX_SHORT_SIDE = 768
+
+_MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+
+
+class ImagePayload:
+    """编码好的图像，直接用于视觉模型请求
+
+    截图在内存中缩放并只编码一次，不再写入磁盘后重新读取。
+    """
+
+    def __init__(self, data: bytes, mime_type: str, size=(0, 0), original_size=(0, 0), encode_time: float = 0.0,
+                 captured_at: float = None, image=None):
+        """
+        Args:
+            data: 编码后的图像数据
+            mime_type: 图像的MIME类型
+            size: 编码后的尺寸 (宽, 高)
+            original_size: 原始尺寸 (宽, 高)
+            encode_time: 缩放和编码耗时（秒）
+            captured_at: 截图时间（time.time()），用于统计从截图到回答的延迟
+            image: 缩放后的PIL图像，供本地处理复用，可以为None
+        """
+        self.data = data
+        self.mime_type = mime_type
+        self.size = size
+        self.original_size = original_size
+        self.encode_time = encode_time
+        self.captured_at = captured_at
+        self.image = image
+
+    @classmethod
+    def from_image(cls, image, image_format: str = "JPEG", quality: int = 85, captured_at: float = None) -> "ImagePayload":
+        """
+        缩放并编码PIL图像
+        Args:
+            image: PIL图像
+            image_format: JPEG或WEBP，截图中的文字在quality 85时仍然清晰
+            quality: 编码质量
+            captured_at: 截图时间
+        Returns:
+            ImagePayload: 编码后的图像
+        """
+        start = time.perf_counter()
+        original_size = image.size
+        image = downscale(image)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image_format = image_format.upper()
+        buffer = io.BytesIO()
+        if image_format == "WEBP":
+            image.save(buffer, format="WEBP", quality=quality, method=4)
+        else:
+            image_format = "JPEG"
+            image.save(buffer, format="JPEG", quality=quality, optimize=True)
+        return cls(buffer.getvalue(), _MIME_TYPES[image_format], image.size, original_size,
+                   time.perf_counter() - start, captured_at, image)
+
+    @classmethod
+    def from_file(cls, path: str, image_format: str = "JPEG", quality: int = 85) -> "ImagePayload":
+        """读取图像文件后缩放编码"""
+        from PIL import Image
+        with Image.open(path) as image:
+            image.load()
+            return cls.from_image(image, image_format, quality)
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime_type};base64,{base64.b64encode(self.data).decode('ascii')}"
+
+    @property
+    def stats(self):
+        return {
+            "bytes": len(self.data),
+            "mime_type": self.mime_type,
+            "size": self.size,
+            "original_size": self.original_size,
+            "encode_time": self.encode_time
+        }
+
+
+def scaled_size(size, max_long_side: int = MAX_LONG_SIDE, max_short_side: int = MAX_SHORT_SIDE):
+    """按比例缩小到长边、短边都不超过限制后的尺寸，不放大"""
+    width, height = size
+    if not width or not height:
+        return size
+    ratio = min(1.0, max_long_side / max(width, height), max_short_side / min(width, height))
+    if ratio >= 1.0:
+        return size
+    return max(1, round(width * ratio)), max(1, round(height * ratio))
+
+
+def downscale(image, max_long_side: int = MAX_LONG_SIDE, max_short_side: int = MAX_SHORT_SIDE):
+    """缩小图像到scaled_size的尺寸"""
+    size = scaled_size(image.size, max_long_side, max_short_side)
+    if size == image.size:
+        return image
+    from PIL import Image
+    return image.resize(size, Image.LANCZOS)
+
+
+def estimate_image_tokens(size) -> int:
+    """按视觉模型高精度模式的计费方式估算图像的token数：每个512x512的块170个token，另加85个"""
+    width, height = size
+    if not width or not height:
+        return 85
+    tiles = math.ceil(width / 512) * math.ceil(height / 512)
+    return 85 + 170 * tiles
+
+
+def to_payload(image: Union[str, "ImagePayload"]) -> ImagePayload:
+    """把图像路径或PIL图像转换为ImagePayload"""
+    if isinstance(image, ImagePayload):
+        return image
+    if isinstance(image, str):
+        return ImagePayload.from_file(image)
+    return ImagePayload.from_image(image)
@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional, Tuple, Callable
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple, Callable, Union
 import os
+import json
+import asyncio
+from .token_counter import TokenCounter
 class LLMBase(ABC):
     """LLM基类"""
     
@@ -27,52 +29,125 @@ class LLMBase(ABC):
         """让AI处理函数调用"""
         pass
 
+    def on_function_call_stream(self, message: str, on_update: Callable[[Dict[str, Any]], None] = None):
+        """流式处理函数调用
+
+        参数每到达一段就以已解析出的部分参数字典回调on_update，
+        返回值与on_function_call相同。默认实现退化为非流式调用。
+        """
+        function_name, function_arguments = self.on_function_call(message)
+        if function_name and on_update:
+            try:
+                on_update(json.loads(function_arguments))
+            except json.JSONDecodeError:
+                pass
+        return function_name, function_arguments
+
+    async def on_function_call_stream_async(self, message: str, on_update: Callable[[Dict[str, Any]], None] = None, request=None):
+        """异步流式处理函数调用，默认实现在线程池中执行同步版本，取消时无法中断已发出的请求"""
+        return await asyncio.to_thread(self.on_function_call_stream, message, on_update)
+
+    def add_context(self, message: str):
+        """只把消息加入上下文而不调用模型，用于被预判过滤掉的句子"""
+        chat_manager = getattr(self, "chat_manager", None)
+        if chat_manager:
+            chat_manager.add_user_message(message)
+
     @abstractmethod
     def use_function(self, name: str, parameters: dict):
         """执行指定已注册的函数"""
         pass
 
     @abstractmethod
-    def analyze_image(self, image_path: str, prompt: str = None):
+    def analyze_image(self, image, prompt: str = None):
         """分析图像内容并返回结果
         
         Args:
-            image_path: 图像文件路径
+            image: 编码好的ImagePayload，或图像文件路径
             prompt: 可选的提示文本，用于引导AI分析图像
             
         Returns:
-            分析结果
+            (是否成功, 分析结果)，失败时分析结果为错误信息
         """
         pass
 
+    def analyze_image_stream(self, image, prompt: str = None, on_delta: Callable[[str], None] = None):
+        """流式分析图像，每收到一段文本就回调on_delta，返回完整结果
+
+        默认实现退化为非流式调用，结果一次性回调。返回(是否成功, 完整结果)。
+        """
+        success, result = self.analyze_image(image, prompt)
+        if result and on_delta:
+            on_delta(result)
+        return success, result
+
+    def analyze_text_stream(self, text: str, prompt: str = None, on_delta: Callable[[str], None] = None):
+        """流式分析从截图中识别出的文字，返回完整结果
+
+        默认实现退化为一次非流式对话补全。返回(是否成功, 完整结果)。
+        """
+        result = self.chat_completion(f"{prompt or ''}\n\n截图中的文字如下：\n```\n{text}\n```")
+        if result and on_delta:
+            on_delta(result)
+        return result is not None, result
+
 
-@dataclass
 class ChatMessage:
-    """表示一条聊天消息"""
-    role: str
-    content: Optional[str] = None
-    function_call: Optional[Dict[str, Any]] = None
-    name: Optional[str] = None
+    """表示一条聊天消息
+
+    消息创建后不再修改，API格式的字典在第一次使用时生成并缓存。
+    """
+    __slots__ = ("role", "content", "function_call", "name", "tokens", "_wire")
+
+    def __init__(self, role: str, content: Optional[str] = None, function_call: Optional[Dict[str, Any]] = None,
+                 name: Optional[str] = None):
+        self.role = role
+        self.content = content
+        self.function_call = function_call
+        self.name = name
+        # 消息的token数，加入历史时计算一次
+        self.tokens = 0
+        self._wire = None
 
     def to_dict(self) -> Dict[str, Any]:
-        """转换为OpenAI API所需的格式"""
-        message = {"role": self.role}
-        if self.content is not None:
-            message["content"] = self.content
-        if self.function_call is not None:
-            message["function_call"] = self.function_call
-        if self.name is not None:
-            message["name"] = self.name
-        return message
+        """转换为OpenAI API所需的格式，返回的字典会被复用，不要修改"""
+        if self._wire is None:
+            message = {"role": self.role}
+            if self.content is not None:
+                message["content"] = self.content
+            if self.function_call is not None:
+                message["function_call"] = self.function_call
+            if self.name is not None:
+                message["name"] = self.name
+            self._wire = message
+        return self._wire
+
+    def __repr__(self):
+        return f"ChatMessage(role={self.role!r}, content={self.content!r}, function_call={self.function_call!r}, name={self.name!r})"
 
 
 
 class ChatManagerBase(ABC):
     """管理聊天上下文和消息历史"""
     @abstractmethod
-    def __init__(self,max_messages: int = 10,system_message: str = None,interview_type: str = None):
+    def __init__(self,max_messages: int = 10,system_message: str = None,interview_type: str = None,
+                 model: str = None, max_history_tokens: Optional[int] = 3000, truncate_ratio: float = 0.5):
+        """
+        Args:
+            max_messages: 最大历史消息条数（不含系统消息）
+            system_message: 系统消息
+            interview_type: 面试岗位
+            model: 模型名称，用于选择token编码
+            max_history_tokens: 历史消息（不含系统消息）的token预算，None表示只按条数裁剪
+            truncate_ratio: 超出限制时一次裁剪到限制的该比例，之后的若干轮只追加不裁剪
+        """
         self.messages: List[ChatMessage] = []
         self.max_messages = max_messages
+        self.max_history_tokens = max_history_tokens
+        self.truncate_ratio = truncate_ratio
+        self.token_counter = TokenCounter(model)
+        # get_messages返回的API格式列表，新增消息时直接追加，历史结构变化时置为None重建
+        self._wire_messages: Optional[List[Dict[str, Any]]] = None
         if system_message:
             self.set_system_message(system_message,interview_type)
         pass
@@ -93,8 +168,8 @@ class ChatManagerBase(ABC):
         pass
     
     @abstractmethod
-    def add_function_call(self, name: str, arguments: Dict[str, Any]) -> None:
-        """添加函数调用消息"""
+    def add_function_call(self, name: str, arguments: Union[str, Dict[str, Any]]) -> None:
+        """添加函数调用消息，arguments为模型返回的JSON字符串或参数字典"""
         pass
     
     @abstractmethod
@@ -102,14 +177,74 @@ class ChatManagerBase(ABC):
         """添加函数返回结果消息"""
         pass
 
-    @abstractmethod
+    def _append(self, message: ChatMessage) -> None:
+        """计算token数后加入历史并裁剪"""
+        self._count_tokens(message)
+        self.messages.append(message)
+        if self._wire_messages is not None:
+            self._wire_messages.append(message.to_dict())
+        self._maintain_conversation_history()
+
+    def _count_tokens(self, message: ChatMessage) -> None:
+        message.tokens = self.token_counter.count_message(
+            message.role, message.content, message.function_call, message.name)
+
+    def _serialized_messages(self) -> List[Dict[str, Any]]:
+        """返回缓存的API格式消息列表，只有新追加的消息需要转换"""
+        if self._wire_messages is None:
+            self._wire_messages = [message.to_dict() for message in self.messages]
+        return self._wire_messages
+
+    def _history_changed(self) -> None:
+        """删除、插入或替换消息后调用，下次get_messages时重建列表"""
+        self._wire_messages = None
+
+    def snapshot(self) -> List[ChatMessage]:
+        """保存当前历史，请求失败改用其他后端重试前用restore撤销已写入的消息"""
+        return list(self.messages)
+
+    def restore(self, snapshot: List[ChatMessage]) -> None:
+        """恢复到snapshot保存的历史"""
+        self.messages = list(snapshot)
+        self._history_changed()
+
+    @property
+    def prompt_tokens(self) -> int:
+        """当前全部消息的token数，即下一次请求的提示词token数（不含函数定义）"""
+        return sum(message.tokens for message in self.messages)
+
     def _maintain_conversation_history(self) -> None:
-        """维护聊天历史，确保不超过最大消息数量"""
+        """维护聊天历史
+
+        服务端按请求前缀缓存提示词，每轮都删掉最早的消息会让前缀每次都变化而无法命中缓存。
+        因此只在超出最大消息条数或token预算时才裁剪，并且一次按整轮（一条用户消息及其后的回复）
+        从最早开始删除到限制的truncate_ratio以内，之后若干轮历史只追加、前缀保持不变。
+        系统消息和最后一轮对话始终保留。
+        """
+        start = 1 if self.messages and self.messages[0].role == "system" else 0
+        history = self.messages[start:]
+        if not self._over_limit(history, 1.0):
+            return
+        while self._over_limit(self.messages[start:], self.truncate_ratio):
+            # 找到第二轮对话的开始位置，删除第一轮
+            end = start + 1
+            while end < len(self.messages) and self.messages[end].role != "user":
+                end += 1
+            if end >= len(self.messages):
+                break
+            del self.messages[start:end]
+        self._history_changed()
         pass
 
+    def _over_limit(self, history: List[ChatMessage], ratio: float) -> bool:
+        if len(history) > self.max_messages * ratio:
+            return True
+        return (self.max_history_tokens is not None
+                and sum(message.tokens for message in history) > self.max_history_tokens * ratio)
+
     @abstractmethod
     def get_messages(self) -> List[Dict[str, Any]]:
-        """获取所有消息"""
+        """获取所有消息，返回的列表会被复用，调用方不要修改"""
         pass
 
     @abstractmethod
@@ -0,0 +1,425 @@
+import openai
+import asyncio
+import time
+import os
+from abc import abstractmethod
+from typing import Dict, Any, Callable, Optional, Tuple, Union
+from .llm_base import LLMBase, ChatManagerBase
+from .partial_json import PartialJSONParser
+from .http_pool import get_http_client, get_async_http_client
+from .usage_stats import UsageStats
+from .image_payload import ImagePayload, to_payload
+from .retry_policy import RetryPolicy
+from .rate_limiter import RateLimiter, get_rate_limiter, host_of, PRIORITY_ANSWER, PRIORITY_SCREENSHOT
+
+# 图像识别请求限流时为图像预留的token数，另外再加上最大输出token数
+IMAGE_PROMPT_TOKENS = 1000
+
+
+class OpenAICompatibleClient(LLMBase):
+    """OpenAI兼容接口的通用客户端
+
+    对话、函数调用、流式解析和图像识别的逻辑都在这里实现，
+    各提供商只需声明API密钥环境变量、聊天管理器以及函数调用的协议格式。
+    所有实例共用一个httpx连接池。
+    """
+
+    # 提供商名称，用于错误提示
+    PROVIDER = ""
+    # API密钥所在的环境变量
+    API_KEY_ENV = ""
+    # 是否支持图像识别
+    SUPPORTS_VISION = False
+    # 图像识别使用的模型
+    VISION_MODEL = None
+
+    def __init__(
+        self,
+        base_url: str = None,
+        model: str = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        timeout: int = 60,
+        interview_type: str = None,
+        chat_manager: ChatManagerBase = None,
+        system_message: str = None,
+        max_messages: int = 10,
+        max_history_tokens: Optional[int] = 3000,
+        retry_policy: RetryPolicy = None,
+        api_key: str = None,
+        rate_limiter: RateLimiter = None
+    ):
+        super().__init__(model=model, api_key=api_key or os.getenv(self.API_KEY_ENV), interview_type=interview_type)
+        self.client = openai.OpenAI(
+            base_url=base_url or None,
+            timeout=timeout,
+            api_key=self.api_key,
+            http_client=get_http_client(),
+            # 重试由retry_policy统一处理
+            max_retries=0
+        )
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.base_url = base_url or None
+        # 同一个服务地址的客户端共用限流器
+        self.rate_limiter = rate_limiter or get_rate_limiter(host_of(self.base_url))
+        self.timeout = timeout
+        # (事件循环, AsyncOpenAI)，异步客户端在第一次异步调用时创建
+        self._async_client = (None, None)
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.chat_manager = chat_manager or self.create_chat_manager(system_message=system_message, interview_type=interview_type, max_messages=max_messages, max_history_tokens=max_history_tokens)
+        self.usage_stats = UsageStats()
+        self.functions = []
+        self.function_handlers = {}
+        pass
+
+    @abstractmethod
+    def create_chat_manager(self, system_message: str, interview_type: str, max_messages: int, max_history_tokens: Optional[int]) -> ChatManagerBase:
+        """创建提供商对应的聊天管理器"""
+        pass
+
+    @abstractmethod
+    def build_function_definition(self, name: str, description: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """把函数定义转换为提供商要求的格式"""
+        pass
+
+    @abstractmethod
+    def function_call_kwargs(self) -> Dict[str, Any]:
+        """函数调用请求需要附加的参数"""
+        pass
+
+    @abstractmethod
+    def read_function_call(self, message) -> Tuple[Optional[str], Optional[str]]:
+        """从非流式响应的消息中读取(函数名, 参数)"""
+        pass
+
+    @abstractmethod
+    def read_function_call_delta(self, delta) -> Tuple[Optional[str], Optional[str]]:
+        """从流式响应的增量中读取(函数名, 参数片段)"""
+        pass
+
+    def chat_completion_kwargs(self) -> Dict[str, Any]:
+        """普通对话补全需要附加的参数"""
+        return {}
+
+    def chat_completion(self, messages: str, stream=False, **kwargs):
+        """执行对话补全"""
+        try:
+            self.chat_manager.add_user_message(messages)
+            # 复制一份：缓存的列表会被其他线程追加，排队、重试或对冲时发出的消息不能变化
+            messages = list(self.chat_manager.get_messages())
+            self.rate_limiter.acquire(self._reserved_tokens(), PRIORITY_ANSWER)
+            response = self.retry_policy.call(
+                self.client.chat.completions.create,
+                model=self.model,
+                messages=messages,
+                stream=stream,
+                **self.chat_completion_kwargs(),
+                **kwargs
+            )
+            if stream:
+                return self._handle_stream_response(response)
+            else:
+                content = response.choices[0].message.content
+                self.chat_manager.add_assistant_message(content)
+                return content
+        except Exception as e:
+            print(f"执行对话补全时发生错误: {str(e)}")
+            return None
+        pass
+
+    def register_function(self, name: str, description: str, parameters: Dict[str, Any], handler: Callable[[Any], Any]):
+        """注册一个可以被AI调用的函数"""
+        self.functions.append(self.build_function_definition(name, description, parameters))
+        self.function_handlers[name] = handler
+        pass
+
+    def on_function_call(self, message: str):
+        """让AI处理函数调用"""
+        self.chat_manager.add_user_message(message)
+        messages = list(self.chat_manager.get_messages())
+        self.rate_limiter.acquire(self._reserved_tokens(), PRIORITY_ANSWER)
+        response = self.retry_policy.call(
+            self.client.chat.completions.create,
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            stream=False,
+            **self.function_call_kwargs()
+        )
+        function_name, function_arguments = self.read_function_call(response.choices[0].message)
+        if function_name:
+            # 添加到消息历史
+            self.chat_manager.add_function_call(name=function_name, arguments=function_arguments)
+            return function_name, function_arguments
+        return None, None
+
+    def on_function_call_stream(self, message: str, on_update: Callable[[Dict[str, Any]], None] = None):
+        """流式处理函数调用，参数每增长一段就回调一次已解析出的部分参数"""
+        build_start = time.perf_counter()
+        self.chat_manager.add_user_message(message)
+        messages = list(self.chat_manager.get_messages())
+        estimated = self.chat_manager.prompt_tokens
+        build_time = time.perf_counter() - build_start
+        reserved = self._reserved_tokens(estimated)
+        self.rate_limiter.acquire(reserved, PRIORITY_ANSWER)
+        request_time = time.perf_counter()
+        response = self.retry_policy.call(
+            self.client.chat.completions.create,
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            stream=True,
+            stream_options={"include_usage": True},
+            **self.function_call_kwargs()
+        )
+        function_name = None
+        usage = None
+        first_chunk_time = None
+        parser = PartialJSONParser()
+        for chunk in response:
+            if first_chunk_time is None:
+                first_chunk_time = time.perf_counter() - request_time
+            usage = getattr(chunk, "usage", None) or usage
+            function_name = self._feed_chunk(chunk, parser, on_update) or function_name
+        self.usage_stats.record(estimated, usage, first_chunk_time, build_time)
+        if usage:
+            self.rate_limiter.reconcile(reserved, usage.total_tokens)
+        if function_name:
+            function_arguments = parser.text
+            # 添加到消息历史
+            self.chat_manager.add_function_call(name=function_name, arguments=function_arguments)
+            return function_name, function_arguments
+        return None, None
+
+    async def on_function_call_stream_async(self, message: str, on_update: Callable[[Dict[str, Any]], None] = None, request=None):
+        """异步流式处理函数调用
+
+        请求开始时不修改历史，完成后再把用户消息和函数调用一起写入，
+        这样同时进行的多个请求各自的消息在历史中仍然相邻，被取消的请求也不会留下记录。
+        request为RequestTracker中的LLMRequest，用于统计已收到的token数和排队时间。
+        """
+        build_start = time.perf_counter()
+        messages = self.chat_manager.get_messages() + [{"role": "user", "content": message}]
+        estimated = self.chat_manager.prompt_tokens + self.chat_manager.token_counter.count_message("user", message)
+        build_time = time.perf_counter() - build_start
+        reserved = self._reserved_tokens(estimated)
+        queue_wait = await self.rate_limiter.acquire_async(reserved, PRIORITY_ANSWER)
+        if request is not None:
+            request.queue_wait = queue_wait
+        request_time = time.perf_counter()
+        response = await self.retry_policy.call_async(
+            self.get_async_client().chat.completions.create,
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            stream=True,
+            stream_options={"include_usage": True},
+            **self.function_call_kwargs()
+        )
+        function_name = None
+        usage = None
+        first_chunk_time = None
+        parser = PartialJSONParser()
+        try:
+            async for chunk in response:
+                if first_chunk_time is None:
+                    first_chunk_time = time.perf_counter() - request_time
+                if request is not None:
+                    request.chunks += 1
+                usage = getattr(chunk, "usage", None) or usage
+                function_name = self._feed_chunk(chunk, parser, on_update) or function_name
+        finally:
+            # 被取消时及时关闭连接，服务端停止生成
+            await response.close()
+        self.usage_stats.record(estimated, usage, first_chunk_time, build_time)
+        if usage:
+            self.rate_limiter.reconcile(reserved, usage.total_tokens)
+        self.chat_manager.add_user_message(message)
+        if function_name:
+            function_arguments = parser.text
+            # 添加到消息历史
+            self.chat_manager.add_function_call(name=function_name, arguments=function_arguments)
+            return function_name, function_arguments
+        return None, None
+
+    def get_async_client(self) -> openai.AsyncOpenAI:
+        """获取当前事件循环上的AsyncOpenAI客户端"""
+        loop = asyncio.get_running_loop()
+        client_loop, client = self._async_client
+        if client_loop is not loop:
+            client = openai.AsyncOpenAI(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                api_key=self.api_key,
+                http_client=get_async_http_client(),
+                max_retries=0
+            )
+            self._async_client = (loop, client)
+        return client
+
+    def _reserved_tokens(self, prompt_tokens: int = None) -> int:
+        """限流时为一个请求预留的token数：提示词加上最大输出，完成后按实际用量校正"""
+        if prompt_tokens is None:
+            prompt_tokens = self.chat_manager.prompt_tokens
+        return prompt_tokens + self.max_tokens
+
+    def _feed_chunk(self, chunk, parser: PartialJSONParser, on_update) -> Optional[str]:
+        """处理一个流式块，返回其中出现的函数名"""
+        if not chunk.choices:
+            return None
+        name, arguments = self.read_function_call_delta(chunk.choices[0].delta)
+        if arguments:
+            partial = parser.feed(arguments)
+            if on_update and partial:
+                on_update(partial)
+        return name
+
+    def use_function(self, name: str, parameters: dict):
+        """执行指定已注册的函数"""
+        handler = self.function_handlers.get(name)
+        if handler:
+            result = handler(**parameters)
+            # 添加到消息历史
+            self.chat_manager.add_function_result(name=name, result=result)
+            return result
+        return None
+        pass
+
+    def _handle_stream_response(self, response):
+        """处理流式响应"""
+        collected_content = []
+
+        def response_generator():
+            nonlocal collected_content
+            try:
+                for chunk in response:
+                    if chunk.choices[0].delta.content is not None:
+                        content = chunk.choices[0].delta.content
+                        collected_content.append(content)
+                        yield content
+
+                # 在流式响应结束后，将完整内容添加到消息历史
+                full_content = ''.join(collected_content)
+                self.chat_manager.add_assistant_message(full_content)
+
+            except Exception as e:
+                print(f"处理流式响应时发生错误: {str(e)}")
+
+        return response_generator()
+        pass
+
+    def analyze_image(self, image: Union[str, ImagePayload], prompt: str = None):
+        """分析图像内容并返回结果
+
+        Args:
+            image: 编码好的ImagePayload，或图像文件路径
+            prompt: 可选的提示文本，用于引导AI分析图像
+
+        Returns:
+            (是否成功, 分析结果字符串)，失败时为错误信息
+        """
+        if not self.SUPPORTS_VISION:
+            return False, f"抱歉，{self.PROVIDER}模型不支持图像识别功能。请使用OpenAI模型进行图像分析。"
+        return self._analyze_image(image, prompt)
+
+    def _analyze_image(self, image: Union[str, ImagePayload], prompt: str = None):
+        try:
+            response = self._create_image_request(image, prompt, stream=False)
+            return True, response.choices[0].message.content
+        except Exception as e:
+            print(f"分析图像时发生错误: {str(e)}")
+            return False, f"图像分析失败: {str(e)}"
+
+    def analyze_image_stream(self, image: Union[str, ImagePayload], prompt: str = None, on_delta: Callable[[str], None] = None):
+        """流式分析图像，每收到一段文本就回调on_delta，返回完整结果
+
+        Args:
+            image: 编码好的ImagePayload，或图像文件路径
+            prompt: 可选的提示文本，用于引导AI分析图像
+            on_delta: 接收增量文本的回调
+
+        Returns:
+            (是否成功, 完整的分析结果字符串)
+        """
+        if not self.SUPPORTS_VISION:
+            return super().analyze_image_stream(image, prompt, on_delta)
+        return self._stream_text(lambda: self._create_image_request(image, prompt, stream=True), on_delta, "图像分析")
+
+    def analyze_text_stream(self, text: str, prompt: str = None, on_delta: Callable[[str], None] = None):
+        """流式分析从截图中识别出的文字，不需要视觉模型，也不读写对话历史
+
+        Args:
+            text: 截图中的文字
+            prompt: 可选的提示文本
+            on_delta: 接收增量文本的回调
+
+        Returns:
+            (是否成功, 完整的分析结果字符串)
+        """
+        content = f"{prompt or '请详细分析下面的内容。'}\n\n截图中的文字如下：\n```\n{text}\n```"
+
+        def create():
+            # 排在回答问题的请求之后
+            self.rate_limiter.acquire(self.chat_manager.token_counter.count(content) + self.max_tokens, PRIORITY_SCREENSHOT)
+            return self.retry_policy.call(
+                self.client.chat.completions.create,
+                model=self.model,
+                messages=[{"role": "user", "content": content}],
+                max_tokens=self.max_tokens,
+                stream=True
+            )
+
+        return self._stream_text(create, on_delta, "截图文字分析")
+
+    def _stream_text(self, create: Callable[[], Any], on_delta: Callable[[str], None], label: str) -> Tuple[bool, str]:
+        """发出流式请求并逐段回调文本，返回(是否成功, 完整结果)，失败时结果末尾是错误信息，label为错误信息中的操作名称"""
+        collected = []
+        try:
+            response = create()
+            try:
+                for chunk in response:
+                    if not chunk.choices:
+                        continue
+                    content = chunk.choices[0].delta.content
+                    if content:
+                        collected.append(content)
+                        if on_delta:
+                            on_delta(content)
+            finally:
+                response.close()
+            return True, "".join(collected)
+        except Exception as e:
+            print(f"{label}时发生错误: {str(e)}")
+            message = f"{label}失败: {str(e)}"
+            if collected and on_delta:
+                # 已经输出了部分结果，把错误接在后面
+                on_delta(f"\n\n{message}")
+            return False, "".join(collected) + message if collected else message
+
+    def _create_image_request(self, image: Union[str, ImagePayload], prompt: str, stream: bool):
+        """发出图像识别请求"""
+        # 缩放并编码图像，已经编码的直接使用
+        payload = to_payload(image)
+
+        # 准备消息内容
+        if not prompt:
+            prompt = "请详细分析这张图片中的内容。"
+
+        # 创建带有图像的消息
+        messages = [
+            {"role": "user", "content": [
+                {"type": "text", "text": prompt},
+                {"type": "image_url", "image_url": {"url": payload.data_url}}
+            ]}
+        ]
+
+        # 调用API，排在回答问题的请求之后
+        self.rate_limiter.acquire(IMAGE_PROMPT_TOKENS + self.max_tokens, PRIORITY_SCREENSHOT)
+        return self.retry_policy.call(
+            self.client.chat.completions.create,
+            model=self.VISION_MODEL or self.model,  # 使用支持视觉的模型
+            messages=messages,
+            max_tokens=self.max_tokens,
+            stream=stream
+        )
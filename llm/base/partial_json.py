@@ -0,0 +1,166 @@
+import json
+import re
+from typing import Any
+
+# 末尾孤立的高位代理项转义，需要等低位代理项到达后再一起解码
+_TRAILING_HIGH_SURROGATE = re.compile(r"\\u[dD][89abAB][0-9a-fA-F]{2}$")
+# 模型输出的字符串里偶尔有未转义的换行，不按严格模式拒绝
+_DECODER = json.JSONDecoder(strict=False)
+
+
+class PartialJSONParser:
+    """增量解析流式到达的JSON文本
+
+    每次feed只扫描、解码新到达的字符，边扫描边构造结果：遇到{、[时创建容器，
+    键、字符串和字面量写完后放入所在的容器，不会重新解析整个缓冲区。
+    未写完的字符串值会以当前已到达的前缀出现在结果中，未写完的键、数字和
+    true/false/null不会出现。返回的结果是同一个对象，每次feed原地更新；
+    正在写入的字符串值每次追加新解码的部分后整体替换。
+    """
+
+    def __init__(self):
+        self.text = ""
+        # 括号栈，元素为[括号, 期望的下一个元素, 容器, 当前的键]，期望为key/colon/value/comma
+        self._stack = []
+        self._in_string = False
+        self._string_is_key = False
+        # 字符串中还没有解码的部分在text中的起始位置，以及已经解码的前缀
+        self._string_start = 0
+        self._string_value = ""
+        # 正在写入的字符串值所在的位置
+        self._slot = None
+        self._escape_start = -1
+        self._unicode_left = 0
+        self._literal_start = -1
+        self._scanned = 0
+        self._result = None
+
+    def feed(self, chunk: str) -> Any:
+        """送入新到达的文本，返回当前能解析出的结果"""
+        if chunk:
+            self.text += chunk
+            self._scan()
+            if self._in_string and not self._string_is_key:
+                self._decode_string(self._safe_end())
+                self._set(self._slot, self._string_value)
+        return self._result
+
+    @property
+    def result(self) -> Any:
+        return self._result
+
+    def _scan(self):
+        text = self.text
+        i = self._scanned
+        n = len(text)
+        while i < n:
+            c = text[i]
+            if self._in_string:
+                if self._unicode_left:
+                    self._unicode_left -= 1
+                    if not self._unicode_left:
+                        self._escape_start = -1
+                elif self._escape_start >= 0:
+                    if c == "u":
+                        self._unicode_left = 4
+                    else:
+                        self._escape_start = -1
+                elif c == "\\":
+                    self._escape_start = i
+                elif c == '"':
+                    self._in_string = False
+                    self._decode_string(i)
+                    if self._string_is_key:
+                        self._stack[-1][3] = self._string_value
+                        self._stack[-1][1] = "colon"
+                    else:
+                        self._set(self._slot, self._string_value)
+                        self._value_done()
+                i += 1
+                continue
+            if self._literal_start >= 0:
+                if c in ",]}" or c.isspace():
+                    self._end_literal(i)
+                else:
+                    i += 1
+                    continue
+            if c.isspace():
+                pass
+            elif c == "{" or c == "[":
+                container = {} if c == "{" else []
+                self._put(container)
+                self._stack.append([c, "key" if c == "{" else "value", container, None])
+            elif c in "}]":
+                if self._stack:
+                    self._stack.pop()
+                self._value_done()
+            elif c == '"':
+                self._in_string = True
+                self._string_is_key = bool(self._stack) and self._stack[-1][1] == "key"
+                self._string_start = i + 1
+                self._string_value = ""
+                if not self._string_is_key:
+                    self._slot = self._put("")
+            elif c == ":":
+                if self._stack:
+                    self._stack[-1][1] = "value"
+            elif c == ",":
+                if self._stack:
+                    self._stack[-1][1] = "key" if self._stack[-1][0] == "{" else "value"
+            else:
+                self._literal_start = i
+            i += 1
+        self._scanned = n
+
+    def _safe_end(self) -> int:
+        """字符串中可以解码到的位置：不截断转义序列和代理项对"""
+        end = len(self.text)
+        if self._escape_start >= 0:
+            end = self._escape_start
+        match = _TRAILING_HIGH_SURROGATE.search(self.text, self._string_start, end)
+        if match:
+            end = match.start()
+        return end
+
+    def _decode_string(self, end: int):
+        """解码字符串中新到达的部分，追加到已解码的前缀"""
+        if end <= self._string_start:
+            return
+        try:
+            self._string_value += _DECODER.decode('"' + self.text[self._string_start:end] + '"')
+        except json.JSONDecodeError:
+            # 非法转义，丢弃这一段
+            pass
+        self._string_start = end
+
+    def _end_literal(self, end: int):
+        """数字或true/false/null写完"""
+        try:
+            self._put(json.loads(self.text[self._literal_start:end]))
+        except json.JSONDecodeError:
+            pass
+        self._literal_start = -1
+        self._value_done()
+
+    def _put(self, value):
+        """在当前位置放入一个值，返回它的位置，顶层的值位置为None"""
+        if not self._stack:
+            self._result = value
+            return None
+        _, _, container, key = self._stack[-1]
+        if isinstance(container, list):
+            container.append(value)
+            return container, len(container) - 1
+        container[key] = value
+        return container, key
+
+    def _set(self, slot, value):
+        if slot is None:
+            self._result = value
+        else:
+            container, key = slot
+            container[key] = value
+
+    def _value_done(self):
+        if self._stack:
+            self._stack[-1][1] = "comma"
@@ -0,0 +1,290 @@
+import asyncio
+import heapq
+import itertools
+import re
+import threading
+import time
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+
+# 优先级，数值越小越先执行：识别出的问题优先于截图分析
+PRIORITY_ANSWER = 0
+PRIORITY_SCREENSHOT = 10
+_PRIORITY_NAMES = {PRIORITY_ANSWER: "answer", PRIORITY_SCREENSHOT: "screenshot"}
+
+_DURATION = re.compile(r"([\d.]+)(ms|s|m|h)")
+_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """解析x-ratelimit-reset-*头中形如 1s、6m0s、20ms 的时长（秒）"""
+    if not value:
+        return None
+    parts = _DURATION.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(number) * _UNITS[unit] for number, unit in parts)
+
+
+class TokenBucket:
+    """令牌桶，容量为每分钟的限额，按限额/60的速度匀速补充"""
+
+    def __init__(self, per_minute: Optional[float] = None):
+        self.per_minute = None
+        self.level = 0.0
+        self._updated = time.monotonic()
+        self.set_limit(per_minute)
+
+    def set_limit(self, per_minute: Optional[float]):
+        """修改每分钟限额，None或0表示不限制"""
+        self._refill()
+        if not per_minute:
+            self.per_minute = None
+            return
+        if self.per_minute is None:
+            self.level = float(per_minute)
+        self.per_minute = float(per_minute)
+        self.level = min(self.level, self.per_minute)
+
+    def sync(self, remaining: float, reset: Optional[float] = None):
+        """按服务端返回的剩余额度校正，只向下校正，避免和其他客户端共用额度时超限"""
+        self._refill()
+        if self.per_minute is None:
+            return
+        self.level = min(self.level, float(remaining))
+        if reset and remaining <= 0:
+            # 额度用尽时，reset之后才会恢复
+            self.level = min(self.level, -self.per_minute / 60 * reset)
+
+    def wait_time(self, amount: float) -> float:
+        """取出amount个令牌还需要等待的时间"""
+        self._refill()
+        if self.per_minute is None:
+            return 0.0
+        # 单个请求超过整个容量时，等桶满即可放行
+        amount = min(amount, self.per_minute)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / (self.per_minute / 60)
+
+    def take(self, amount: float):
+        self._refill()
+        if self.per_minute is not None:
+            self.level -= min(amount, self.per_minute)
+
+    def refund(self, amount: float):
+        """归还预留多了的令牌，amount为负时补扣"""
+        self._refill()
+        if self.per_minute is not None:
+            self.level = min(self.per_minute, self.level + amount)
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.per_minute is not None:
+            self.level = min(self.per_minute, self.level + (now - self._updated) * self.per_minute / 60)
+        self._updated = now
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "tokens", "event", "loop")
+
+    def __init__(self, priority, seq, tokens, event, loop=None):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.event = event
+        self.loop = loop
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def wake(self):
+        if self.loop is None:
+            self.event.set()
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.event.set)
+
+
+class RateLimiter:
+    """按请求数和token数限流的调度器
+
+    请求按优先级排队，只有队首的请求在两个令牌桶都有足够额度时才会放行，
+    同优先级按到达顺序执行。限额可以在配置中指定，也会根据响应的x-ratelimit-*头自动调整；
+    收到429时暂停放行直到Retry-After之后。
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None):
+        """
+        Args:
+            requests_per_minute: 每分钟请求数限额，None表示等待服务端告知
+            tokens_per_minute: 每分钟token数限额，None表示等待服务端告知
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+        self._queue = []
+        self._seq = itertools.count()
+        # 统计
+        self.granted = 0
+        self.throttled = 0
+        self.rate_limited = 0
+        self.wait_total = {}
+        self.wait_max = {}
+        self.count = {}
+
+    def acquire(self, tokens: int = 0, priority: int = PRIORITY_ANSWER) -> float:
+        """阻塞到请求可以发出，返回排队等待的时间（秒）"""
+        start = time.monotonic()
+        waiter = self._enqueue(tokens, priority, threading.Event())
+        try:
+            while True:
+                wait = self._try_grant(waiter)
+                if wait is None:
+                    return self._record(priority, time.monotonic() - start)
+                waiter.event.wait(wait)
+        except BaseException:
+            self._remove(waiter)
+            raise
+
+    async def acquire_async(self, tokens: int = 0, priority: int = PRIORITY_ANSWER) -> float:
+        """异步等待到请求可以发出，返回排队等待的时间（秒），被取消时退出队列"""
+        start = time.monotonic()
+        waiter = self._enqueue(tokens, priority, asyncio.Event(), asyncio.get_running_loop())
+        try:
+            while True:
+                wait = self._try_grant(waiter)
+                if wait is None:
+                    return self._record(priority, time.monotonic() - start)
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._remove(waiter)
+            raise
+
+    def reconcile(self, reserved: int, used: int):
+        """请求完成后按实际使用的token数归还或补扣预留的额度"""
+        with self._lock:
+            self.tokens.refund(reserved - used)
+
+    def observe(self, status_code: int, headers):
+        """根据响应头调整限额"""
+        with self._lock:
+            for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+                limit = _number(headers.get(f"x-ratelimit-limit-{kind}"))
+                if limit:
+                    bucket.set_limit(limit)
+                remaining = _number(headers.get(f"x-ratelimit-remaining-{kind}"))
+                if remaining is not None:
+                    bucket.sync(remaining, parse_duration(headers.get(f"x-ratelimit-reset-{kind}")))
+            if status_code == 429:
+                self.rate_limited += 1
+                delay = parse_duration(headers.get("retry-after")) or 1.0
+                self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+            head = self._queue[0] if self._queue else None
+        if head:
+            head.wake()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "granted": self.granted,
+                "throttled": self.throttled,
+                "rate_limited": self.rate_limited,
+                "queued": len(self._queue),
+                "requests_per_minute": self.requests.per_minute,
+                "tokens_per_minute": self.tokens.per_minute,
+                "avg_wait": {_PRIORITY_NAMES.get(p, p): self.wait_total[p] / self.count[p] for p in self.count},
+                "max_wait": {_PRIORITY_NAMES.get(p, p): wait for p, wait in self.wait_max.items()}
+            }
+
+    def _enqueue(self, tokens, priority, event, loop=None):
+        waiter = _Waiter(priority, next(self._seq), tokens, event, loop)
+        with self._lock:
+            heapq.heappush(self._queue, waiter)
+        return waiter
+
+    def _try_grant(self, waiter) -> Optional[float]:
+        """waiter可以放行时取出额度并返回None，否则返回最多需要等待的时间"""
+        with self._lock:
+            waiter.event.clear()
+            if self._queue[0] is not waiter:
+                # 不在队首，等前面的请求放行后被唤醒
+                return 1.0
+            wait = max(self.blocked_until - time.monotonic(),
+                       self.requests.wait_time(1),
+                       self.tokens.wait_time(waiter.tokens))
+            if wait > 0:
+                return wait
+            self.requests.take(1)
+            self.tokens.take(waiter.tokens)
+            heapq.heappop(self._queue)
+            head = self._queue[0] if self._queue else None
+        if head:
+            head.wake()
+        return None
+
+    def _remove(self, waiter):
+        with self._lock:
+            if waiter not in self._queue:
+                return
+            was_head = self._queue[0] is waiter
+            self._queue.remove(waiter)
+            heapq.heapify(self._queue)
+            head = self._queue[0] if was_head and self._queue else None
+        if head:
+            head.wake()
+
+    def _record(self, priority, waited) -> float:
+        with self._lock:
+            self.granted += 1
+            if waited > 0.01:
+                self.throttled += 1
+            self.count[priority] = self.count.get(priority, 0) + 1
+            self.wait_total[priority] = self.wait_total.get(priority, 0.0) + waited
+            self.wait_max[priority] = max(self.wait_max.get(priority, 0.0), waited)
+        return waited
+
+
+def _number(value) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(host: str, requests_per_minute: Optional[float] = None,
+                     tokens_per_minute: Optional[float] = None) -> RateLimiter:
+    """获取某个服务地址共用的限流器，同一个API服务的所有客户端共享额度，限额只在第一次创建时生效"""
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = RateLimiter(requests_per_minute, tokens_per_minute)
+        return limiter
+
+
+def host_of(base_url: Optional[str]) -> str:
+    """服务地址的主机名，未指定base_url时为OpenAI官方地址"""
+    return (urlparse(base_url).hostname if base_url else None) or "api.openai.com"
+
+
+def observe_response(host: str, status_code: int, headers):
+    """httpx响应钩子调用，只更新已经创建的限流器"""
+    limiter = _limiters.get(host)
+    if limiter is not None:
+        limiter.observe(status_code, headers)
+
+
+def rate_limiter_stats() -> Dict[str, Any]:
+    with _limiters_lock:
+        return {host: limiter.stats for host, limiter in _limiters.items()}
@@ -0,0 +1,160 @@
+import math
+import threading
+import time
+from collections import deque
+from typing import List, Dict, Any
+
+from utils.text import QUESTION_END
+
+
+class LLMRequest:
+    """一次进行中的回答请求
+
+    sentences为请求覆盖的全部句子（被合并的旧请求的句子在前），
+    chunks为流式响应已收到的块数（不是token数），queue_wait为在限流器中排队的时间，
+    trace_id为延迟追踪中最后一句话的关联ID。
+    """
+
+    def __init__(self, sentences: List[str], start_time: float):
+        self.sentences = list(sentences)
+        self.start_time = start_time
+        self.last_sentence_time = time.time()
+        self.chunks = 0
+        self.queue_wait = 0.0
+        self.trace_id = None
+        self.visible = False
+        self.cancelled = False
+        self.finished = False
+        self._task = None
+        self._loop = None
+        self._lock = threading.Lock()
+
+    @property
+    def message(self) -> str:
+        return "".join(self.sentences)
+
+    def attach(self, task, loop) -> bool:
+        """绑定执行请求的asyncio任务，请求已被取消时返回False"""
+        with self._lock:
+            if self.cancelled:
+                return False
+            self._task = task
+            self._loop = loop
+            return True
+
+    def mark_visible(self):
+        """回答已开始显示，之后不会再被新句子取代"""
+        with self._lock:
+            self.visible = True
+
+    def cancel(self):
+        """取消请求，可以在任意线程调用"""
+        with self._lock:
+            self._cancel()
+
+    def supersede(self) -> bool:
+        """回答还没有显示时取消请求，返回是否已取消；与mark_visible互斥，不会取消已显示的回答"""
+        with self._lock:
+            if self.visible:
+                return False
+            return self._cancel()
+
+    def _cancel(self) -> bool:
+        if self.cancelled or self.finished:
+            return False
+        self.cancelled = True
+        if self._task is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        return True
+
+
+class RequestTracker:
+    """跟踪进行中的回答请求
+
+    新句子到达时，如果上一个请求还没有输出任何内容、上一句不是以疑问结尾
+    且两句间隔在merge_window之内，就认为新句子是在接着说同一个问题：
+    取消旧请求，把两句合并成一个请求重新发送。上一句已经是完整的问题时，
+    新句子是下一个问题，两个请求都保留。
+    """
+
+    def __init__(self, merge_window: float = 2.0, window: int = 1000):
+        """
+        Args:
+            merge_window: 与上一句的间隔不超过该值（秒）时才会合并
+            window: 统计延迟分位数时保留的最近请求数
+        """
+        self.merge_window = merge_window
+        self._lock = threading.Lock()
+        self._active = []
+        self.requests = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.merged_sentences = 0
+        self.cancelled_chunks = 0
+        self.latencies = deque(maxlen=window)
+
+    def begin(self, sentence: str, start_time: float) -> LLMRequest:
+        """为新句子创建请求，必要时取代仍未输出的上一个请求"""
+        with self._lock:
+            sentences = [sentence]
+            previous = self._active[-1] if self._active else None
+            if (previous and self._continues(previous)
+                    and time.time() - previous.last_sentence_time <= self.merge_window
+                    and previous.supersede()):
+                self._active.remove(previous)
+                sentences = previous.sentences + sentences
+                start_time = previous.start_time
+                self.merged_sentences += len(previous.sentences)
+            request = LLMRequest(sentences, start_time)
+            self._active.append(request)
+            self.requests += 1
+            return request
+
+    @staticmethod
+    def _continues(previous: LLMRequest) -> bool:
+        """上一句没有以疑问结尾时，新句子可能是在接着说"""
+        return not QUESTION_END.search(previous.sentences[-1])
+
+    def finish(self, request: LLMRequest, answered: bool = False):
+        """请求结束（完成、被取消或出错），answered为True时记录端到端延迟"""
+        with self._lock:
+            if request.finished:
+                return
+            request.finished = True
+            if request in self._active:
+                self._active.remove(request)
+            if request.cancelled:
+                self.cancelled += 1
+                self.cancelled_chunks += request.chunks
+            else:
+                self.completed += 1
+                if answered:
+                    self.latencies.append(time.time() - request.start_time)
+
+    def cancel_all(self):
+        """取消所有进行中的请求"""
+        with self._lock:
+            active = list(self._active)
+        for request in active:
+            request.cancel()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self.latencies)
+            return {
+                "requests": self.requests,
+                "completed": self.completed,
+                "cancelled": self.cancelled,
+                "merged_sentences": self.merged_sentences,
+                "cancelled_chunks": self.cancelled_chunks,
+                "latency_p50": _percentile(latencies, 0.5),
+                "latency_p95": _percentile(latencies, 0.95),
+                "latency_max": latencies[-1] if latencies else 0.0
+            }
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(q * len(values)) - 1)]
@@ -0,0 +1,255 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Optional
+
+# 可以重试的HTTP状态码：超时、冲突、限流以及服务端错误
+RETRYABLE_STATUS = {408, 409, 429}
+# 网络层异常的类名，openai和httpx的连接、超时异常都在其中
+RETRYABLE_ERROR_NAMES = {
+    "APIConnectionError", "APITimeoutError", "ConnectError", "ConnectTimeout", "ReadTimeout",
+    "ReadError", "WriteError", "RemoteProtocolError", "PoolTimeout", "TimeoutError", "ConnectionError"
+}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """判断异常是否值得重试：网络错误、超时、429和5xx可以重试，参数、鉴权等4xx错误不重试"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS or status >= 500
+    return any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """读取响应中的Retry-After头（秒）"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class RetryPolicy:
+    """LLM请求的重试与对冲策略
+
+    只对可重试的错误重试，退避时间为带全抖动的指数退避，总耗时不超过latency_budget。
+    开启hedge后，请求在最近延迟的p95之后仍未返回时再发一个相同的请求，采用先返回的结果。
+    策略作用在发起请求（对流式请求即等待响应头）这一步，已经开始输出的流不会重发。
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 4.0,
+                 latency_budget: float = 30.0, hedge: bool = False, hedge_min_delay: float = 1.0,
+                 hedge_min_samples: int = 20, window: int = 100):
+        """
+        Args:
+            max_attempts: 最多尝试次数
+            base_delay: 第一次重试前的最大等待时间（秒），之后每次翻倍
+            max_delay: 单次等待时间上限（秒）
+            latency_budget: 包含所有重试的总耗时上限（秒）
+            hedge: 是否开启对冲请求
+            hedge_min_delay: 对冲延迟的下限（秒）
+            hedge_min_samples: 累积到该数量的延迟样本后才开始对冲
+            window: 用于计算p95的最近样本数
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.latency_budget = latency_budget
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._executor = None
+        # 统计
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """同步执行fn，按策略重试或对冲"""
+        start = time.monotonic()
+        with self._lock:
+            self.calls += 1
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return self._call_once(fn, args, kwargs)
+            except Exception as e:
+                delay = self._next_delay(e, attempt, start)
+                if delay is None:
+                    with self._lock:
+                        self.failures += 1
+                    raise
+                print(f"LLM请求失败，{delay:.2f}秒后重试: {str(e)}")
+                time.sleep(delay)
+
+    async def call_async(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """异步执行协程函数fn，按策略重试或对冲"""
+        start = time.monotonic()
+        with self._lock:
+            self.calls += 1
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await self._call_once_async(fn, args, kwargs)
+            except Exception as e:
+                delay = self._next_delay(e, attempt, start)
+                if delay is None:
+                    with self._lock:
+                        self.failures += 1
+                    raise
+                print(f"LLM请求失败，{delay:.2f}秒后重试: {str(e)}")
+                await asyncio.sleep(delay)
+
+    @property
+    def hedge_delay(self) -> Optional[float]:
+        """当前的对冲延迟，样本不足或未开启对冲时为None"""
+        if not self.hedge:
+            return None
+        with self._lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        return max(self.hedge_min_delay, p95)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "retries": self.retries,
+                "failures": self.failures,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins
+            }
+
+    def _next_delay(self, error, attempt, start) -> Optional[float]:
+        """返回下一次重试前的等待时间，不应重试时返回None"""
+        if attempt >= self.max_attempts or not is_retryable(error):
+            return None
+        delay = retry_after(error)
+        if delay is None:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if time.monotonic() - start + delay > self.latency_budget:
+            return None
+        with self._lock:
+            self.retries += 1
+        return delay
+
+    def _record(self, latency):
+        with self._lock:
+            self._latencies.append(latency)
+
+    def _call_once(self, fn, args, kwargs):
+        hedge_delay = self.hedge_delay
+        started = time.monotonic()
+        if hedge_delay is None:
+            result = fn(*args, **kwargs)
+            self._record(time.monotonic() - started)
+            return result
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="llm-hedge")
+        primary = self._executor.submit(fn, *args, **kwargs)
+        done, _ = wait([primary], timeout=hedge_delay)
+        if done:
+            result = primary.result()
+            self._record(time.monotonic() - started)
+            return result
+        with self._lock:
+            self.hedges += 1
+        backup = self._executor.submit(fn, *args, **kwargs)
+        pending = {primary, backup}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    self._record(time.monotonic() - started)
+                    # 另一个请求完成后关闭它的响应
+                    for other in (done | pending) - {future}:
+                        other.add_done_callback(_close_future_result)
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def _call_once_async(self, fn, args, kwargs):
+        hedge_delay = self.hedge_delay
+        started = time.monotonic()
+        if hedge_delay is None:
+            result = await fn(*args, **kwargs)
+            self._record(time.monotonic() - started)
+            return result
+        primary = asyncio.ensure_future(fn(*args, **kwargs))
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+        if done:
+            result = primary.result()
+            self._record(time.monotonic() - started)
+            return result
+        with self._lock:
+            self.hedges += 1
+        backup = asyncio.ensure_future(fn(*args, **kwargs))
+        pending = {primary, backup}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            with self._lock:
+                                self.hedge_wins += 1
+                        self._record(time.monotonic() - started)
+                        for other in done - {task}:
+                            if other.exception() is None:
+                                asyncio.ensure_future(_aclose(other.result()))
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+def _close_future_result(future):
+    if future.exception() is None:
+        close = getattr(future.result(), "close", None)
+        if close:
+            try:
+                close()
+            except Exception:
+                pass
+
+
+async def _aclose(result):
+    close = getattr(result, "close", None)
+    if close:
+        try:
+            await close()
+        except Exception:
+            pass
@@ -0,0 +1,135 @@
+import argparse
+import importlib.util
+import json
+import re
+import threading
+from typing import Dict, Any, Optional
+
+# tiktoken导入较慢，只检查是否安装，第一次计数时再导入
+TIKTOKEN_AVAILABLE = importlib.util.find_spec("tiktoken") is not None
+
+# 每条消息在role、分隔符上的固定开销
+MESSAGE_OVERHEAD = 4
+_CJK = re.compile(r"[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]")
+
+_encodings = {}
+_encodings_lock = threading.Lock()
+
+
+def _get_encoding(model: Optional[str]):
+    """按模型获取tiktoken编码，加载失败（未安装或无法下载词表）时返回None"""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    with _encodings_lock:
+        if model not in _encodings:
+            encoding = None
+            try:
+                import tiktoken
+                encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("cl100k_base")
+            except KeyError:
+                try:
+                    encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception:
+                    encoding = None
+            except Exception:
+                encoding = None
+            _encodings[model] = encoding
+        return _encodings[model]
+
+
+class TokenCounter:
+    """计算消息的token数
+
+    优先使用tiktoken，不可用时按中日韩字符每字一个token、其他字符每4个一个token估算。
+    """
+
+    def __init__(self, model: str = None):
+        self.model = model
+        self._encoding = _get_encoding(model)
+
+    def count(self, text: Optional[str]) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        cjk = len(_CJK.findall(text))
+        return cjk + (len(text) - cjk + 3) // 4
+
+    def count_message(self, role: str, content: Optional[str] = None, function_call: Optional[Dict[str, Any]] = None,
+                      name: Optional[str] = None) -> int:
+        """计算一条消息的token数"""
+        tokens = MESSAGE_OVERHEAD + self.count(role) + self.count(content) + self.count(name)
+        if function_call:
+            tokens += self.count(function_call.get("name")) + self.count(function_call.get("arguments"))
+        return tokens
+
+
+def replay(path: str, chat_manager_factory, counter: TokenCounter) -> Dict[str, Any]:
+    """
+    用一场面试的问答记录回放聊天历史，统计每次请求的提示词token数
+    Args:
+        path: JSONL文件，每行形如 {"question": "...", "simplified_answer": "...", "detailed_answer": "..."}
+        chat_manager_factory: 创建聊天管理器的无参函数
+        counter: token计数器
+    Returns:
+        dict: 请求数、提示词token总数、平均和最大值
+    """
+    manager = chat_manager_factory()
+    prompt_tokens = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            manager.add_user_message(item["question"])
+            prompt_tokens.append(sum(
+                counter.count_message(m["role"], m.get("content"), m.get("function_call"), m.get("name"))
+                for m in manager.get_messages()
+            ))
+            arguments = json.dumps({
+                "is_interview_question": True,
+                "simplified_answer": item.get("simplified_answer", ""),
+                "detailed_answer": item.get("detailed_answer", "")
+            }, ensure_ascii=False)
+            manager.add_function_call(name="answer_interview_question", arguments=arguments)
+    return {
+        "requests": len(prompt_tokens),
+        "prompt_tokens": sum(prompt_tokens),
+        "avg_prompt_tokens": sum(prompt_tokens) / len(prompt_tokens) if prompt_tokens else 0.0,
+        "max_prompt_tokens": max(prompt_tokens) if prompt_tokens else 0
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="回放一场面试，对比按消息条数和按token预算裁剪历史的提示词token数")
+    parser.add_argument("replay", help="JSONL问答记录")
+    parser.add_argument("--model", default="gpt-4o-mini", help="用于计数的模型")
+    parser.add_argument("--max-messages", type=int, default=10, help="最大历史消息条数")
+    parser.add_argument("--max-history-tokens", type=int, default=3000, help="历史token预算")
+    parser.add_argument("--price", type=float, default=0.15, help="每百万输入token的价格，用于估算费用")
+    args = parser.parse_args(argv)
+
+    from ..openai.openai_chat_manager import OpenAIChatManager
+    system_message = "你是一个求职助手，旨在帮助用户检测并回答面试过程中被提问的问题。"
+    counter = TokenCounter(args.model)
+    by_count = replay(args.replay, lambda: OpenAIChatManager(
+        max_messages=args.max_messages, system_message=system_message, model=args.model,
+        max_history_tokens=None), counter)
+    by_budget = replay(args.replay, lambda: OpenAIChatManager(
+        max_messages=args.max_messages, system_message=system_message, model=args.model,
+        max_history_tokens=args.max_history_tokens), counter)
+    saved = by_count["prompt_tokens"] - by_budget["prompt_tokens"]
+    result = {
+        "message_count_only": by_count,
+        "token_budget": by_budget,
+        "prompt_tokens_saved": saved,
+        "saved_ratio": saved / by_count["prompt_tokens"] if by_count["prompt_tokens"] else 0.0,
+        "cost_saved": saved * args.price / 1e6,
+        "tokenizer": "tiktoken" if counter._encoding is not None else "estimate"
+    }
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import threading
+from typing import Dict, Any, Optional
+
+
+class UsageStats:
+    """记录每次请求的提示词token数和前缀缓存命中情况
+
+    estimated为发送前由聊天管理器计算的历史token数，
+    prompt/completion/cached为服务端在usage中返回的实际值（流式请求需要include_usage）。
+    按是否命中前缀缓存分别统计首个响应块的耗时，用来衡量缓存节省的延迟。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.estimated_prompt_tokens = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.build_time_total = 0.0
+        self.build_time_max = 0.0
+        self.first_chunk_time_cached = []
+        self.first_chunk_time_uncached = []
+        self.last = None
+
+    def record(self, estimated: int, usage=None, first_chunk_time: Optional[float] = None,
+               build_time: float = 0.0):
+        """
+        记录一次请求
+        Args:
+            estimated: 估算的提示词token数
+            usage: 响应中的usage对象，可以为None
+            first_chunk_time: 从发出请求到收到第一个响应块的耗时（秒）
+            build_time: 构建请求消息列表的耗时（秒）
+        """
+        prompt = getattr(usage, "prompt_tokens", None) if usage is not None else None
+        completion = getattr(usage, "completion_tokens", None) if usage is not None else None
+        cached = cached_prompt_tokens(usage)
+        with self._lock:
+            self.requests += 1
+            self.estimated_prompt_tokens += estimated
+            self.prompt_tokens += prompt or 0
+            self.completion_tokens += completion or 0
+            self.cached_tokens += cached or 0
+            self.build_time_total += build_time
+            self.build_time_max = max(self.build_time_max, build_time)
+            if first_chunk_time is not None:
+                if cached:
+                    self.first_chunk_time_cached.append(first_chunk_time)
+                else:
+                    self.first_chunk_time_uncached.append(first_chunk_time)
+            self.last = {"estimated_prompt_tokens": estimated, "prompt_tokens": prompt,
+                         "completion_tokens": completion, "cached_tokens": cached}
+        print(f"提示词token数: 估算{estimated}，实际{prompt}，命中缓存{cached}")
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "avg_estimated_prompt_tokens": self.estimated_prompt_tokens / self.requests if self.requests else 0.0,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "avg_prompt_tokens": self.prompt_tokens / self.requests if self.requests else 0.0,
+                "cached_tokens": self.cached_tokens,
+                "cache_hit_rate": self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0,
+                "avg_first_chunk_time_cached": _mean(self.first_chunk_time_cached),
+                "avg_first_chunk_time_uncached": _mean(self.first_chunk_time_uncached),
+                "avg_build_time": self.build_time_total / self.requests if self.requests else 0.0,
+                "max_build_time": self.build_time_max
+            }
+
+
+def cached_prompt_tokens(usage) -> Optional[int]:
+    """读取命中前缀缓存的token数，OpenAI在prompt_tokens_details中，DeepSeek为prompt_cache_hit_tokens"""
+    if usage is None:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details is not None else None
+    if cached is None:
+        cached = getattr(usage, "prompt_cache_hit_tokens", None)
+    return cached
+
+
+def _mean(values):
+    return sum(values) / len(values) if values else 0.0
@@ -0,0 +1,246 @@
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+# 识别结果中常见的语气词和口头禅，归一化时去掉
+FILLER_WORDS = ("嗯", "啊", "呃", "额", "哦", "那个", "就是说", "然后呢", "请问", "我想问一下", "你能")
+_PUNCTUATION = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_question(text: str) -> str:
+    """归一化问题文本：全角转半角、小写、去掉标点空白和语气词"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    for word in FILLER_WORDS:
+        text = text.replace(word, "")
+    return _PUNCTUATION.sub("", text)
+
+
+def _ngrams(key: str, n: int = 2) -> set:
+    if len(key) < n:
+        return {key} if key else set()
+    return {key[i:i + n] for i in range(len(key) - n + 1)}
+
+
+class AnswerCache:
+    """面试问题答案缓存
+
+    以(面试岗位, 归一化后的问题)为键保存简略答案和详细答案，先精确匹配，
+    再通过字符二元组倒排索引做近似匹配（Dice系数不低于similarity即命中）。
+    同一个问题在不同岗位下的答案不同，只复用同一岗位的答案；岗位为空的条目（例如预热文件中的通用问题）对所有岗位可用。
+    条目按LRU淘汰并有过期时间，缓存文件保存在磁盘上以便跨会话复用。
+    """
+
+    def __init__(self, path: str = None, max_entries: int = 2000, ttl: float = 30 * 24 * 3600,
+                 similarity: float = 0.8):
+        """
+        Args:
+            path: 缓存文件路径，为None时只在内存中缓存
+            max_entries: 最大条目数，超过后淘汰最久未使用的条目
+            ttl: 条目过期时间（秒），<=0表示不过期
+            similarity: 近似匹配的最低相似度
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity
+        self._entries = OrderedDict()
+        self._index = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            self.load()
+
+    def get(self, question: str, interview_type: str = "") -> Optional[Tuple[str, str]]:
+        """
+        查找问题的缓存答案
+        Args:
+            question: 问题
+            interview_type: 面试岗位
+        Returns:
+            (简略答案, 详细答案)，未命中返回None
+        """
+        key = normalize_question(question)
+        if not key:
+            return None
+        with self._lock:
+            entry = self._lookup(interview_type or "", key)
+            if entry is None:
+                self.misses += 1
+                return None
+            entry["hits"] += 1
+            entry["last_used"] = time.time()
+            self._entries.move_to_end(_entry_key(entry))
+            self._dirty = True
+            return entry["simplified_answer"], entry["detailed_answer"]
+
+    def put(self, question: str, simplified_answer: str, detailed_answer: str, interview_type: str = ""):
+        """写入一个问题在某个面试岗位下的答案，岗位为空时对所有岗位可用"""
+        key = normalize_question(question)
+        if not key or not simplified_answer:
+            return
+        now = time.time()
+        with self._lock:
+            self._insert({
+                "key": key,
+                "interview_type": interview_type or "",
+                "question": question,
+                "simplified_answer": simplified_answer,
+                "detailed_answer": detailed_answer or "",
+                "created": now,
+                "last_used": now,
+                "hits": 0
+            })
+            self._dirty = True
+
+    def warm_up(self, path: str) -> int:
+        """
+        从整理好的问题文件预热缓存
+        Args:
+            path: JSONL文件，每行形如 {"question": "...", "simplified_answer": "...", "detailed_answer": "..."}，
+                可以带 "interview_type" 只对该岗位生效
+        Returns:
+            int: 加载的条目数
+        """
+        count = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                item = json.loads(line)
+                self.put(item["question"], item["simplified_answer"], item.get("detailed_answer", ""),
+                         item.get("interview_type", ""))
+                count += 1
+        return count
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """命中统计"""
+        with self._lock:
+            lookups = self.exact_hits + self.fuzzy_hits + self.misses
+            hits = self.exact_hits + self.fuzzy_hits
+            return {
+                "entries": len(self._entries),
+                "lookups": lookups,
+                "exact_hits": self.exact_hits,
+                "fuzzy_hits": self.fuzzy_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0
+            }
+
+    def load(self):
+        """从磁盘加载缓存，已过期的条目直接丢弃"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("entries", [])
+        except Exception as e:
+            print(f"加载答案缓存失败: {str(e)}")
+            return
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+            # 文件中按最近使用时间从旧到新排列
+            for entry in entries:
+                if not self._expired(entry):
+                    self._insert(entry)
+            self._dirty = False
+
+    def save(self):
+        """把缓存写回磁盘，先写临时文件再替换，避免写到一半损坏"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": 1, "entries": list(self._entries.values())}
+            self._dirty = False
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"保存答案缓存失败: {str(e)}")
+
+    def _lookup(self, interview_type, key):
+        # 先找本岗位的条目，再找通用条目
+        scopes = (interview_type, "") if interview_type else ("",)
+        for scope in scopes:
+            entry = self._entries.get((scope, key))
+            if entry is None:
+                continue
+            if self._expired(entry):
+                self._remove((scope, key))
+            else:
+                self.exact_hits += 1
+                return entry
+        grams = _ngrams(key)
+        if not grams:
+            return None
+        # 统计与候选条目共有的二元组数量
+        overlap = {}
+        for gram in grams:
+            for candidate in self._index.get(gram, ()):
+                if candidate[0] in scopes:
+                    overlap[candidate] = overlap.get(candidate, 0) + 1
+        best_key, best_score = None, 0.0
+        for candidate, common in overlap.items():
+            score = 2.0 * common / (len(grams) + len(self._entries[candidate].grams))
+            if score > best_score:
+                best_key, best_score = candidate, score
+        if best_key is None or best_score < self.similarity:
+            return None
+        entry = self._entries[best_key]
+        if self._expired(entry):
+            self._remove(best_key)
+            return None
+        self.fuzzy_hits += 1
+        return entry
+
+    def _insert(self, entry):
+        key = _entry_key(entry)
+        if key in self._entries:
+            self._remove(key)
+        grams = _ngrams(entry["key"])
+        self._entries[key] = _Entry(entry, grams)
+        for gram in grams:
+            self._index.setdefault(gram, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for gram in entry.grams:
+            keys = self._index.get(gram)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._index[gram]
+
+    def _expired(self, entry) -> bool:
+        return self.ttl > 0 and time.time() - entry["created"] > self.ttl
+
+
+def _entry_key(entry):
+    """条目在缓存中的键，旧版缓存文件中的条目没有岗位，按通用条目处理"""
+    return entry.get("interview_type", ""), entry["key"]
+
+
+class _Entry(dict):
+    """缓存条目，grams为问题的二元组集合，不参与序列化"""
+
+    def __init__(self, data, grams):
+        super().__init__(data)
+        self.grams = grams
@@ -1,69 +1,61 @@
 from llm.base.llm_base import ChatManagerBase,ChatMessage
 import json
-from typing import Dict, Any,List
+from typing import Dict, Any, List, Optional, Union
 
 class DeepSeekChatManager(ChatManagerBase):
     """DeepSeek聊天上下文和消息历史管理"""
-    def __init__(self,max_messages: int = 10,system_message: str = None,interview_type: str = None):
-        super().__init__(max_messages = max_messages,system_message = system_message,interview_type = interview_type)
+    def __init__(self,max_messages: int = 10,system_message: str = None,interview_type: str = None,
+                 model: str = None, max_history_tokens: Optional[int] = 3000):
+        super().__init__(max_messages = max_messages,system_message = system_message,interview_type = interview_type,
+                         model = model, max_history_tokens = max_history_tokens)
         pass
     
     def set_system_message(self, content: str,interview_type: str = None) -> None:
         """设置系统消息，确保只有一个系统消息且在最前面"""
+        message = ChatMessage(role="system", content=content)
+        self._count_tokens(message)
         if self.messages and self.messages[0].role == "system":
-            self.messages[0].content = content
+            self.messages[0] = message
         else:
-            self.messages.insert(0, ChatMessage(role="system", content=content))
+            self.messages.insert(0, message)
+        self._history_changed()
         pass
 
     def add_user_message(self, content: str) -> None:
         """添加用户消息"""
-        self.messages.append(ChatMessage(role="user", content=content))
-        self._maintain_conversation_history()
+        self._append(ChatMessage(role="user", content=content))
         pass
         
     def add_assistant_message(self, content: str) -> None:
         """添加助手消息"""
-        self.messages.append(ChatMessage(role="assistant", content=content))
-        self._maintain_conversation_history()
+        self._append(ChatMessage(role="assistant", content=content))
         pass
     
-    def add_function_call(self, name: str, arguments: Dict[str, Any]) -> None:
-        """添加函数调用消息"""
-        self.messages.append(ChatMessage(
+    def add_function_call(self, name: str, arguments: Union[str, Dict[str, Any]]) -> None:
+        """添加函数调用消息，模型返回的参数已经是JSON字符串，不再重复编码"""
+        if not isinstance(arguments, str):
+            arguments = json.dumps(arguments, ensure_ascii=False)
+        self._append(ChatMessage(
             role="assistant",
             function_call={
                 "name": name,
-                "arguments": json.dumps(arguments)
+                "arguments": arguments
             }
         ))
-        self._maintain_conversation_history()
         pass
         
     def add_function_result(self, name: str, result: Any) -> None:
         """添加函数返回结果消息"""
-        self.messages.append(ChatMessage(
+        self._append(ChatMessage(
             role="function",
             name=name,
             content=str(result)
         ))
-        self._maintain_conversation_history()
-        pass
-    
-    def _maintain_conversation_history(self) -> None:
-        """维护对话历史，当超出最大消息数量时删除最早的两条消息，但保留系统消息"""
-        # 计算非系统消息的数量
-        non_system_messages = len(self.messages) - 1  # 减去系统消息
-        
-        # 如果超出限制，删除最早的两条非系统消息
-        if non_system_messages > self.max_messages:
-            # 删除索引1和2的消息（保留系统消息）
-            del self.messages[1:3]
         pass
     
     def get_messages(self) -> List[Dict[str, Any]]:
-        """获取所有消息的OpenAI格式"""
-        return [msg.to_dict() for msg in self.messages]
+        """获取所有消息的OpenAI格式，返回的列表会被复用，调用方不要修改"""
+        return self._serialized_messages()
         pass
 
     def clear_history(self, keep_system_message: bool = True) -> None:
@@ -73,4 +65,5 @@ class DeepSeekChatManager(ChatManagerBase):
             self.messages = [system_message]
         else:
             self.messages.clear()
+        self._history_changed()
         pass
\ No newline at end of file
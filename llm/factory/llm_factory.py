@@ -1,4 +1,6 @@
 from ..base.llm_base import LLMBase
+from ..base.retry_policy import RetryPolicy
+from ..base.rate_limiter import RateLimiter, get_rate_limiter, host_of
 import os
 class LLMFactory:
     """LLM工厂类"""
@@ -16,14 +18,86 @@ class LLMFactory:
         """
         if provider.lower() == 'openai':
             from ..openai.openai_client import OpenAIClient
-            return OpenAIClient(model=model, interview_type=interview_type,system_message=system_message,base_url=os.getenv("OPENAI_BASE_URL"))
+            return OpenAIClient(model=model, interview_type=interview_type,system_message=system_message,base_url=os.getenv("OPENAI_BASE_URL"),retry_policy=LLMFactory.create_retry_policy(),rate_limiter=LLMFactory.create_rate_limiter(os.getenv("OPENAI_BASE_URL")))
         elif provider.lower() == 'deepseek':
             from ..deepseek.deepseek_client import DeepSeekClient
-            return DeepSeekClient(model=model, interview_type=interview_type,system_message=system_message,base_url=os.getenv("DEEPSEEK_BASE_URL"))
+            return DeepSeekClient(model=model, interview_type=interview_type,system_message=system_message,base_url=os.getenv("DEEPSEEK_BASE_URL"),retry_policy=LLMFactory.create_retry_policy(),rate_limiter=LLMFactory.create_rate_limiter(os.getenv("DEEPSEEK_BASE_URL")))
         # 在这里添加其他提供商的支持
         else:
             raise ValueError(f"不支持的LLM提供商: {provider}")
             
+    @staticmethod
+    def create_rate_limiter(base_url: str = None) -> RateLimiter:
+        """
+        获取服务地址共用的限流器，初始限额取自配置文件的llm_rate_limit部分
+        
+        Args:
+            base_url: API服务地址，为空时为OpenAI官方地址
+            
+        Returns:
+            RateLimiter: 限流器实例
+        """
+        from config.config_loader import ConfigLoader
+        limit_config = ConfigLoader().llm_rate_limit_config
+        return get_rate_limiter(
+            host_of(base_url or None),
+            requests_per_minute=limit_config['requests_per_minute'] or None,
+            tokens_per_minute=limit_config['tokens_per_minute'] or None
+        )
+            
+    @staticmethod
+    def create_routing_client(preferred: str, interview_type: str, system_message: str) -> LLMBase:
+        """
+        按配置文件的llm_routing部分创建在多个后端之间路由的LLM客户端
+        
+        Args:
+            preferred: 界面上选择的提供商，没有配置后端列表时作为第一个后端
+            interview_type: 面试岗位
+            system_message: 系统提示词
+            
+        Returns:
+            LLMBase: 路由客户端实例
+        """
+        from config.config_loader import ConfigLoader
+        from ..openai.openai_client import OpenAIClient
+        from ..deepseek.deepseek_client import DeepSeekClient
+        from ..router.routing_client import RoutingClient
+        routing_config = ConfigLoader().llm_routing_config
+        backends = routing_config['backends']
+        if not backends:
+            # 没有配置后端列表时，在OpenAI和DeepSeek之间切换，界面选择的优先
+            providers = ['openai', 'deepseek']
+            providers.sort(key=lambda provider: provider != preferred.lower())
+            backends = [{'name': provider, 'provider': provider} for provider in providers]
+        
+        clients = {}
+        chat_manager = None
+        for backend in backends:
+            provider = backend.get('provider', 'openai').lower()
+            if provider not in ('openai', 'deepseek'):
+                print(f"不支持的LLM后端协议: {provider}")
+                continue
+            client_class = OpenAIClient if provider == 'openai' else DeepSeekClient
+            prefix = provider.upper()
+            base_url = backend.get('base_url') or os.getenv(f"{prefix}_BASE_URL")
+            try:
+                client = client_class(
+                    model=backend.get('model') or os.getenv(f"{prefix}_MODEL"),
+                    interview_type=interview_type,
+                    system_message=system_message,
+                    base_url=base_url,
+                    api_key=backend.get('api_key') or None,
+                    chat_manager=chat_manager,
+                    retry_policy=LLMFactory.create_retry_policy(),
+                    rate_limiter=LLMFactory.create_rate_limiter(base_url)
+                )
+            except ValueError as e:
+                print(f"跳过LLM后端{backend.get('name', provider)}: {str(e)}")
+                continue
+            chat_manager = client.chat_manager
+            clients[backend.get('name') or f"{provider}-{len(clients)}"] = client
+        return RoutingClient(clients, window=routing_config['window'], cooldown=routing_config['cooldown'])
+            
     @staticmethod
     def create_image_recognition_client(provider: str = 'openai', model: str = 'gpt-4o') -> LLMBase:
         """
@@ -40,11 +114,63 @@ class LLMFactory:
             from ..openai.openai_client import OpenAIClient
             return OpenAIClient(model=model, interview_type="screenshot", 
                                system_message="你是一个图像识别助手，可以分析截图并提供详细解释。", 
-                               base_url=os.getenv("OPENAI_BASE_URL"))
+                               base_url=os.getenv("OPENAI_BASE_URL"),
+                               retry_policy=LLMFactory.create_retry_policy(),
+                               rate_limiter=LLMFactory.create_rate_limiter(os.getenv("OPENAI_BASE_URL")))
         elif provider.lower() == 'deepseek':
             from ..deepseek.deepseek_client import DeepSeekClient
             return DeepSeekClient(model=model, interview_type="screenshot", 
                                  system_message="你是一个图像识别助手，可以分析截图并提供详细解释。", 
-                                 base_url=os.getenv("DEEPSEEK_BASE_URL"))
+                                 base_url=os.getenv("DEEPSEEK_BASE_URL"),
+                                 retry_policy=LLMFactory.create_retry_policy(),
+                                 rate_limiter=LLMFactory.create_rate_limiter(os.getenv("DEEPSEEK_BASE_URL")))
+        else:
+            raise ValueError(f"不支持的图像识别LLM提供商: {provider}")
+            
+    @staticmethod
+    def create_retry_policy() -> RetryPolicy:
+        """
+        按配置文件的llm_retry部分创建重试与对冲策略
+        
+        Returns:
+            RetryPolicy: 重试策略实例
+        """
+        from config.config_loader import ConfigLoader
+        retry_config = ConfigLoader().llm_retry_config
+        return RetryPolicy(
+            max_attempts=retry_config['max_attempts'],
+            latency_budget=retry_config['latency_budget'],
+            hedge=retry_config['hedge'],
+            hedge_min_delay=retry_config['hedge_min_delay']
+        )
+            
+    @staticmethod
+    def create_question_detector(kind: str = 'keyword', provider: str = 'openai', model: str = None, keywords=()):
+        """
+        创建问题预判器
+        
+        Args:
+            kind: 预判器类型 ('keyword' 本地关键词打分, 'llm' 小模型判断)
+            provider: kind为llm时使用的提供商
+            model: kind为llm时使用的小模型
+            keywords: kind为keyword时的额外关键词
+            
+        Returns:
+            QuestionDetectorBase: 问题预判器实例
+        """
+        from ..filter.question_detector import KeywordQuestionDetector, LLMQuestionDetector
+        if kind.lower() == 'keyword':
+            return KeywordQuestionDetector(keywords=keywords)
+        elif kind.lower() == 'llm':
+            import openai
+            from ..base.http_pool import get_http_client
+            prefix = 'OPENAI' if provider.lower() == 'openai' else 'DEEPSEEK'
+            client = openai.OpenAI(
+                base_url=os.getenv(f"{prefix}_BASE_URL") or None,
+                api_key=os.getenv(f"{prefix}_API_KEY"),
+                timeout=10,
+                http_client=get_http_client()
+            )
+            return LLMQuestionDetector(client, model or os.getenv(f"{prefix}_MODEL"))
         else:
-            raise ValueError(f"不支持的图像识别LLM提供商: {provider}") 
\ No newline at end of file
+            raise ValueError(f"不支持的问题预判器类型: {kind}")
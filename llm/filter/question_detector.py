@@ -0,0 +1,195 @@
+import argparse
+import json
+import re
+import threading
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Dict, Any, Tuple
+
+
+class QuestionDetectorBase(ABC):
+    """问题预判基类
+
+    在调用回答模型之前判断一句话是否需要回答，只有被接受的句子才会发送给on_function_call。
+    """
+
+    def __init__(self):
+        self.accepted = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def score(self, sentence: str) -> float:
+        """返回句子是面试问题的得分，大于等于threshold即接受"""
+        pass
+
+    @property
+    @abstractmethod
+    def threshold(self) -> float:
+        pass
+
+    def accept(self, sentence: str) -> bool:
+        """判断句子是否需要交给回答模型，并记录统计"""
+        accepted = self.score(sentence) >= self.threshold
+        with self._lock:
+            if accepted:
+                self.accepted += 1
+            else:
+                self.rejected += 1
+        return accepted
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """统计信息，rejected即节省的LLM调用次数"""
+        with self._lock:
+            total = self.accepted + self.rejected
+            return {
+                "sentences": total,
+                "accepted": self.accepted,
+                "llm_calls_saved": self.rejected,
+                "saved_ratio": self.rejected / total if total else 0.0
+            }
+
+
+class KeywordQuestionDetector(QuestionDetectorBase):
+    """基于疑问词、问号和闲聊短语的本地打分器，不产生任何网络调用"""
+
+    QUESTION_MARKS = ("？", "?")
+    INTERROGATIVES = ("什么", "怎么", "如何", "为什么", "为啥", "哪些", "哪个", "哪种", "多少",
+                      "是否", "有没有", "能不能", "会不会", "区别", "原理", "优缺点", "作用",
+                      "吗", "呢")
+    REQUESTS = ("介绍一下", "讲一下", "讲讲", "说一下", "说说", "谈谈", "聊聊", "解释",
+                "描述一下", "举个例子", "实现一下", "手写", "设计一个")
+    CHIT_CHAT = ("你好", "您好", "好的", "嗯", "谢谢", "能听到", "听得到", "听得见",
+                 "稍等", "没问题", "再见", "可以了", "看得到")
+
+    def __init__(self, keywords: Iterable[str] = (), threshold: float = 1.0, min_length: int = 4):
+        """
+        Args:
+            keywords: 额外的领域关键词（例如岗位相关的技术名词），命中加分
+            threshold: 接受阈值，偏低以保证召回
+            min_length: 去掉标点后短于该长度的句子直接拒绝
+        """
+        super().__init__()
+        self.keywords = tuple(k.lower() for k in keywords if k)
+        self._threshold = threshold
+        self.min_length = min_length
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold
+
+    def score(self, sentence: str) -> float:
+        text = (sentence or "").strip()
+        bare = re.sub(r"[\s，。！？、,.!?;；:：]", "", text)
+        if len(bare) < self.min_length:
+            return 0.0
+        score = 0.0
+        if text.endswith(self.QUESTION_MARKS):
+            score += 2
+        elif any(mark in text for mark in self.QUESTION_MARKS):
+            score += 1
+        score += min(2, sum(1 for word in self.INTERROGATIVES if word in text))
+        if any(word in text for word in self.REQUESTS):
+            score += 2
+        lowered = text.lower()
+        score += min(2, sum(1 for word in self.keywords if word in lowered))
+        if any(word in text for word in self.CHIT_CHAT) and len(bare) < 12:
+            score -= 2
+        return score
+
+
+class LLMQuestionDetector(QuestionDetectorBase):
+    """使用小而快的模型做二分类，只输出一个字，成本远低于完整回答"""
+
+    PROMPT = ("你是面试问题判断器。用户给出面试中面试官说的一句话，"
+              "如果这句话是在向候选人提出需要回答的问题，只输出1，否则只输出0。")
+
+    def __init__(self, client, model: str):
+        """
+        Args:
+            client: openai.OpenAI兼容的客户端
+            model: 用于判断的小模型
+        """
+        super().__init__()
+        self.client = client
+        self.model = model
+
+    @property
+    def threshold(self) -> float:
+        return 0.5
+
+    def score(self, sentence: str) -> float:
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": self.PROMPT},
+                    {"role": "user", "content": sentence}
+                ],
+                temperature=0,
+                max_tokens=1
+            )
+            content = (response.choices[0].message.content or "").strip()
+            return 1.0 if content.startswith("1") else 0.0
+        except Exception as e:
+            # 判断失败时放行，交给回答模型处理
+            print(f"问题预判调用失败: {str(e)}")
+            return 1.0
+
+
+def evaluate(detector: QuestionDetectorBase, samples: Iterable[Tuple[str, bool]]) -> Dict[str, Any]:
+    """
+    在带标注的回放集上评估预判器
+    Args:
+        detector: 预判器
+        samples: (句子, 是否是面试问题) 序列
+    Returns:
+        dict: precision、recall以及节省的LLM调用次数
+    """
+    tp = fp = fn = tn = 0
+    for sentence, label in samples:
+        predicted = detector.score(sentence) >= detector.threshold
+        if predicted and label:
+            tp += 1
+        elif predicted:
+            fp += 1
+        elif label:
+            fn += 1
+        else:
+            tn += 1
+    total = tp + fp + fn + tn
+    return {
+        "samples": total,
+        "precision": tp / (tp + fp) if tp + fp else 0.0,
+        "recall": tp / (tp + fn) if tp + fn else 0.0,
+        "llm_calls_saved": fn + tn,
+        "saved_ratio": (fn + tn) / total if total else 0.0,
+        "missed_questions": fn
+    }
+
+
+def load_replay_set(path: str) -> List[Tuple[str, bool]]:
+    """读取JSONL回放集，每行形如 {"text": "...", "is_interview_question": true}"""
+    samples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                item = json.loads(line)
+                samples.append((item["text"], bool(item["is_interview_question"])))
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="在标注回放集上评估问题预判器")
+    parser.add_argument("replay", help="JSONL回放集")
+    parser.add_argument("--keywords", default="", help="额外关键词，逗号分隔")
+    parser.add_argument("--threshold", type=float, default=1.0, help="关键词打分阈值")
+    args = parser.parse_args(argv)
+    detector = KeywordQuestionDetector(keywords=args.keywords.split(","), threshold=args.threshold)
+    result = evaluate(detector, load_replay_set(args.replay))
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
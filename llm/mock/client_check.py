@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import statistics
+import sys
+import threading
+import time
+
+from .fault_injection_server import FaultInjectionServer
+from ..base.retry_policy import RetryPolicy
+from ..openai.openai_client import OpenAIClient
+from ..deepseek.deepseek_client import DeepSeekClient
+import llm.base.functions as functions
+
+
+def _make_client(client_class, base_url):
+    client = client_class(model="mock", base_url=base_url, api_key="mock", interview_type="测试",
+                          system_message="你是一个面试助手",
+                          retry_policy=RetryPolicy(max_attempts=5, base_delay=0.05, max_delay=0.5))
+    functions.register_answer_interview_question_function(client, functions.answer_interview_question)
+    return client
+
+
+class FirstVisible:
+    """记录第一次可以显示回答的时间，判断条件与界面上的AnswerStreamPresenter一致"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.elapsed = None
+
+    def __call__(self, partial):
+        if self.elapsed is not None or not isinstance(partial, dict):
+            return
+        if partial.get("is_interview_question") or partial.get("simplified_answer"):
+            self.elapsed = time.perf_counter() - self.start
+
+
+def check_blocking(client, question):
+    """非流式函数调用，回答完成时才能显示，返回(函数名, 参数, 首次可显示耗时, 总耗时)"""
+    start = time.perf_counter()
+    name, arguments = client.on_function_call(question)
+    elapsed = time.perf_counter() - start
+    return name, arguments, elapsed, elapsed
+
+
+def check_sync_stream(client, question):
+    """同步流式函数调用，返回(函数名, 参数, 首次可显示耗时, 总耗时)"""
+    visible = FirstVisible()
+    name, arguments = client.on_function_call_stream(question, on_update=visible)
+    return name, arguments, visible.elapsed, time.perf_counter() - visible.start
+
+
+def check_async_stream(client, question):
+    """异步流式函数调用（控制器回答问题时使用的路径），返回(函数名, 参数, 首次可显示耗时, 总耗时)"""
+    async def run():
+        visible = FirstVisible()
+        name, arguments = await client.on_function_call_stream_async(question, on_update=visible)
+        return name, arguments, visible.elapsed, time.perf_counter() - visible.start
+    return asyncio.run(run())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="用本地模拟服务检查OpenAI兼容客户端的同步和异步流式调用，"
+                                                 "并测量回答第一次可以显示的时间")
+    parser.add_argument("--requests", type=int, default=5, help="每种调用方式的请求数")
+    parser.add_argument("--error-rate", type=float, default=0.2, help="模拟服务返回429/500的概率")
+    parser.add_argument("--answer-length", type=int, default=400, help="模拟的详细回答字数")
+    args = parser.parse_args(argv)
+
+    server = FaultInjectionServer(("127.0.0.1", 0), error_rate=args.error_rate, slow_rate=0.0, latency=0.05,
+                                  retry_after=0.05, answer_length=args.answer_length)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    failures = 0
+    rows = []
+    modes = (("blocking", check_blocking), ("sync", check_sync_stream), ("async", check_async_stream))
+    try:
+        for client_class in (OpenAIClient, DeepSeekClient):
+            for mode, check in modes:
+                first_visible, total = [], []
+                for i in range(args.requests):
+                    client = _make_client(client_class, base_url)
+                    try:
+                        name, arguments, visible, elapsed = check(client, f"第{i}个问题：什么是Python的GIL？")
+                        ok = bool(name) and "simplified_answer" in (arguments or "") and visible is not None
+                    except Exception as e:
+                        ok = False
+                        print(f"{client_class.__name__} {mode} 请求出错: {type(e).__name__}: {str(e)}")
+                    if ok:
+                        first_visible.append(visible)
+                        total.append(elapsed)
+                    else:
+                        failures += 1
+                if total:
+                    rows.append((client_class.__name__, mode, len(total), statistics.median(first_visible),
+                                 statistics.median(total)))
+    finally:
+        server.shutdown()
+        server.server_close()
+    print(f"{'客户端':<14}{'方式':<10}{'成功':>4}{'首次可显示(秒)':>16}{'总耗时(秒)':>12}")
+    for client_name, mode, count, visible, elapsed in rows:
+        print(f"{client_name:<16}{mode:<10}{count:>4}{visible:>18.3f}{elapsed:>14.3f}")
+    print(f"模拟服务请求统计: {server.counts}，失败{failures}次")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
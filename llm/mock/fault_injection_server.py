@@ -0,0 +1,194 @@
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FaultInjectionServer(ThreadingHTTPServer):
+    """本地的OpenAI兼容模拟服务，按概率返回429/500错误或延迟响应，用于验证重试与对冲策略"""
+
+    daemon_threads = True
+
+    def __init__(self, address, error_rate=0.2, slow_rate=0.1, slow_delay=5.0, retry_after=None, latency=0.2,
+                 answer_length=0):
+        """
+        Args:
+            address: 监听地址 (host, port)
+            error_rate: 返回错误的概率，429和500各占一半
+            slow_rate: 延迟响应的概率
+            slow_delay: 延迟响应额外等待的时间（秒）
+            retry_after: 错误响应的Retry-After头（秒），为None时不返回
+            latency: 正常响应的基础延迟（秒）
+            answer_length: 详细回答的字数，为0时使用一句固定的回答；流式响应每8个字符一块，块间隔10毫秒
+        """
+        super().__init__(address, _Handler)
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_delay = slow_delay
+        self.retry_after = retry_after
+        self.latency = latency
+        self.answer_length = answer_length
+        self._lock = threading.Lock()
+        self.counts = {"requests": 0, "errors": 0, "slow": 0}
+
+    def count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            body = {}
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+            return
+        server.count("requests")
+        if random.random() < server.error_rate:
+            server.count("errors")
+            status = random.choice((429, 500))
+            headers = {"Retry-After": str(server.retry_after)} if server.retry_after is not None else {}
+            self._send_json(status, {"error": {"message": f"injected {status}", "type": "server_error"}}, headers)
+            return
+        delay = server.latency
+        if random.random() < server.slow_rate:
+            server.count("slow")
+            delay += server.slow_delay
+        time.sleep(delay)
+        if body.get("stream"):
+            self._send_stream(body)
+        else:
+            # 非流式响应等整个回答生成完才返回，耗时与流式响应的全部块相同
+            time.sleep(0.01 * len(self._pieces(body)))
+            self._send_json(200, self._completion(body))
+
+    def _answer(self, body):
+        """请求带有函数定义时返回函数调用，否则返回文本"""
+        functions = body.get("functions") or [t.get("function", {}) for t in body.get("tools") or []]
+        if not functions:
+            return None, "这是模拟服务返回的回答。"
+        detailed = "模拟的详细回答"
+        if self.server.answer_length:
+            detailed = (detailed * (self.server.answer_length // len(detailed) + 1))[:self.server.answer_length]
+        arguments = json.dumps({
+            "is_interview_question": True,
+            "simplified_answer": "模拟的简要回答",
+            "detailed_answer": detailed
+        }, ensure_ascii=False)
+        return (functions[0].get("name"), arguments), None
+
+    def _completion(self, body):
+        call, content = self._answer(body)
+        message = {"role": "assistant", "content": content}
+        if call:
+            message.update(self._call_fields(body, call[0], call[1]))
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20}
+        }
+
+    def _send_stream(self, body):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        call, _ = self._answer(body)
+        pieces = self._pieces(body)
+        for index, piece in enumerate(pieces):
+            if call:
+                delta = self._call_fields(body, call[0] if index == 0 else None, piece, index == 0)
+            else:
+                delta = {"content": piece}
+            self._send_event(body, {"index": 0, "delta": delta, "finish_reason": None})
+            time.sleep(0.01)
+        self._send_event(body, {"index": 0, "delta": {}, "finish_reason": "stop"})
+        if (body.get("stream_options") or {}).get("include_usage"):
+            self._write_event({"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()),
+                               "model": body.get("model", "mock"), "choices": [],
+                               "usage": {"prompt_tokens": 10, "completion_tokens": len(pieces), "total_tokens": 10 + len(pieces)}})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def _pieces(self, body):
+        """流式响应的各块内容：函数参数每8个字符一块，文本每个字一块"""
+        call, content = self._answer(body)
+        return [call[1][i:i + 8] for i in range(0, len(call[1]), 8)] if call else list(content)
+
+    @staticmethod
+    def _call_fields(body, name, arguments, first=True):
+        """按请求使用的协议（functions或tools）生成函数调用字段"""
+        if body.get("tools"):
+            call = {"index": 0, "function": {"arguments": arguments}}
+            if first:
+                call.update({"id": "call_mock", "type": "function"})
+                call["function"]["name"] = name
+            return {"tool_calls": [call]}
+        call = {"arguments": arguments}
+        if name:
+            call["name"] = name
+        return {"function_call": call}
+
+    def _send_event(self, body, choice):
+        self._write_event({"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()),
+                           "model": body.get("model", "mock"), "choices": [choice]})
+
+    def _write_event(self, data):
+        self.wfile.write(f"data: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _send_json(self, status, data, headers=None):
+        payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="启动注入故障的OpenAI兼容模拟服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--error-rate", type=float, default=0.2, help="返回429/500的概率")
+    parser.add_argument("--slow-rate", type=float, default=0.1, help="延迟响应的概率")
+    parser.add_argument("--slow-delay", type=float, default=5.0, help="延迟响应额外等待的秒数")
+    parser.add_argument("--retry-after", type=float, default=None, help="错误响应的Retry-After秒数")
+    parser.add_argument("--latency", type=float, default=0.2, help="正常响应的基础延迟秒数")
+    parser.add_argument("--answer-length", type=int, default=0, help="详细回答的字数，0为一句固定的回答")
+    args = parser.parse_args(argv)
+
+    server = FaultInjectionServer((args.host, args.port), error_rate=args.error_rate, slow_rate=args.slow_rate,
+                                  slow_delay=args.slow_delay, retry_after=args.retry_after, latency=args.latency,
+                                  answer_length=args.answer_length)
+    print(f"模拟服务已启动: http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"请求统计: {server.counts}")
+
+
+if __name__ == "__main__":
+    main()
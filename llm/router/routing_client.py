@@ -0,0 +1,243 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Callable, List, Optional
+from ..base.llm_base import LLMBase
+from ..base.openai_compatible_client import OpenAICompatibleClient
+from ..base.usage_stats import UsageStats
+
+
+class BackendHealth:
+    """一个后端最近的延迟和成功率
+
+    latency为首个输出（流式请求的首段参数）到达的时间。连续失败的后端暂停使用一段时间，
+    每多失败一次暂停时间翻倍，暂停结束后的第一个请求用来探测是否恢复。
+    超过两倍cooldown没有被使用的后端不再计算错误率，以便出错过的后端有机会重新被选中。
+    """
+
+    def __init__(self, name: str, client: OpenAICompatibleClient, window: int = 20, cooldown: float = 30.0,
+                 default_latency: float = 1.0):
+        """
+        Args:
+            name: 后端名称
+            client: 后端客户端
+            window: 统计最近多少次请求
+            cooldown: 连续失败后暂停使用的基础时间（秒）
+            default_latency: 还没有样本时假定的延迟（秒）
+        """
+        self.name = name
+        self.client = client
+        self.cooldown = cooldown
+        self.default_latency = default_latency
+        self._latencies = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.last_used = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.open_until
+
+    @property
+    def error_rate(self) -> float:
+        return self._outcomes.count(False) / len(self._outcomes) if self._outcomes else 0.0
+
+    @property
+    def latency(self) -> float:
+        return sum(self._latencies) / len(self._latencies) if self._latencies else self.default_latency
+
+    @property
+    def score(self) -> float:
+        """越小越好：平均延迟按错误率加权"""
+        if time.monotonic() - self.last_used > 2 * self.cooldown:
+            return self.latency
+        return self.latency * (1 + 4 * self.error_rate)
+
+    def record_success(self, latency: float):
+        self.last_used = time.monotonic()
+        self.requests += 1
+        self._latencies.append(latency)
+        self._outcomes.append(True)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def record_failure(self):
+        self.last_used = time.monotonic()
+        self.requests += 1
+        self.failures += 1
+        self._outcomes.append(False)
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= 2:
+            self.open_until = time.monotonic() + min(self.cooldown * 2 ** (self.consecutive_failures - 2), 600)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "error_rate": self.error_rate,
+            "avg_latency": self.latency if self._latencies else None,
+            "available": self.available,
+            "retry": self.client.retry_policy.stats
+        }
+
+
+class RoutingClient(LLMBase):
+    """在多个OpenAI兼容后端之间路由的LLM客户端
+
+    每个请求发给当前得分最好的可用后端，请求失败且还没有任何输出时依次改用其他后端。
+    所有后端共用同一个聊天管理器，历史记录使用通用的消息格式，切换后端不会丢失上下文。
+    """
+
+    def __init__(self, backends: Dict[str, OpenAICompatibleClient], window: int = 20, cooldown: float = 30.0):
+        """
+        Args:
+            backends: 后端名称到客户端的有序字典，排在前面的后端在得分相同时优先，
+                      所有客户端必须共用同一个chat_manager
+            window: 每个后端统计最近多少次请求
+            cooldown: 连续失败后暂停使用的基础时间（秒）
+        """
+        if not backends:
+            raise ValueError("至少需要一个LLM后端")
+        primary = next(iter(backends.values()))
+        super().__init__(model=primary.model, api_key=primary.api_key, interview_type=primary.interview_type)
+        self.chat_manager = primary.chat_manager
+        self.usage_stats = UsageStats()
+        self.backends = [BackendHealth(name, client, window=window, cooldown=cooldown) for name, client in backends.items()]
+        for backend in self.backends:
+            if backend.client.chat_manager is not self.chat_manager:
+                raise ValueError(f"后端{backend.name}没有使用共同的聊天管理器")
+            backend.client.usage_stats = self.usage_stats
+        self.failovers = 0
+        self._lock = threading.Lock()
+        pass
+
+    def ranked_backends(self, vision: bool = False) -> List[BackendHealth]:
+        """按得分排序的后端，暂停中的后端排在最后"""
+        with self._lock:
+            backends = [b for b in self.backends if not vision or b.client.SUPPORTS_VISION]
+            return sorted(backends, key=lambda b: (not b.available, b.score))
+
+    def chat_completion(self, messages: str, stream=False, **kwargs):
+        """执行对话补全，后端出错（返回None）时改用下一个后端"""
+        return self._route_sync(lambda client: client.chat_completion(messages, stream=stream, **kwargs))
+
+    def register_function(self, name: str, description: str, parameters: Dict[str, Any], handler: Callable[[Any], Any]):
+        """在所有后端注册函数，各后端按自己的协议生成函数定义"""
+        for backend in self.backends:
+            backend.client.register_function(name, description, parameters, handler)
+        pass
+
+    def on_function_call(self, message: str):
+        """让AI处理函数调用"""
+        return self._route_sync(lambda client: client.on_function_call(message))
+
+    def on_function_call_stream(self, message: str, on_update: Callable[[Dict[str, Any]], None] = None):
+        """流式处理函数调用，已经输出部分参数后出错不再切换后端"""
+        state = {"visible": False}
+
+        def update(partial):
+            state["visible"] = True
+            if on_update:
+                on_update(partial)
+
+        return self._route_sync(lambda client: client.on_function_call_stream(message, update), state)
+
+    async def on_function_call_stream_async(self, message: str, on_update: Callable[[Dict[str, Any]], None] = None, request=None):
+        """异步流式处理函数调用
+
+        后端的异步实现在请求完成后才写入历史，失败时不需要撤销，直接改用下一个后端。
+        """
+        errors = []
+        for attempt, backend in enumerate(self.ranked_backends()):
+            start = time.monotonic()
+            state = {"first_output": None}
+
+            def update(partial, state=state, start=start):
+                if state["first_output"] is None:
+                    state["first_output"] = time.monotonic() - start
+                if on_update:
+                    on_update(partial)
+
+            try:
+                result = await backend.client.on_function_call_stream_async(message, on_update=update, request=request)
+            except Exception as e:
+                self._record_failure(backend, e)
+                if state["first_output"] is not None:
+                    raise
+                errors.append(e)
+                continue
+            self._record_success(backend, state["first_output"] or time.monotonic() - start, attempt)
+            return result
+        raise errors[-1]
+
+    def use_function(self, name: str, parameters: dict):
+        """执行指定已注册的函数，函数结果写入共用的历史"""
+        return self.backends[0].client.use_function(name, parameters)
+
+    def analyze_image(self, image, prompt: str = None):
+        """用支持图像识别的后端分析图像"""
+        backends = self.ranked_backends(vision=True)
+        if not backends:
+            return False, "抱歉，没有配置支持图像识别的模型。"
+        return backends[0].client.analyze_image(image, prompt)
+
+    def analyze_image_stream(self, image, prompt: str = None, on_delta: Callable[[str], None] = None):
+        """用支持图像识别的后端流式分析图像"""
+        backends = self.ranked_backends(vision=True)
+        if not backends:
+            return super().analyze_image_stream(image, prompt, on_delta)
+        return backends[0].client.analyze_image_stream(image, prompt, on_delta)
+
+    def analyze_text_stream(self, text: str, prompt: str = None, on_delta: Callable[[str], None] = None):
+        """用当前最好的后端分析截图文字"""
+        return self.ranked_backends()[0].client.analyze_text_stream(text, prompt, on_delta)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "failovers": self.failovers,
+                "backends": {backend.name: backend.stats for backend in self.backends}
+            }
+
+    def _route_sync(self, call, state=None):
+        """按得分依次尝试各后端，失败时撤销该后端写入的历史"""
+        error = None
+        for attempt, backend in enumerate(self.ranked_backends()):
+            snapshot = self.chat_manager.snapshot()
+            start = time.monotonic()
+            try:
+                result = call(backend.client)
+            except Exception as e:
+                self._record_failure(backend, e)
+                if state and state["visible"]:
+                    raise
+                self.chat_manager.restore(snapshot)
+                error = e
+                continue
+            if result is None:
+                # chat_completion在内部处理了异常
+                self._record_failure(backend, None)
+                self.chat_manager.restore(snapshot)
+                continue
+            self._record_success(backend, time.monotonic() - start, attempt)
+            return result
+        if error:
+            raise error
+        return None
+
+    def _record_success(self, backend: BackendHealth, latency: float, attempt: int):
+        with self._lock:
+            backend.record_success(latency)
+            if attempt:
+                self.failovers += 1
+
+    def _record_failure(self, backend: BackendHealth, error: Optional[Exception]):
+        with self._lock:
+            backend.record_failure()
+        if error is not None:
+            print(f"LLM后端{backend.name}请求失败，尝试其他后端: {str(error)}")
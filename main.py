@@ -1,20 +1,39 @@
+import time
+# 启动计时，统计从开始导入到窗口显示的时间
+START_TIME = time.perf_counter()
 import tkinter as tk
 from ui.app_ui import create_app, Hide_window
 from ui.controller import InterviewAssistantController
+from startup.preload import Preloader
 import sys
 import os
 
 if __name__ == "__main__":
     try:
+        import_time = time.perf_counter() - START_TIME
         # 创建UI应用
         root, app = create_app()
         
         # 创建控制器
         controller = InterviewAssistantController(app)
+        
+        # create_app已经显示并刷新了窗口
+        window_time = time.perf_counter() - START_TIME
+        print(f"窗口显示用时{window_time:.2f}秒（其中导入{import_time:.2f}秒）")
+        if os.getenv("STARTUP_BENCHMARK"):
+            # 启动时间测试只需要窗口显示的时间
+            print(f"TIME_TO_WINDOW={window_time:.4f}", flush=True)
+            root.after(100, root.destroy)
+        else:
+            if controller.config.startup_config['preload']:
+                # 窗口显示后在后台导入录音、识别和LLM模块，并提前枚举显示器
+                preloader = Preloader(tasks={"screenshot": app.screenshot_tool.warm_up})
+                root.after(200, preloader.start)
+            # 在后台准备录音设备、识别令牌等开始录音需要的资源
+            root.after(200, app.notify_settings_changed)
+        
         # 启动UI主循环
         root.mainloop()
     except Exception as e:
         print(f"程序启动错误: {str(e)}")
         sys.exit(1)
-
-
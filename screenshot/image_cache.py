@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+
+# 感知哈希的边长，8x8共64位
+HASH_SIZE = 8
+# 计算pHash时先缩小到的边长
+PHASH_IMAGE_SIZE = 32
+
+
+def _dct_matrix(n):
+    """n点DCT-II的正交变换矩阵"""
+    import numpy as np
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+# numpy在第一次计算哈希时才导入
+_DCT = None
+
+
+def dhash(image) -> int:
+    """差值哈希：缩小为9x8灰度图，比较每行相邻像素的亮度"""
+    import numpy as np
+    from PIL import Image
+    pixels = np.asarray(image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.BILINEAR), dtype=np.int16)
+    return _to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+def phash(image) -> int:
+    """感知哈希：缩小为32x32灰度图做二维DCT，取左上角8x8低频分量与中位数比较"""
+    global _DCT
+    import numpy as np
+    from PIL import Image
+    if _DCT is None:
+        _DCT = _dct_matrix(PHASH_IMAGE_SIZE)
+    pixels = np.asarray(image.convert("L").resize((PHASH_IMAGE_SIZE, PHASH_IMAGE_SIZE), Image.BILINEAR),
+                        dtype=np.float64)
+    low = (_DCT @ pixels @ _DCT.T)[:HASH_SIZE, :HASH_SIZE]
+    # 直流分量只反映整体亮度，不参与中位数
+    median = np.median(low.flatten()[1:])
+    return _to_int(low > median)
+
+
+def _to_int(bits) -> int:
+    value = 0
+    for bit in bits.flatten():
+        value = (value << 1) | int(bit)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class ImageAnalysisCache:
+    """截图分析结果的感知哈希缓存
+
+    重复截取几乎相同的区域（例如题目稍微滚动了一点）时，dHash和pHash的汉明距离都不超过
+    max_distance且提示词相同，就直接复用上一次的分析结果。按最近使用顺序淘汰。
+    """
+
+    def __init__(self, max_entries=32, max_distance=6):
+        """
+        Args:
+            max_entries: 最多缓存的截图数
+            max_distance: 认为两张截图相同的最大汉明距离（64位中不同的位数）
+        """
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # 统计
+        self.lookups = 0
+        self.hits = 0
+        self.hash_time_total = 0.0
+
+    def fingerprint(self, image):
+        """计算截图的(dHash, pHash)"""
+        start = time.perf_counter()
+        key = (dhash(image), phash(image))
+        with self._lock:
+            self.hash_time_total += time.perf_counter() - start
+        return key
+
+    def get(self, fingerprint, prompt):
+        """查找近似相同的截图，命中时返回之前的分析结果，否则返回None"""
+        d, p = fingerprint
+        with self._lock:
+            self.lookups += 1
+            best, best_distance = None, None
+            for key in self._entries:
+                (kd, kp), key_prompt = key
+                if key_prompt != prompt:
+                    continue
+                distance = max(hamming(d, kd), hamming(p, kp))
+                if distance <= self.max_distance and (best_distance is None or distance < best_distance):
+                    best, best_distance = key, distance
+            if best is None:
+                return None
+            self.hits += 1
+            self._entries.move_to_end(best)
+            return self._entries[best]
+
+    def put(self, fingerprint, prompt, result):
+        """保存一次分析结果，同一张截图用不同的提示词分析时分别保存"""
+        key = (fingerprint, prompt)
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @property
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "avg_hash_time": self.hash_time_total / self.lookups if self.lookups else 0.0
+            }
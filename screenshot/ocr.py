@@ -0,0 +1,118 @@
+import importlib.util
+import threading
+import time
+
+# rapidocr会加载onnxruntime和模型，比较慢，只检查是否安装，第一次识别时再导入
+OCR_AVAILABLE = importlib.util.find_spec("rapidocr_onnxruntime") is not None
+
+
+class OCRResult:
+    """截图的文字识别结果"""
+
+    def __init__(self, text, confidence, lines, elapsed):
+        """
+        Args:
+            text: 按版面还原的文字，保留行和缩进
+            confidence: 按文字长度加权的平均置信度
+            lines: 行数
+            elapsed: 识别耗时（秒）
+        """
+        self.text = text
+        self.confidence = confidence
+        self.lines = lines
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return f"OCRResult(lines={self.lines}, confidence={self.confidence:.2f}, elapsed={self.elapsed:.2f})"
+
+
+class ScreenshotOCR:
+    """在本地CPU上识别截图中的文字
+
+    使用RapidOCR（ONNX Runtime版PaddleOCR模型，支持中英文），模型在第一次识别时加载。
+    识别出的文字框按行合并，行内按横坐标排序，行首缩进按字符宽度换算为空格，
+    代码题的缩进和换行基本可以保留。未安装rapidocr_onnxruntime时不可用。
+    """
+
+    def __init__(self):
+        self._engine = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        return OCR_AVAILABLE
+
+    def recognize(self, image):
+        """
+        识别PIL图像中的文字
+        Args:
+            image: PIL图像
+        Returns:
+            OCRResult: 识别结果，OCR不可用或出错时返回None
+        """
+        if not self.available:
+            return None
+        start = time.perf_counter()
+        try:
+            import numpy as np
+            with self._lock:
+                if self._engine is None:
+                    from rapidocr_onnxruntime import RapidOCR
+                    self._engine = RapidOCR()
+                result, _ = self._engine(np.asarray(image.convert("RGB")))
+        except Exception as e:
+            print(f"文字识别出错: {str(e)}")
+            return None
+        boxes = [(box, text, float(score)) for box, text, score in (result or []) if text.strip()]
+        text, lines = layout_text(boxes)
+        total = sum(len(t) for _, t, _ in boxes)
+        confidence = sum(len(t) * score for _, t, score in boxes) / total if total else 0.0
+        return OCRResult(text, confidence, lines, time.perf_counter() - start)
+
+
+def layout_text(boxes):
+    """
+    把文字框按版面拼成文本
+    Args:
+        boxes: [(四个角点坐标, 文字, 置信度)]
+    Returns:
+        (文本, 行数)
+    """
+    if not boxes:
+        return "", 0
+    items = []
+    for box, text, _ in boxes:
+        xs = [point[0] for point in box]
+        ys = [point[1] for point in box]
+        items.append({"x0": min(xs), "x1": max(xs), "y0": min(ys), "y1": max(ys), "text": text})
+    items.sort(key=lambda item: (item["y0"] + item["y1"]) / 2)
+
+    # 与当前行在垂直方向重叠超过一半的框属于同一行
+    rows = []
+    for item in items:
+        height = item["y1"] - item["y0"]
+        if rows:
+            row = rows[-1]
+            overlap = min(row["y1"], item["y1"]) - max(row["y0"], item["y0"])
+            if overlap > 0.5 * min(height, row["y1"] - row["y0"]):
+                row["items"].append(item)
+                row["y0"] = min(row["y0"], item["y0"])
+                row["y1"] = max(row["y1"], item["y1"])
+                continue
+        rows.append({"y0": item["y0"], "y1": item["y1"], "items": [item]})
+
+    # 字符宽度取中位数，用于换算缩进和行内间距
+    widths = [(item["x1"] - item["x0"]) / len(item["text"]) for item in items]
+    char_width = max(1.0, sorted(widths)[len(widths) // 2])
+    left = min(item["x0"] for item in items)
+
+    lines = []
+    for row in rows:
+        row_items = sorted(row["items"], key=lambda item: item["x0"])
+        line = " " * int(round((row_items[0]["x0"] - left) / char_width))
+        line += row_items[0]["text"]
+        for previous, item in zip(row_items, row_items[1:]):
+            gap = int(round((item["x0"] - previous["x1"]) / char_width))
+            line += " " * max(1, gap) + item["text"]
+        lines.append(line.rstrip())
+    return "\n".join(lines), len(lines)
@@ -1,16 +1,12 @@
 import tkinter as tk
 from tkinter import ttk
-from PIL import ImageGrab, Image
 import os
 import datetime
-from threading import Thread, Event
 import time
 import win32api
 import win32con
 import win32gui
 import ctypes
-import mss
-import mss.tools
 from ctypes import wintypes
 from ctypes import windll
 
@@ -21,7 +17,7 @@ class ScreenshotTool:
         
         Args:
             root: tkinter根窗口
-            callback: 截图完成后的回调函数，接收截图路径作为参数
+            callback: 截图完成后的回调函数，参数为PIL图像和截图时间（time.time()）
         """
         self.root = root
         self.callback = callback
@@ -33,16 +29,36 @@ class ScreenshotTool:
         self.current_y = 0
         self.is_drawing = False
         self.screenshot_path = None
-        # 获取多显示器信息
-        self.monitor_info = self.get_monitor_info()
-        # 初始化mss
-        self.sct = mss.mss()
-        # 是否在使用后删除截图文件
-        self.auto_delete = True
+        # 显示器信息和mss在第一次截图时才获取，不拖慢程序启动
+        self._monitor_info = None
+        self._sct = None
+        # 是否把截图保存到磁盘，截图只在内存中传递给识别，默认不保存
+        self.save_to_disk = False
         
         # 应用防截图和防切屏属性给主窗口
         # self.apply_anti_capture_properties(self.root)
         
+    @property
+    def monitor_info(self):
+        """所有显示器的位置和尺寸，第一次使用时枚举"""
+        if self._monitor_info is None:
+            self._monitor_info = self.get_monitor_info()
+        return self._monitor_info
+    
+    @property
+    def sct(self):
+        """mss截图实例，第一次使用时创建"""
+        if self._sct is None:
+            import mss
+            self._sct = mss.mss()
+        return self._sct
+    
+    def warm_up(self):
+        """提前导入截图用到的模块并枚举显示器，可以在后台线程调用"""
+        import mss
+        from PIL import Image, ImageGrab
+        self.monitor_info
+    
     def get_monitor_info(self):
         """获取所有显示器的位置和尺寸信息"""
         monitors = []
@@ -418,23 +434,16 @@ class ScreenshotTool:
             self.restore_main_window()
     
     def capture_area(self, x1, y1, x2, y2):
-        """捕获指定区域的截图"""
+        """捕获指定区域的截图，图像直接在内存中交给回调，不写入磁盘"""
         try:
-            # 确保截图目录存在
-            if not os.path.exists("screenshot"):
-                os.makedirs("screenshot")
-            
-            # 生成唯一文件名
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            self.screenshot_path = os.path.join("screenshot", f"screenshot_{timestamp}.png")
+            # 截图时间，用于统计从截图到得到回答的延迟
+            captured_at = time.time()
+            img = None
+            from PIL import Image, ImageGrab
             
             # 捕获屏幕
             if x2 - x1 > 0 and y2 - y1 > 0:  # 确保区域有效
                 try:
-                    # 确保坐标在有效范围内
-                    screens = self.sct.monitors
-                    print(f"可用屏幕: {screens}")
-                    
                     # 调整为整数坐标
                     left = int(x1)
                     top = int(y1)
@@ -451,10 +460,8 @@ class ScreenshotTool:
                     
                     print(f"截图区域: {monitor}")
                     
-                    # 捕获屏幕
+                    # 捕获屏幕并转换为PIL Image
                     screenshot = self.sct.grab(monitor)
-                    
-                    # 转换为PIL Image并保存
                     img = Image.frombytes('RGB', screenshot.size, screenshot.rgb)
                     
                     # 检查图像是否有效
@@ -463,64 +470,42 @@ class ScreenshotTool:
                         return
                         
                     print(f"图像尺寸: {img.size}")
-                    img.save(self.screenshot_path)
-                    print(f"截图已保存到: {self.screenshot_path}")
-                    
-                    # 调用回调函数
-                    if self.callback:
-                        # 传递截图路径给回调函数
-                        self.callback(self.screenshot_path)
-                        
-                        # 如果启用自动删除，在回调后删除截图文件
-                        if self.auto_delete:
-                            # 延迟一段时间后删除文件（确保回调函数有足够时间处理文件）
-                            def delayed_delete():
-                                try:
-                                    time.sleep(3)  # 3秒延迟
-                                    if os.path.exists(self.screenshot_path):
-                                        os.remove(self.screenshot_path)
-                                        print(f"已删除截图文件: {self.screenshot_path}")
-                                except Exception as e:
-                                    print(f"删除截图文件失败: {str(e)}")
-                            
-                            # 创建一个新线程来处理文件删除
-                            delete_thread = Thread(target=delayed_delete)
-                            delete_thread.daemon = True
-                            delete_thread.start()
                 except Exception as e:
                     print(f"截图错误: {str(e)}")
                     # 尝试使用PIL的ImageGrab作为备选方案
                     try:
                         print("尝试使用备选方案截图...")
-                        screenshot = ImageGrab.grab(bbox=(x1, y1, x2, y2))
-                        screenshot.save(self.screenshot_path)
-                        
-                        # 调用回调函数
-                        if self.callback:
-                            self.callback(self.screenshot_path)
-                            
-                            # 自动删除
-                            if self.auto_delete:
-                                def delayed_delete():
-                                    try:
-                                        time.sleep(3)  # 3秒延迟
-                                        if os.path.exists(self.screenshot_path):
-                                            os.remove(self.screenshot_path)
-                                            print(f"已删除截图文件: {self.screenshot_path}")
-                                    except Exception as e:
-                                        print(f"删除截图文件失败: {str(e)}")
-                                
-                                delete_thread = Thread(target=delayed_delete)
-                                delete_thread.daemon = True
-                                delete_thread.start()
+                        img = ImageGrab.grab(bbox=(x1, y1, x2, y2))
                     except Exception as e2:
                         print(f"备选截图也失败: {str(e2)}")
+                        return
+                
+                # 需要保留截图时才写入磁盘
+                if self.save_to_disk:
+                    self.save_screenshot(img)
+                
+                # 调用回调函数，传递内存中的图像
+                if self.callback:
+                    self.callback(img, captured_at)
         except Exception as e:
             print(f"截图错误: {str(e)}")
         finally:
             # 恢复主窗口
             self.restore_main_window()
     
+    def save_screenshot(self, img):
+        """把截图保存到screenshot目录，返回文件路径"""
+        # 确保截图目录存在
+        if not os.path.exists("screenshot"):
+            os.makedirs("screenshot")
+        
+        # 生成唯一文件名
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.screenshot_path = os.path.join("screenshot", f"screenshot_{timestamp}.png")
+        img.save(self.screenshot_path)
+        print(f"截图已保存到: {self.screenshot_path}")
+        return self.screenshot_path
+    
     def cancel_screenshot(self, event=None):
         """取消截图"""
         try:
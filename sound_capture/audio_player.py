@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class JitterBuffer:
+    """音频抖动缓冲区
+
+    网络送达的音频块大小和间隔都不稳定，先积累prebuffer_bytes再开始输出，
+    缓冲区被取空后重新进入预缓冲状态，避免播放断断续续。
+    """
+
+    def __init__(self, prebuffer_bytes):
+        self.prebuffer_bytes = prebuffer_bytes
+        self._chunks = deque()
+        self._size = 0
+        self._buffering = True
+        self._finished = False
+        self._cond = threading.Condition()
+        self.underruns = 0
+
+    def push(self, data: bytes):
+        """写入一块PCM数据"""
+        if not data:
+            return
+        with self._cond:
+            self._chunks.append(data)
+            self._size += len(data)
+            if self._buffering and self._size >= self.prebuffer_bytes:
+                self._buffering = False
+            self._cond.notify()
+
+    def finish(self):
+        """标记数据写入结束，剩余数据不再等待预缓冲"""
+        with self._cond:
+            self._finished = True
+            self._buffering = False
+            self._cond.notify()
+
+    def reset(self):
+        """丢弃所有缓冲数据，重新开始"""
+        with self._cond:
+            self._chunks.clear()
+            self._size = 0
+            self._buffering = True
+            self._finished = False
+            self._cond.notify()
+
+    def pop(self, size, timeout=None):
+        """取出最多size字节的数据
+
+        Returns:
+            bytes: 数据；缓冲区已结束且为空时返回None；超时返回空bytes
+        """
+        with self._cond:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while self._buffering or not self._chunks:
+                if self._finished and not self._chunks:
+                    return None
+                if not self._buffering and not self._chunks:
+                    # 缓冲区被取空，重新进入预缓冲
+                    self._buffering = True
+                    self.underruns += 1
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return b""
+                self._cond.wait(remaining)
+            out = bytearray()
+            while self._chunks and len(out) < size:
+                chunk = self._chunks.popleft()
+                need = size - len(out)
+                if len(chunk) > need:
+                    self._chunks.appendleft(chunk[need:])
+                    chunk = chunk[:need]
+                out += chunk
+            self._size -= len(out)
+            return bytes(out)
+
+    @property
+    def size(self):
+        """缓冲区中还未取出的字节数"""
+        with self._cond:
+            return self._size
+
+
+class AudioPlayer:
+    """通过默认扬声器播放16bit单声道PCM流"""
+
+    def __init__(self, samplerate=16000, channels=1, prebuffer_ms=200, block_ms=40):
+        self.samplerate = samplerate
+        self.channels = channels
+        bytes_per_ms = samplerate * channels * 2 // 1000
+        self.block_bytes = bytes_per_ms * block_ms
+        self.buffer = JitterBuffer(bytes_per_ms * prebuffer_ms)
+        self.is_playing = False
+        self.playing_thread = None
+        self.first_play_time = None
+
+    def start(self):
+        """启动播放线程"""
+        if self.playing_thread and self.playing_thread.is_alive():
+            self.stop()
+        self.is_playing = True
+        self.first_play_time = None
+        self.buffer.reset()
+        self.playing_thread = threading.Thread(target=self._playing_worker, daemon=True)
+        self.playing_thread.start()
+
+    def push(self, data: bytes):
+        self.buffer.push(data)
+
+    def finish(self):
+        """当前音频流已全部写入"""
+        self.buffer.finish()
+
+    def drain(self, timeout=None):
+        """
+        等待已写入的音频播放完，需要先调用finish
+        Args:
+            timeout: 最长等待时间（秒），为空时按缓冲区中剩余的音频时长加2秒
+        Returns:
+            bool: 是否已播放完
+        """
+        if not self.playing_thread:
+            return True
+        if timeout is None:
+            timeout = self.buffer.size / (self.samplerate * self.channels * 2) + 2.0
+        self.playing_thread.join(timeout)
+        return not self.playing_thread.is_alive()
+
+    def stop(self):
+        """立即停止播放"""
+        self.is_playing = False
+        self.buffer.finish()
+        if self.playing_thread and self.playing_thread.is_alive():
+            self.playing_thread.join(timeout=1.0)
+
+    def _playing_worker(self):
+        try:
+            import soundcard as sc
+            with sc.default_speaker().player(samplerate=self.samplerate, channels=self.channels) as speaker:
+                while self.is_playing:
+                    data = self.buffer.pop(self.block_bytes, timeout=0.5)
+                    if data is None:
+                        break
+                    if not data:
+                        continue
+                    if self.first_play_time is None:
+                        self.first_play_time = time.time()
+                    samples = np.frombuffer(data[:len(data) - len(data) % 2], dtype=np.int16)
+                    speaker.play(samples.astype(np.float32) / 32768.0)
+        except Exception as e:
+            print(f"播放线程发生错误: {str(e)}")
+        finally:
+            self.is_playing = False
@@ -50,7 +50,7 @@ class AudioRecorder:
                 while self.is_recording:
                     try:
                         data = mic.record(numframes=self.buffer_size)
-                        self.send_audio(data)
+                        self.send_audio(data, time.time())
                     except Exception as e:
                         print(f"音频捕获过程中出错: {str(e)}")
                         break
@@ -73,11 +73,12 @@ class AudioRecorder:
         if self.recording_thread and self.recording_thread.is_alive():
             self.recording_thread.join(timeout=1.0)  # 等待最多1秒
 
-    def send_audio(self, data):
+    def send_audio(self, data, captured_at=None):
         """处理音频数据
         
         Args:
             data: 音频数据
+            captured_at: 这块音频采集完成的时间，用于延迟追踪
         """
         # 转换为单声道
         mono_data = data.mean(axis=1) if len(data.shape) > 1 else data
@@ -91,4 +92,4 @@ class AudioRecorder:
         normalized_data[np.abs(normalized_data) < noise_threshold] = 0
         # 转换为PCM格式
         pcm_data = (normalized_data * 32767).astype(np.int16).tobytes()
-        self.recognizer.process_audio(pcm_data)
\ No newline at end of file
+        self.recognizer.process_audio(pcm_data, captured_at)
\ No newline at end of file
@@ -0,0 +1,262 @@
+import argparse
+import json
+import mmap
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import nls
+
+URL = "wss://nls-gateway-cn-shanghai.aliyuncs.com/ws/v1"
+AUDIO_EXTENSIONS = (".wav", ".pcm")
+# 每次发送100ms的音频，字节数按文件的采样率计算
+CHUNK_MS = 100
+
+
+class _PcmFile:
+    """裸PCM文件（16bit单声道），使用mmap读取"""
+
+    def __init__(self, path, sample_rate):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = 1
+        self.bits_per_sample = 16
+        self.audio_format = 1
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            # 例如空文件无法映射
+            self._file.close()
+            raise
+        self.data_size = len(self._map)
+
+    @property
+    def duration(self):
+        return self.data_size / (self.sample_rate * 2)
+
+    def chunks(self, size):
+        data = memoryview(self._map)
+        try:
+            for i in range(0, len(data), size):
+                yield data[i:i + size]
+        finally:
+            data.release()
+
+    def close(self):
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def open_audio(path, pcm_sample_rate=16000):
+    """打开音频文件，wav按RIFF块解析，pcm按裸数据处理"""
+    if path.lower().endswith(".pcm"):
+        return _PcmFile(path, pcm_sample_rate)
+    audio = nls.WavFile(path)
+    if audio.audio_format != 1 or audio.bits_per_sample != 16 or audio.channels != 1:
+        audio.close()
+        raise ValueError(f"仅支持16bit单声道PCM编码的wav: {path}")
+    if audio.sample_rate not in (8000, 16000):
+        audio.close()
+        raise ValueError(f"不支持的采样率 {audio.sample_rate}: {path}")
+    return audio
+
+
+def collect_audio_files(inputs):
+    """展开输入的文件和目录，返回音频文件列表"""
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, names in os.walk(item):
+                for name in sorted(names):
+                    if name.lower().endswith(AUDIO_EXTENSIONS):
+                        files.append(os.path.join(root, name))
+        else:
+            files.append(item)
+    return files
+
+
+def transcribe_file(path, token, appkey, url=URL, chunk_ms=CHUNK_MS,
+                    send_interval=0.0, pcm_sample_rate=16000, timeout=60):
+    """
+    使用独立的NlsSpeechTranscriber会话转写单个音频文件
+    Args:
+        path: 音频文件路径（wav或pcm）
+        token: 阿里云访问令牌
+        appkey: 阿里云appkey
+        url: 网关地址
+        chunk_ms: 每次发送的音频时长（毫秒）
+        send_interval: 每块之间的发送间隔（秒），0表示不限速
+        pcm_sample_rate: pcm文件的采样率
+        timeout: 等待识别完成的超时时间
+    Returns:
+        dict: 包含文件路径、句子列表、音频时长、耗时以及错误信息
+    """
+    sentences = []
+    errors = []
+    started = threading.Event()
+    finished = threading.Event()
+    completed = threading.Event()
+
+    def on_start(message, *args):
+        started.set()
+
+    def on_sentence_end(message, *args):
+        payload = json.loads(message).get("payload", {})
+        sentences.append({
+            "index": payload.get("index"),
+            "begin_time": payload.get("begin_time"),
+            "time": payload.get("time"),
+            "result": payload.get("result", ""),
+        })
+
+    def on_completed(message, *args):
+        finished.set()
+        completed.set()
+
+    def on_error(message, *args):
+        errors.append(str(message))
+        completed.set()
+
+    def on_close(*args):
+        completed.set()
+
+    start_time = time.time()
+    record = {"file": path, "sentences": sentences, "duration": 0.0}
+    try:
+        with open_audio(path, pcm_sample_rate) as audio:
+            record["duration"] = audio.duration
+            transcriber = nls.NlsSpeechTranscriber(
+                url=url,
+                token=token,
+                appkey=appkey,
+                on_start=on_start,
+                on_sentence_end=on_sentence_end,
+                on_completed=on_completed,
+                on_error=on_error,
+                on_close=on_close
+            )
+            transcriber.start(
+                aformat="pcm",
+                sample_rate=audio.sample_rate,
+                enable_punctuation_prediction=True,
+                enable_inverse_text_normalization=True
+            )
+            # 连接失败时start不会抛出异常，只是没有收到TranscriptionStarted
+            if not started.is_set():
+                raise RuntimeError("转写会话没有建立")
+            # 16bit单声道，每毫秒sample_rate/1000个采样
+            chunk_bytes = audio.sample_rate * 2 * chunk_ms // 1000
+            chunks = audio.chunks(chunk_bytes)
+            try:
+                for chunk in chunks:
+                    transcriber.send_audio(bytes(chunk))
+                    if send_interval:
+                        time.sleep(send_interval)
+            finally:
+                # 发送出错时也要结束生成器并释放对mmap的引用，文件才能关闭
+                chunk = None
+                chunks.close()
+            transcriber.stop(timeout=timeout)
+            completed.wait(timeout)
+            # 连接中途断开后SDK不再发送音频，也不会报错
+            if not finished.is_set() and not errors:
+                errors.append("连接在转写完成前断开")
+    except Exception as e:
+        errors.append(str(e))
+    record["elapsed"] = time.time() - start_time
+    record["text"] = "".join(s["result"] for s in sentences)
+    if errors:
+        record["error"] = "; ".join(errors)
+    return record
+
+
+def transcribe_files(paths, token, appkey, output=None, max_workers=4, **kwargs):
+    """
+    并行转写多个音频文件，每个文件一个会话，最多同时运行max_workers个会话
+    Args:
+        paths: 音频文件路径列表
+        token: 阿里云访问令牌
+        appkey: 阿里云appkey
+        output: JSONL结果文件路径，为None时不写文件
+        max_workers: 并发会话数
+        kwargs: 透传给transcribe_file的参数
+    Returns:
+        dict: 汇总信息，包括文件数、失败数、音频总时长、总耗时和实时率
+    """
+    start_time = time.time()
+    total_duration = 0.0
+    failed = 0
+    out = open(output, "w", encoding="utf-8") if output else None
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(transcribe_file, path, token, appkey, **kwargs)
+                       for path in paths]
+            for future in as_completed(futures):
+                record = future.result()
+                total_duration += record["duration"]
+                if "error" in record:
+                    failed += 1
+                    print(f"转写失败 {record['file']}: {record['error']}")
+                if out:
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+    finally:
+        if out:
+            out.close()
+    wall_time = time.time() - start_time
+    return {
+        "files": len(paths),
+        "failed": failed,
+        "audio_seconds": total_duration,
+        "wall_seconds": wall_time,
+        # 实时率：处理耗时 / 音频时长，越小越快
+        "rtf": wall_time / total_duration if total_duration else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量离线转写音频文件")
+    parser.add_argument("inputs", nargs="+", help="音频文件或目录（wav/pcm）")
+    parser.add_argument("-o", "--output", default="transcripts.jsonl", help="JSONL结果文件")
+    parser.add_argument("-j", "--jobs", type=int, default=4, help="并发会话数")
+    parser.add_argument("--url", default=URL, help="网关地址")
+    parser.add_argument("--send-interval", type=float, default=0.0, help="每块音频的发送间隔（秒）")
+    parser.add_argument("--pcm-sample-rate", type=int, default=16000, help="pcm文件的采样率")
+    args = parser.parse_args(argv)
+
+    from config.config_loader import ConfigLoader
+    from . import tokens
+    appkey = ConfigLoader().aliyun_config["app_key"]
+    token = tokens.get_token()
+    if not token:
+        print("获取阿里云token失败")
+        return 1
+
+    paths = collect_audio_files(args.inputs)
+    summary = transcribe_files(
+        paths, token, appkey,
+        output=args.output,
+        max_workers=args.jobs,
+        url=args.url,
+        send_interval=args.send_interval,
+        pcm_sample_rate=args.pcm_sample_rate
+    )
+    print(f"完成 {summary['files']} 个文件，失败 {summary['failed']} 个，"
+          f"音频总时长 {summary['audio_seconds']:.1f}秒，耗时 {summary['wall_seconds']:.1f}秒，"
+          f"实时率 {summary['rtf']:.3f}")
+    return 0 if not summary["failed"] else 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -7,6 +7,7 @@ import warnings
 from soundcard import SoundcardRuntimeWarning
 import json
 from ..base.speech_recognizer import SpeechRecognizer
+from tracing.tracer import tracer, UtteranceTracer
 
 # 忽略 SoundcardRuntimeWarning
 warnings.filterwarnings("ignore", category=SoundcardRuntimeWarning)
@@ -23,27 +24,24 @@ class AliyunSpeechRecognizer(SpeechRecognizer):
         
         # 初始化语音识别器
         self.recognizer = None
+        # 把识别事件归到各句话上，记录延迟追踪的各阶段
+        self.utterances = UtteranceTracer(tracer)
         
     def on_sentence_begin(self, message, *args):
         """句子开始回调"""
         print(f"开始识别新句子...")
+        self.utterances.on_sentence_begin(self._payload(message).get('time'))
         
     def on_sentence_end(self, message, *args):
         """句子结束回调"""
         try:
-            # 检查消息类型并正确处理
-            if isinstance(message, dict):
-                result = message.get('payload', {}).get('result', '')
-            else:
-                # 如果是字符串，可能需要解析 JSON
-                try:
-                    message_dict = json.loads(message)
-                    result = message_dict.get('payload', {}).get('result', '')
-                except json.JSONDecodeError:
-                    # 如果不是有效的 JSON，直接使用消息内容
-                    result = str(message)
+            payload = self._payload(message)
+            result = payload.get('result', '')
+            # 句子的关联ID随回调传给下游，用于记录后续阶段
+            trace_id = self.utterances.on_sentence_end(payload.get('time'))
             if self.do_on_sentence_end:
-                self.do_on_sentence_end(result)
+                with tracer.use(trace_id):
+                    self.do_on_sentence_end(result)
         except Exception as e:
             print(f"on_sentence_end处理识别结果时出错: {str(e)}")
         
@@ -62,26 +60,38 @@ class AliyunSpeechRecognizer(SpeechRecognizer):
     def on_result_chg(self, message, *args):
         """结果变化回调"""
         try:
-            # 检查消息类型并正确处理
-            if isinstance(message, dict):
-                result = message.get('payload', {}).get('result', '')
-            else:
-                # 如果是字符串，可能需要解析 JSON
-                try:
-                    message_dict = json.loads(message)
-                    result = message_dict.get('payload', {}).get('result', '')
-                except json.JSONDecodeError:
-                    # 如果不是有效的 JSON，直接使用消息内容
-                    result = str(message)
+            result = self._payload(message).get('result', '')
+            trace_id = self.utterances.on_partial()
             if self.do_on_result_chg:
-                self.do_on_result_chg(result)
+                with tracer.use(trace_id):
+                    self.do_on_result_chg(result)
         except Exception as e:
             print(f"on_result_chg处理识别结果时出错: {str(e)}")
+    
+    def _payload(self, message):
+        """取出识别事件的payload，消息可能是字典或JSON字符串"""
+        # 检查消息类型并正确处理
+        if isinstance(message, dict):
+            return message.get('payload', {}) or {}
+        # 如果是字符串，可能需要解析 JSON
+        try:
+            return json.loads(message).get('payload', {}) or {}
+        except (json.JSONDecodeError, TypeError, AttributeError):
+            # 如果不是有效的 JSON，直接使用消息内容
+            return {'result': str(message)}
+        
+    def prepare(self):
+        """提前获取访问令牌，令牌缓存在token_info.json中，开始识别时直接读取
+
+        识别连接不提前建立：服务端在连接后一段时间没有收到音频会断开，发送静音保持连接又会计费。
+        """
+        self.get_token()
         
     def start_recognition(self):
         """开始语音识别"""
         try:
             self.is_running = True
+            self.utterances.reset()
             self.recognizer = nls.NlsSpeechTranscriber(
                 url=self.url,
                 token=self.get_token(),
@@ -105,20 +115,25 @@ class AliyunSpeechRecognizer(SpeechRecognizer):
             print(f"启动语音识别失败: {str(e)}")
             self.is_running = False
             
-    def process_audio(self, audio_data):
+    def process_audio(self, audio_data, captured_at=None):
         """处理音频数据
         
         Args:
             audio_data: 音频数据（需要是PCM格式）
+            captured_at: 音频采集完成的时间，用于延迟追踪
         """
         if not self.is_running or not self.recognizer:
             return
         try:
             # 将音频数据分片发送（每片640字节）
             chunks = [audio_data[i:i+640] for i in range(0, len(audio_data), 640)]
+            sent = 0
             for chunk in chunks:
                 if len(chunk) == 640:  # 确保数据块完整
                     self.recognizer.send_audio(bytes(chunk))
+                    sent += len(chunk)
+            # 不足一片的尾部没有发送，不计入识别服务的音频时间
+            self.utterances.on_audio_sent(captured_at, sent, len(audio_data) - sent)
                     
         except Exception as e:
             print(f"处理音频数据失败: {str(e)}")
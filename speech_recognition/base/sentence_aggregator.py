@@ -0,0 +1,127 @@
+import threading
+import time
+from tracing.tracer import tracer
+from utils.text import QUESTION_END
+
+
+class SentenceAggregator:
+    """句子聚合器
+
+    识别服务经常把一个问题拆成多个SentenceEnd事件。聚合器把间隔不超过silence_gap的
+    连续句子合并后再交给下游回调；句子以疑问结尾、合并文本过长或等待超过max_wait时立即输出。
+    识别中间结果到达说明说话人还在继续，会推迟输出。
+    """
+
+    def __init__(self, callback, silence_gap=1.0, max_wait=6.0, max_chars=200):
+        """
+        Args:
+            callback: 下游回调，参数为合并后的句子
+            silence_gap: 句子结束后等待下一句的时间（秒）
+            max_wait: 第一句结束后最多等待的时间（秒）
+            max_chars: 合并文本超过该长度时立即输出
+        """
+        self.callback = callback
+        self.silence_gap = silence_gap
+        self.max_wait = max_wait
+        self.max_chars = max_chars
+        self._sentences = []
+        self._first_end_time = None
+        self._last_end_time = None
+        self._timer = None
+        # 每次重新计时或取出句子时加一，已经触发但在等锁的旧定时器据此放弃输出
+        self._generation = 0
+        # 合并后的句子使用最后一句的关联ID
+        self._trace_id = None
+        self._lock = threading.Lock()
+        # 统计
+        self.sentences_in = 0
+        self.flushes = 0
+        self.added_latency_total = 0.0
+        self.added_latency_max = 0.0
+
+    def on_sentence_end(self, sentence):
+        """收到一个完整句子"""
+        if not sentence:
+            return
+        with self._lock:
+            now = time.time()
+            self.sentences_in += 1
+            self._sentences.append(sentence)
+            self._trace_id = tracer.current
+            self._last_end_time = now
+            if self._first_end_time is None:
+                self._first_end_time = now
+            text = "".join(self._sentences)
+            if QUESTION_END.search(sentence) or len(text) >= self.max_chars:
+                merged = self._take(now)
+            else:
+                merged = None
+                self._schedule(self.silence_gap)
+        if merged:
+            self._emit(*merged)
+
+    def on_result_changed(self, partial):
+        """识别中间结果，说话人仍在继续，推迟输出"""
+        with self._lock:
+            if self._sentences:
+                self._schedule(self.silence_gap)
+
+    def flush(self):
+        """立即输出已缓存的句子"""
+        with self._lock:
+            merged = self._take(time.time())
+        if merged:
+            self._emit(*merged)
+
+    @property
+    def stats(self):
+        with self._lock:
+            return {
+                "sentences": self.sentences_in,
+                "flushes": self.flushes,
+                "llm_calls_saved": self.sentences_in - self.flushes - len(self._sentences),
+                "avg_added_latency": self.added_latency_total / self.flushes if self.flushes else 0.0,
+                "max_added_latency": self.added_latency_max
+            }
+
+    def _schedule(self, delay):
+        # 不超过第一句结束后的max_wait
+        delay = min(delay, self._first_end_time + self.max_wait - time.time())
+        if self._timer:
+            self._timer.cancel()
+        self._generation += 1
+        self._timer = threading.Timer(max(0.0, delay), self._on_timer, args=(self._generation,))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self, generation):
+        """定时器到期；cancel对已经触发的定时器无效，期间又有新句子或已经输出时忽略"""
+        with self._lock:
+            if generation != self._generation:
+                return
+            merged = self._take(time.time())
+        if merged:
+            self._emit(*merged)
+
+    def _emit(self, merged, trace_id):
+        with tracer.use(trace_id):
+            self.callback(merged)
+
+    def _take(self, now):
+        """取出缓存的句子，返回(合并后的句子, 关联ID)"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        self._generation += 1
+        if not self._sentences:
+            return None
+        merged = "".join(self._sentences)
+        # 额外延迟：最后一句结束到真正输出之间等待的时间
+        added = now - self._last_end_time
+        self.flushes += 1
+        self.added_latency_total += added
+        self.added_latency_max = max(self.added_latency_max, added)
+        self._sentences = []
+        self._first_end_time = None
+        self._last_end_time = None
+        return merged, self._trace_id
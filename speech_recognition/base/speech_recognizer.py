@@ -13,6 +13,10 @@ class SpeechRecognizer(ABC):
         self.do_on_sentence_end = do_on_sentence_end
         self.do_on_result_chg = do_on_result_chg
 
+    def prepare(self):
+        """在开始识别之前完成可以提前做的准备（如获取访问令牌），可以在后台线程调用"""
+        pass
+
     @abstractmethod
     def start_recognition(self):
         """开始语音识别"""
@@ -24,11 +28,12 @@ class SpeechRecognizer(ABC):
         pass
 
     @abstractmethod
-    def process_audio(self, audio_data):
+    def process_audio(self, audio_data, captured_at=None):
         """
         处理音频数据
         Args:
             audio_data: 音频数据
+            captured_at: 音频采集完成的时间（time.time()），用于延迟追踪
         """
         pass
 
@@ -2,18 +2,19 @@ class SpeechRecognizerFactory:
     """语音识别工厂类"""
     
     @staticmethod
-    def create_recognizer(provider: str, do_on_sentence_end=None):
+    def create_recognizer(provider: str, do_on_sentence_end=None, do_on_result_chg=None):
         """
         创建语音识别器实例
         Args:
             provider: 提供商名称 ('aliyun', 'other_provider'等)
             do_on_sentence_end: 句子结束时的回调函数
+            do_on_result_chg: 识别中间结果变化时的回调函数
         Returns:
             SpeechRecognizer: 语音识别器实例
         """
         if provider.lower() == 'aliyun':
             from ..ali.speech_recognition import AliyunSpeechRecognizer
-            return AliyunSpeechRecognizer(do_on_sentence_end)
+            return AliyunSpeechRecognizer(do_on_sentence_end, do_on_result_chg)
         # 在这里添加其他提供商的支持
         else:
             raise ValueError(f"不支持的语音识别提供商: {provider}") 
\ No newline at end of file
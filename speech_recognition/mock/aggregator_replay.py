@@ -0,0 +1,101 @@
+import argparse
+import json
+import sys
+import threading
+import time
+
+from ..base.sentence_aggregator import SentenceAggregator
+
+# 内置场景，时间以silence_gap的一半为单位：(时间, 事件, 文本)，end为句子结束，partial为中间结果
+SCENARIOS = [
+    ("间隔内的句子合并", [(0, "end", "我想问一下"), (1, "end", "Python的GIL是什么")],
+     ["我想问一下Python的GIL是什么"]),
+    ("超过间隔分开输出", [(0, "end", "先说第一件事"), (4, "end", "再说第二件事")],
+     ["先说第一件事", "再说第二件事"]),
+    ("疑问结尾立即输出", [(0, "end", "什么是GIL？"), (1, "end", "展开讲讲")],
+     ["什么是GIL？", "展开讲讲"]),
+    ("中间结果推迟输出", [(0, "end", "我想问"), (1.5, "partial", "数据"), (3, "partial", "数据库"),
+                          (4, "end", "数据库索引的原理")],
+     ["我想问数据库索引的原理"]),
+    ("最多等待max_wait", [(0, "end", "一直在说")] + [(t, "partial", "…") for t in range(1, 10)],
+     ["一直在说"]),
+]
+
+
+def replay(events, unit, silence_gap, max_wait, max_chars=200):
+    """
+    按时间顺序把事件送入聚合器，返回[(输出时间, 合并后的句子)]
+    Args:
+        events: [(时间, 事件, 文本)]，时间乘以unit为秒
+        unit: 时间单位（秒）
+    """
+    outputs = []
+    start = time.time()
+    aggregator = SentenceAggregator(lambda text: outputs.append((time.time() - start, text)),
+                                    silence_gap=silence_gap, max_wait=max_wait, max_chars=max_chars)
+    for at, kind, text in events:
+        time.sleep(max(0.0, start + at * unit - time.time()))
+        if kind == "end":
+            aggregator.on_sentence_end(text)
+        else:
+            aggregator.on_result_changed(text)
+    time.sleep(max_wait + silence_gap)
+    aggregator.flush()
+    return outputs
+
+
+def check_stale_timer(silence_gap):
+    """定时器已经触发、在等锁时又来了一句：旧定时器不能把新的一句提前输出"""
+    outputs = []
+    aggregator = SentenceAggregator(outputs.append, silence_gap=silence_gap, max_wait=silence_gap * 10)
+    # 换成可重入锁，测试线程持有锁时也能送入句子
+    aggregator._lock = threading.RLock()
+    aggregator.on_sentence_end("第一句")
+    with aggregator._lock:
+        # 等定时器到期，它在等锁
+        time.sleep(silence_gap * 1.5)
+        aggregator.on_sentence_end("接着说")
+    time.sleep(silence_gap * 0.3)
+    early = list(outputs)
+    time.sleep(silence_gap * 1.5)
+    return early, list(outputs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="按时间回放识别事件，检查句子聚合的合并和输出规则")
+    parser.add_argument("replay", nargs="?", help="回放文件，JSONL，每行 {\"at\": 秒, \"type\": \"end\"或\"partial\", "
+                                                  "\"text\": \"...\"}；不指定时运行内置场景")
+    parser.add_argument("--silence-gap", type=float, default=0.2)
+    parser.add_argument("--max-wait", type=float, default=0.6)
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        with open(args.replay, encoding="utf-8") as f:
+            events = [(e["at"], e["type"], e.get("text", "")) for e in map(json.loads, f) if e]
+        for at, text in replay(events, 1.0, args.silence_gap, args.max_wait):
+            print(f"{at:8.3f}秒  {text}")
+        return 0
+
+    unit = args.silence_gap / 2
+    failures = 0
+    for name, events, expected in SCENARIOS:
+        outputs = replay(events, unit, args.silence_gap, args.max_wait)
+        texts = [text for _, text in outputs]
+        ok = texts == expected
+        if ok and name == "疑问结尾立即输出":
+            ok = outputs[0][0] < unit
+        if ok and name == "最多等待max_wait":
+            ok = abs(outputs[0][0] - args.max_wait) < unit
+        failures += 0 if ok else 1
+        print(f"{'通过' if ok else '失败'}: {name} {[(round(at, 2), text) for at, text in outputs]}")
+
+    early, final = check_stale_timer(args.silence_gap)
+    ok = early == [] and final == ["第一句接着说"]
+    failures += 0 if ok else 1
+    print(f"{'通过' if ok else '失败'}: 过期的定时器不提前输出 旧定时器处理后{early}，最终{final}")
+    print(f"失败{failures}项")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import argparse
+import math
+import os
+import sys
+import tempfile
+import threading
+import wave
+
+from .nls_gateway import MockNlsGateway
+from ..ali.batch_transcription import CHUNK_MS, transcribe_file, transcribe_files
+
+
+def write_wav(path, sample_rate, seconds):
+    """写入一段16bit单声道的静音wav"""
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(b"\0" * int(sample_rate * 2 * seconds))
+
+
+def _open_fds():
+    """当前进程打开的文件描述符数，mmap会占用一个"""
+    return len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else None
+
+
+def _start(gateway):
+    threading.Thread(target=gateway.serve_forever, daemon=True).start()
+    return gateway
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="用本地模拟的websocket网关检查批量离线转写")
+    parser.add_argument("--seconds", type=float, default=5.3, help="每个测试文件的时长")
+    parser.add_argument("--sentence-ms", type=int, default=2000, help="模拟网关每句话的音频时长（毫秒）")
+    args = parser.parse_args(argv)
+
+    failures = []
+
+    def check(condition, message):
+        print(f"{'通过' if condition else '失败'}: {message}")
+        if not condition:
+            failures.append(message)
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = {}
+        for sample_rate in (8000, 16000):
+            files[sample_rate] = os.path.join(directory, f"audio_{sample_rate}.wav")
+            write_wav(files[sample_rate], sample_rate, args.seconds)
+        pcm_path = os.path.join(directory, "audio.pcm")
+        with open(pcm_path, "wb") as f:
+            f.write(b"\0" * int(16000 * 2 * args.seconds))
+        files["pcm"] = pcm_path
+
+        gateway = _start(MockNlsGateway(("127.0.0.1", 0), sentence_ms=args.sentence_ms))
+        output = os.path.join(directory, "transcripts.jsonl")
+        try:
+            summary = transcribe_files(list(files.values()), "mock-token", "mock-appkey", output=output,
+                                       max_workers=3, url=gateway.url, timeout=10)
+        finally:
+            gateway.shutdown()
+            gateway.server_close()
+        print(f"转写统计: {summary}")
+        check(summary["files"] == 3 and summary["failed"] == 0, "三个文件都转写成功")
+        with open(output, encoding="utf-8") as f:
+            check(sum(1 for _ in f) == 3, "结果文件每个文件一行")
+        expected_sentences = math.ceil(args.seconds * 1000 / args.sentence_ms)
+        for session in gateway.sessions:
+            sample_rate = session["sample_rate"]
+            chunk_bytes = sample_rate * 2 * CHUNK_MS // 1000
+            chunks = session["chunks"]
+            check(all(size == chunk_bytes for size in chunks[:-1]) and 0 < chunks[-1] <= chunk_bytes,
+                  f"{sample_rate}Hz的音频按{CHUNK_MS}ms一块发送（{chunk_bytes}字节，共{len(chunks)}块）")
+            check(sum(chunks) == int(sample_rate * 2 * args.seconds), f"{sample_rate}Hz的音频全部发送")
+            check(session["sentences"] == expected_sentences, f"{sample_rate}Hz的音频识别出{expected_sentences}句")
+
+        # 网关在发送中途断开：返回错误记录，音频文件的mmap随文件一起关闭
+        gateway = _start(MockNlsGateway(("127.0.0.1", 0), drop_after=5))
+        fds = _open_fds()
+        try:
+            record = transcribe_file(files[16000], "mock-token", "mock-appkey", url=gateway.url, timeout=5)
+        finally:
+            gateway.shutdown()
+            gateway.server_close()
+        check("error" in record, f"连接中断时返回错误: {record.get('error')}")
+        if fds is not None:
+            check(_open_fds() <= fds, "连接中断后没有遗留打开的文件")
+
+    print(f"失败{len(failures)}项")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+import argparse
+import base64
+import hashlib
+import json
+import socketserver
+import struct
+import threading
+import uuid
+
+# RFC 6455握手用的固定GUID
+_WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_OPCODE_TEXT = 0x1
+_OPCODE_BINARY = 0x2
+_OPCODE_CLOSE = 0x8
+_OPCODE_PING = 0x9
+_OPCODE_PONG = 0xA
+
+
+class MockNlsGateway(socketserver.ThreadingTCPServer):
+    """本地的阿里云智能语音websocket网关模拟服务
+
+    只实现实时转写（SpeechTranscriber）和流式文本语音合成（FlowingSpeechSynthesizer）
+    用到的指令：转写时每收到sentence_ms毫秒的音频返回一个SentenceEnd，结束时返回剩余的一句；
+    合成时每收到一段文本返回audio_ms毫秒的静音PCM。每个会话收到的音频块大小和文本都会记录下来。
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, sentence_ms=2000, audio_ms=200, drop_after=0):
+        """
+        Args:
+            address: 监听地址 (host, port)
+            sentence_ms: 转写时每句话的音频时长（毫秒）
+            audio_ms: 合成时每段文本返回的音频时长（毫秒）
+            drop_after: 转写时收到这么多块音频后直接断开连接，模拟网络中断，0表示不断开
+        """
+        super().__init__(address, _Handler)
+        self.sentence_ms = sentence_ms
+        self.audio_ms = audio_ms
+        self.drop_after = drop_after
+        self._lock = threading.Lock()
+        self.sessions = []
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"ws://{host}:{port}/ws/v1"
+
+    def add_session(self, session):
+        with self._lock:
+            self.sessions.append(session)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        if not self._handshake():
+            return
+        self.session = {"namespace": None, "sample_rate": 16000, "chunks": [], "texts": [], "sentences": 0}
+        self.server.add_session(self.session)
+        self._task_id = None
+        self._audio_bytes = 0
+        self._sentence_bytes = 0
+        self._closed = False
+        while not self._closed:
+            frame = self._read_frame()
+            if frame is None:
+                break
+            opcode, payload = frame
+            if opcode == _OPCODE_TEXT:
+                self._on_command(json.loads(payload.decode("utf-8")))
+            elif opcode == _OPCODE_BINARY:
+                self._on_audio(payload)
+            elif opcode == _OPCODE_PING:
+                self._write_frame(_OPCODE_PONG, payload)
+            elif opcode == _OPCODE_CLOSE:
+                self._write_frame(_OPCODE_CLOSE, payload[:2])
+                break
+
+    def _handshake(self) -> bool:
+        key = None
+        while True:
+            line = self.rfile.readline()
+            if not line or line in (b"\r\n", b"\n"):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            # SDK在请求头中另外带了一个固定的key，客户端按第一个校验
+            if name.strip().lower() == "sec-websocket-key" and key is None:
+                key = value.strip()
+        if not key:
+            return False
+        accept = base64.b64encode(hashlib.sha1((key + _WEBSOCKET_GUID).encode()).digest()).decode()
+        self.wfile.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                          f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        return True
+
+    def _read_exact(self, size):
+        data = self.rfile.read(size)
+        return data if len(data) == size else None
+
+    def _read_frame(self):
+        """读取一条完整的消息，返回(opcode, payload)，连接断开时返回None"""
+        message_opcode, parts = None, []
+        while True:
+            head = self._read_exact(2)
+            if head is None:
+                return None
+            fin, opcode = head[0] & 0x80, head[0] & 0x0F
+            length = head[1] & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", self._read_exact(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", self._read_exact(8))[0]
+            mask = self._read_exact(4) if head[1] & 0x80 else None
+            payload = self._read_exact(length) if length else b""
+            if payload is None:
+                return None
+            if mask:
+                repeated = (mask * (length // 4 + 1))[:length]
+                payload = (int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")).to_bytes(length, "big")
+            if opcode >= _OPCODE_CLOSE:
+                # 控制帧可以夹在分片消息中间
+                return opcode, payload
+            if opcode:
+                message_opcode = opcode
+            parts.append(payload)
+            if fin:
+                return message_opcode, b"".join(parts)
+
+    def _write_frame(self, opcode, payload):
+        length = len(payload)
+        if length < 126:
+            head = struct.pack("!BB", 0x80 | opcode, length)
+        elif length < 65536:
+            head = struct.pack("!BBH", 0x80 | opcode, 126, length)
+        else:
+            head = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+        self.wfile.write(head + payload)
+
+    def _send_event(self, name, payload=None, status=20000000):
+        event = {"header": {"namespace": self.session["namespace"], "name": name, "status": status,
+                            "message_id": uuid.uuid4().hex, "task_id": self._task_id,
+                            "status_text": "Gateway:SUCCESS:Success."},
+                 "payload": payload or {}}
+        self._write_frame(_OPCODE_TEXT, json.dumps(event, ensure_ascii=False).encode("utf-8"))
+
+    def _on_command(self, command):
+        header, payload = command.get("header", {}), command.get("payload", {})
+        name = header.get("name")
+        self.session["namespace"] = header.get("namespace")
+        self._task_id = header.get("task_id")
+        if name == "StartTranscription":
+            self.session["sample_rate"] = payload.get("sample_rate", 16000)
+            self._send_event("TranscriptionStarted", {"session_id": uuid.uuid4().hex})
+        elif name == "StopTranscription":
+            if self._sentence_bytes:
+                self._sentence_end()
+            self._send_event("TranscriptionCompleted")
+            self._close()
+        elif name == "StartSynthesis":
+            self.session["sample_rate"] = payload.get("sample_rate", 16000)
+            self._send_event("SynthesisStarted", {"session_id": uuid.uuid4().hex})
+        elif name == "RunSynthesis":
+            text = payload.get("text", "")
+            self.session["texts"].append(text)
+            self._send_event("SentenceBegin", {"index": len(self.session["texts"])})
+            self._write_frame(_OPCODE_BINARY, b"\0" * (self.session["sample_rate"] * 2 * self.server.audio_ms // 1000))
+            self._send_event("SentenceEnd", {"index": len(self.session["texts"]), "text": text})
+        elif name == "StopSynthesis":
+            self._send_event("SynthesisCompleted")
+            self._close()
+
+    def _on_audio(self, data):
+        self.session["chunks"].append(len(data))
+        if self.server.drop_after and len(self.session["chunks"]) >= self.server.drop_after:
+            self._closed = True
+            return
+        self._audio_bytes += len(data)
+        self._sentence_bytes += len(data)
+        if self._sentence_bytes >= self._bytes_per_ms() * self.server.sentence_ms:
+            self._sentence_end()
+
+    def _sentence_end(self):
+        self.session["sentences"] += 1
+        index = self.session["sentences"]
+        end = round(self._audio_bytes / self._bytes_per_ms())
+        begin = round((self._audio_bytes - self._sentence_bytes) / self._bytes_per_ms())
+        self._send_event("SentenceEnd", {"index": index, "time": end, "begin_time": begin,
+                                         "result": f"第{index}句。", "confidence": 1.0})
+        self._sentence_bytes = 0
+
+    def _bytes_per_ms(self):
+        return self.session["sample_rate"] * 2 / 1000
+
+    def _close(self):
+        self._write_frame(_OPCODE_CLOSE, struct.pack("!H", 1000))
+        self._closed = True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="启动本地的阿里云智能语音websocket网关模拟服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--sentence-ms", type=int, default=2000, help="转写时每句话的音频时长（毫秒）")
+    args = parser.parse_args(argv)
+
+    server = MockNlsGateway((args.host, args.port), sentence_ms=args.sentence_ms)
+    print(f"模拟网关已启动: {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"会话数: {len(server.sessions)}")
+
+
+if __name__ == "__main__":
+    main()
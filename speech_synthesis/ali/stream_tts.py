@@ -0,0 +1,159 @@
+import re
+import threading
+import time
+
+from config.config_loader import ConfigLoader
+from sound_capture.audio_player import AudioPlayer
+
+URL = "wss://nls-gateway-cn-shanghai.aliyuncs.com/ws/v1"
+
+# 句子边界：中英文句末标点和换行
+SENTENCE_BOUNDARY = re.compile(r"[。！？；!?;\n]|\.(?=\s)")
+
+
+class AliyunStreamAnswerReader:
+    """把LLM流式输出的回答边生成边朗读出来
+
+    LLM的token按句子边界合并后通过sendStreamInputTts送入流式语音合成，
+    on_data返回的音频经抖动缓冲区交给扬声器播放。
+    """
+
+    def __init__(self, voice="longxiaochun", sample_rate=16000, max_chars=60, prebuffer_ms=200,
+                 synthesizer_class=None):
+        """
+        Args:
+            voice: 发音人
+            sample_rate: 合成音频采样率
+            max_chars: 没有遇到句子边界时，缓存文本超过该长度也会发送
+            prebuffer_ms: 抖动缓冲区预缓冲时长
+            synthesizer_class: 流式合成类，为空时使用nls.NlsStreamInputTtsSynthesizer，本地测试时替换为模拟服务
+        """
+        config = ConfigLoader().aliyun_config
+        self.appkey = config['app_key']
+        self.url = URL
+        self.voice = voice
+        self.sample_rate = sample_rate
+        self.max_chars = max_chars
+        self.player = AudioPlayer(samplerate=sample_rate, prebuffer_ms=prebuffer_ms)
+        self.synthesizer_class = synthesizer_class
+        self.synthesizer = None
+        self._pending = ""
+        self._lock = threading.Lock()
+        self.is_running = False
+        # 延迟统计
+        self.first_token_time = None
+        self.first_audio_time = None
+
+    def on_data(self, data, *args):
+        """合成音频回调"""
+        if self.first_audio_time is None:
+            self.first_audio_time = time.time()
+        self.player.push(data)
+
+    def on_completed(self, message, *args):
+        self.player.finish()
+
+    def on_error(self, message, *args):
+        print(f"语音合成错误: {message}")
+        self.player.finish()
+
+    def on_close(self, *args):
+        self.player.finish()
+
+    def start(self):
+        """建立流式合成会话并启动播放，会话建立失败时不启动播放线程"""
+        self.first_token_time = None
+        self.first_audio_time = None
+        self._pending = ""
+        synthesizer_class = self.synthesizer_class
+        if synthesizer_class is None:
+            import nls
+            synthesizer_class = nls.NlsStreamInputTtsSynthesizer
+        self.synthesizer = synthesizer_class(
+            url=self.url,
+            token=self.get_token(),
+            appkey=self.appkey,
+            on_data=self.on_data,
+            on_completed=self.on_completed,
+            on_error=self.on_error,
+            on_close=self.on_close
+        )
+        try:
+            self.synthesizer.startStreamInputTts(voice=self.voice, aformat="pcm", sample_rate=self.sample_rate)
+        except Exception:
+            self.synthesizer.shutdown()
+            self.synthesizer = None
+            raise
+        # 还没有发送文本，不会有合成音频，会话建立后再启动播放
+        self.player.start()
+        self.is_running = True
+
+    def feed(self, text: str):
+        """送入LLM新生成的一段文本，遇到句子边界时发送给合成服务"""
+        if not text or not self.is_running:
+            return
+        with self._lock:
+            if self.first_token_time is None:
+                self.first_token_time = time.time()
+            self._pending += text
+            cut = 0
+            for match in SENTENCE_BOUNDARY.finditer(self._pending):
+                cut = match.end()
+            if not cut and len(self._pending) >= self.max_chars:
+                cut = len(self._pending)
+            if cut:
+                sentence, self._pending = self._pending[:cut], self._pending[cut:]
+                self._send(sentence)
+
+    def finish(self):
+        """回答结束，发送剩余文本，等待合成完成并播放完"""
+        if not self.is_running:
+            return
+        with self._lock:
+            if self._pending:
+                self._send(self._pending)
+                self._pending = ""
+        try:
+            self.synthesizer.stopStreamInputTts()
+        except Exception as e:
+            print(f"结束语音合成失败: {str(e)}")
+        self.is_running = False
+        # stopStreamInputTts返回时合成音频已全部送达，出错时也不再等待后续音频
+        self.player.finish()
+        if not self.player.drain():
+            print("等待语音播放完成超时")
+            self.player.stop()
+        latency = self.time_to_first_audio()
+        if latency is not None:
+            print(f"首个token到首段音频耗时: {latency:.3f}秒")
+
+    def stop(self):
+        """立即停止合成和播放"""
+        self.is_running = False
+        if self.synthesizer:
+            try:
+                self.synthesizer.shutdown()
+            except Exception as e:
+                print(f"关闭语音合成失败: {str(e)}")
+        self.player.stop()
+
+    def time_to_first_audio(self):
+        """从收到第一个LLM token到收到第一段合成音频的耗时（秒）"""
+        if self.first_token_time is None or self.first_audio_time is None:
+            return None
+        return self.first_audio_time - self.first_token_time
+
+    def _send(self, sentence):
+        sentence = sentence.strip()
+        if not sentence:
+            return
+        try:
+            self.synthesizer.sendStreamInputTts(sentence)
+        except Exception as e:
+            print(f"发送合成文本失败: {str(e)}")
+            self.is_running = False
+
+    def get_token(self):
+        """获取访问令牌"""
+        from speech_recognition.ali import tokens
+        return tokens.get_token()
@@ -0,0 +1,173 @@
+import argparse
+import statistics
+import sys
+import threading
+import time
+
+from config.config_loader import ConfigLoader
+from sound_capture.audio_player import AudioPlayer
+from speech_synthesis.ali.stream_tts import AliyunStreamAnswerReader
+
+ANSWER = ("GIL是CPython的全局解释器锁，同一时刻只允许一个线程执行Python字节码。"
+          "它简化了内存管理，但让CPU密集的多线程程序无法利用多核。"
+          "IO密集的任务在等待时会释放GIL，所以多线程仍然有效。"
+          "CPU密集的任务可以改用多进程，或者把计算放到释放GIL的C扩展里。")
+
+
+class LocalStreamInputTtsSynthesizer:
+    """本地模拟的流式语音合成，接口与nls.NlsStreamInputTtsSynthesizer一致
+
+    每收到一段文本，等待first_packet_delay后按每字chars_ms毫秒的语音时长返回静音PCM，
+    音频按chunk_ms分块、以realtime_factor倍速送达，模拟服务端边合成边下发。
+    """
+
+    def __init__(self, url=None, token=None, appkey=None, on_data=None, on_completed=None, on_error=None,
+                 on_close=None, first_packet_delay=0.3, chars_ms=200, chunk_ms=100, realtime_factor=4.0):
+        self.on_data = on_data
+        self.on_completed = on_completed
+        self.on_close = on_close
+        self.first_packet_delay = first_packet_delay
+        self.chars_ms = chars_ms
+        self.chunk_ms = chunk_ms
+        self.realtime_factor = realtime_factor
+        self.sample_rate = 16000
+        self._queue = []
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._worker = None
+
+    def startStreamInputTts(self, voice=None, aformat="pcm", sample_rate=16000, **kwargs):
+        self.sample_rate = sample_rate
+        self._worker = threading.Thread(target=self._synthesize, daemon=True)
+        self._worker.start()
+
+    def sendStreamInputTts(self, text):
+        with self._cond:
+            self._queue.append(text)
+            self._cond.notify()
+
+    def stopStreamInputTts(self):
+        """与SDK一致，等待已发送的文本合成完成后返回"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._worker.join()
+
+    def shutdown(self):
+        with self._cond:
+            self._queue.clear()
+            self._stopped = True
+            self._cond.notify()
+
+    def _synthesize(self):
+        chunk_bytes = self.sample_rate * 2 * self.chunk_ms // 1000
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopped:
+                    self._cond.wait()
+                if not self._queue:
+                    break
+                text = self._queue.pop(0)
+            time.sleep(self.first_packet_delay)
+            total = self.sample_rate * 2 * self.chars_ms * len(text) // 1000
+            for _ in range(0, total, chunk_bytes):
+                self.on_data(b"\0" * chunk_bytes)
+                time.sleep(self.chunk_ms / 1000 / self.realtime_factor)
+        if self.on_completed:
+            self.on_completed("{}")
+        if self.on_close:
+            self.on_close()
+
+
+class SimulatedPlayer(AudioPlayer):
+    """不打开扬声器，按音频时长除以speed等待，模拟实时播放"""
+
+    def __init__(self, speed=1.0, **kwargs):
+        super().__init__(**kwargs)
+        self.speed = speed
+
+    def _playing_worker(self):
+        try:
+            while self.is_playing:
+                data = self.buffer.pop(self.block_bytes, timeout=0.5)
+                if data is None:
+                    break
+                if not data:
+                    continue
+                if self.first_play_time is None:
+                    self.first_play_time = time.time()
+                time.sleep(len(data) / (self.samplerate * self.channels * 2) / self.speed)
+        finally:
+            self.is_playing = False
+
+
+class LocalAnswerReader(AliyunStreamAnswerReader):
+    """连接本地模拟合成服务的朗读器"""
+
+    def __init__(self, first_packet_delay=0.3, playback_speed=1.0, **kwargs):
+        def synthesizer_class(**callbacks):
+            return LocalStreamInputTtsSynthesizer(first_packet_delay=first_packet_delay, **callbacks)
+        super().__init__(synthesizer_class=synthesizer_class, **kwargs)
+        self.player = SimulatedPlayer(speed=playback_speed, samplerate=self.sample_rate, prebuffer_ms=200)
+
+    def get_token(self):
+        return "local"
+
+
+def read_answer(reader, answer, token_interval, whole_answer=False):
+    """
+    按LLM的输出速度逐字送入回答并朗读
+    Args:
+        reader: 朗读器
+        answer: 回答文本
+        token_interval: 每个字的间隔（秒）
+        whole_answer: 为True时回答生成完后一次性送入，对照边生成边朗读的效果
+    Returns:
+        (首个token到首段音频耗时, 首个token到首次播放耗时, finish返回时是否已播放完)
+    """
+    reader.start()
+    first_token = time.time()
+    if whole_answer:
+        time.sleep(token_interval * len(answer))
+        reader.feed(answer)
+        # 以回答开始生成的时间为起点
+        reader.first_token_time = first_token
+    else:
+        for char in answer:
+            reader.feed(char)
+            time.sleep(token_interval)
+    reader.finish()
+    drained = not reader.player.playing_thread.is_alive()
+    return reader.time_to_first_audio(), reader.player.first_play_time - first_token, drained
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="用本地模拟的流式合成服务测量回答朗读的首段音频延迟")
+    parser.add_argument("--runs", type=int, default=3, help="每种方式测量的次数，取中位数")
+    parser.add_argument("--token-interval", type=float, default=0.03, help="LLM每个字的输出间隔（秒）")
+    parser.add_argument("--first-packet-delay", type=float, default=0.3, help="合成服务的首包延迟（秒）")
+    parser.add_argument("--playback-speed", type=float, default=4.0, help="模拟播放的倍速，只影响等待播放完的时间")
+    args = parser.parse_args(argv)
+
+    # 本地测试不需要阿里云配置，没有加载配置文件时使用默认配置
+    loader = ConfigLoader.__new__(ConfigLoader)
+    if loader._config is None:
+        loader._config = loader._get_default_config()
+    failures = 0
+    for name, whole_answer in (("整段朗读", True), ("边生成边朗读", False)):
+        results = []
+        for _ in range(args.runs):
+            reader = LocalAnswerReader(first_packet_delay=args.first_packet_delay,
+                                       playback_speed=args.playback_speed)
+            results.append(read_answer(reader, ANSWER, args.token_interval, whole_answer))
+        first_audio = statistics.median(result[0] for result in results)
+        first_play = statistics.median(result[1] for result in results)
+        drained = all(result[2] for result in results)
+        failures += 0 if drained else 1
+        print(f"{name}: 首段音频{first_audio:.3f}秒，首次播放{first_play:.3f}秒，"
+              f"finish返回时{'已' if drained else '未'}播放完")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""启动优化模块"""
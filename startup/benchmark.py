@@ -0,0 +1,94 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+# 仓库根目录，子进程在这里运行，保证和直接运行main.py时的导入路径一致
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# main.py在环境变量STARTUP_BENCHMARK非空时输出这一行后退出
+WINDOW_MARKER = "TIME_TO_WINDOW="
+
+
+def import_times(module="main", python=sys.executable):
+    """
+    用 -X importtime 导入模块，解析每个模块的导入耗时
+    Args:
+        module: 要导入的模块，默认为main.py（只导入，不会创建窗口）
+        python: Python解释器路径
+    Returns:
+        [(模块名, 自身耗时秒, 累计耗时秒)]，按导入完成的顺序
+    """
+    result = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                            capture_output=True, text=True, encoding="utf-8", errors="replace")
+    if result.returncode != 0:
+        raise RuntimeError(f"导入{module}失败:\n{result.stderr[-2000:]}")
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            # 表头
+            continue
+        times.append((parts[2].strip(), int(parts[0]) / 1e6, int(parts[1]) / 1e6))
+    return times
+
+
+def time_to_window(python=sys.executable, timeout=60.0):
+    """
+    启动main.py，返回从启动进程到窗口显示的时间（秒）和程序自己统计的时间
+    """
+    env = dict(os.environ, STARTUP_BENCHMARK="1", PYTHONIOENCODING="utf-8")
+    start = time.perf_counter()
+    process = subprocess.Popen([python, "main.py"], cwd=ROOT, env=env, stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT, text=True, encoding="utf-8", errors="replace")
+    # 超时没有显示窗口时结束进程，读取输出的循环随之结束
+    timer = threading.Timer(timeout, process.kill)
+    timer.start()
+    try:
+        for line in process.stdout:
+            if line.startswith(WINDOW_MARKER):
+                elapsed = time.perf_counter() - start
+                return elapsed, float(line[len(WINDOW_MARKER):])
+        raise RuntimeError("main.py没有显示窗口就退出了或超时")
+    finally:
+        timer.cancel()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="测量程序启动时间：-X importtime导入耗时和窗口显示时间")
+    parser.add_argument("--module", default="main", help="统计导入耗时的模块")
+    parser.add_argument("--top", type=int, default=15, help="列出累计耗时最长的多少个模块")
+    parser.add_argument("--runs", type=int, default=5, help="测量窗口显示时间的次数，取中位数")
+    parser.add_argument("--target", type=float, default=1.0, help="窗口显示时间目标（秒），超过时返回非0")
+    parser.add_argument("--import-only", action="store_true", help="只统计导入耗时，用于没有图形界面的环境")
+    args = parser.parse_args(argv)
+
+    times = import_times(args.module)
+    total = next((cumulative for name, _, cumulative in times if name == args.module), None)
+    print(f"导入{args.module}共{len(times)}个模块，累计{total or 0:.3f}秒")
+    print(f"{'累计(秒)':>10} {'自身(秒)':>10}  模块")
+    for name, self_time, cumulative in sorted(times, key=lambda item: item[2], reverse=True)[:args.top]:
+        print(f"{cumulative:>10.3f} {self_time:>10.3f}  {name}")
+    if args.import_only:
+        return 0
+
+    results = [time_to_window() for _ in range(args.runs)]
+    wall = statistics.median(elapsed for elapsed, _ in results)
+    in_process = statistics.median(reported for _, reported in results)
+    print(f"窗口显示时间中位数: {wall:.3f}秒（程序内统计{in_process:.3f}秒），目标{args.target:.3f}秒")
+    if wall > args.target:
+        print("未达到启动时间目标")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import importlib
+import threading
+import time
+
+# 窗口显示前不需要、但第一次开始录音或截图时会用到的模块，按用到的先后顺序排列
+HEAVY_MODULES = [
+    "sound_capture.sound_capture",
+    "speech_recognition.ali.speech_recognition",
+    "openai",
+    "llm.openai.openai_client",
+    "llm.deepseek.deepseek_client",
+    "llm.router.routing_client",
+    "mss",
+    "PIL.Image",
+    "numpy",
+    "tiktoken",
+]
+
+
+class Preloader:
+    """在后台线程中依次导入较慢的模块并执行预热任务
+
+    窗口显示后再开始，点击开始录音或截图时模块已经导入，不需要再等待。
+    主线程同时导入同一个模块时会等待后台线程导入完成，不会重复导入。
+    """
+
+    def __init__(self, modules=None, tasks=None):
+        """
+        Args:
+            modules: 要导入的模块名列表，默认为HEAVY_MODULES
+            tasks: 导入完成后依次执行的预热函数，{名称: 函数}
+        """
+        self.modules = HEAVY_MODULES if modules is None else modules
+        self.tasks = tasks or {}
+        self.timings = {}
+        self.errors = {}
+        self.elapsed = None
+        self.done = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """启动后台线程"""
+        self._thread = threading.Thread(target=self._run, name="preload", daemon=True)
+        self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        """等待预加载完成，返回是否已完成"""
+        return self.done.wait(timeout)
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            for name in self.modules:
+                self._step(name, importlib.import_module, name)
+            for name, task in self.tasks.items():
+                self._step(name, task)
+        finally:
+            self.elapsed = time.perf_counter() - start
+            self.done.set()
+        slowest = sorted(self.timings.items(), key=lambda item: item[1], reverse=True)[:5]
+        print(f"后台预加载完成，用时{self.elapsed:.2f}秒，最慢: "
+              + ", ".join(f"{name} {elapsed:.2f}秒" for name, elapsed in slowest))
+
+    def _step(self, name, func, *args):
+        step_start = time.perf_counter()
+        try:
+            func(*args)
+        except Exception as e:
+            # 未安装的可选模块或预热失败不影响使用，第一次用到时会再报错
+            self.errors[name] = str(e)
+        self.timings[name] = time.perf_counter() - step_start
+
+    @property
+    def stats(self):
+        return {
+            "done": self.done.is_set(),
+            "elapsed": self.elapsed,
+            "timings": dict(self.timings),
+            "errors": dict(self.errors)
+        }
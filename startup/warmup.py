@@ -0,0 +1,127 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class WarmupResource:
+    """一个正在后台准备或已经准备好的资源"""
+
+    def __init__(self, name: str, key: Hashable = None):
+        """
+        Args:
+            name: 资源名称
+            key: 创建资源用到的设置，设置不同的资源不会交给本次录音
+        """
+        self.name = name
+        self.key = key
+        self.future = None
+        self.elapsed = None
+        self.error = None
+
+    @property
+    def state(self) -> str:
+        if not self.future.done():
+            return "pending"
+        return "failed" if self.error is not None else "ready"
+
+
+class WarmupManager:
+    """在后台并行准备开始录音时需要的资源
+
+    界面打开或设置变化时提交各资源的创建函数，它们在线程池中同时执行；
+    开始录音时用take取出与当前设置一致的资源，还没准备好时等待，
+    没有准备、设置已变化或准备失败时在调用线程中重新创建。每个资源只交给一次录音。
+    """
+
+    def __init__(self, max_workers: int = 6, on_ready: Callable[[str, WarmupResource], None] = None):
+        """
+        Args:
+            max_workers: 同时准备的资源数
+            on_ready: 每个资源准备完成（成功或失败）后的回调，参数为资源名称和资源
+        """
+        self.on_ready = on_ready
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="warmup")
+        self._resources: Dict[str, WarmupResource] = {}
+        self._lock = threading.Lock()
+        # 最近一次开始录音时每个资源的交接情况
+        self.last_handoff: Dict[str, Dict[str, Any]] = {}
+
+    def prepare(self, name: str, build: Callable[[], Any], key: Hashable = None):
+        """在后台创建资源，已经有相同设置且没有失败的资源时不重复创建"""
+        with self._lock:
+            resource = self._resources.get(name)
+            if resource is not None and resource.key == key and resource.state != "failed":
+                return
+            resource = WarmupResource(name, key)
+            self._resources[name] = resource
+            resource.future = self._executor.submit(self._build, resource, build)
+        if self.on_ready:
+            resource.future.add_done_callback(lambda future: self._notify(resource))
+
+    def take(self, name: str, build: Callable[[], Any], key: Hashable = None, timeout: Optional[float] = None):
+        """
+        取出准备好的资源
+        Args:
+            name: 资源名称
+            build: 没有可用资源时的创建函数，在调用线程中执行，异常直接抛出
+            key: 本次录音的设置
+            timeout: 等待后台准备的最长时间（秒），超时后重新创建
+        Returns:
+            资源
+        """
+        start = time.perf_counter()
+        with self._lock:
+            resource = self._resources.pop(name, None)
+        if resource is None:
+            state = "missing"
+        elif resource.key != key:
+            state = "stale"
+        else:
+            state = resource.state
+            try:
+                value = resource.future.result(timeout)
+                self._record(name, state, resource.elapsed, time.perf_counter() - start)
+                return value
+            except Exception as e:
+                print(f"后台准备{name}失败或超时，重新创建: {str(e)}")
+                state = "failed"
+        value = build()
+        self._record(name, state, None, time.perf_counter() - start)
+        return value
+
+    @property
+    def readiness(self) -> Dict[str, Dict[str, Any]]:
+        """后台资源的状态和准备用时"""
+        with self._lock:
+            resources = list(self._resources.values())
+        return {resource.name: {"state": resource.state, "elapsed": resource.elapsed, "error": resource.error}
+                for resource in resources}
+
+    def shutdown(self):
+        """丢弃未交出的资源，不等待正在进行的准备"""
+        with self._lock:
+            self._resources.clear()
+        self._executor.shutdown(wait=False)
+
+    def _build(self, resource: WarmupResource, build: Callable[[], Any]):
+        start = time.perf_counter()
+        try:
+            return build()
+        except Exception as e:
+            resource.error = str(e)
+            raise
+        finally:
+            resource.elapsed = time.perf_counter() - start
+
+    def _notify(self, resource: WarmupResource):
+        try:
+            self.on_ready(resource.name, resource)
+        except Exception as e:
+            print(f"资源准备回调出错: {str(e)}")
+
+    def _record(self, name: str, state: str, elapsed: Optional[float], waited: float):
+        """state为开始录音时资源的状态：ready已准备好，pending还在准备，
+        missing/stale/failed为没有准备、设置已变化或准备失败后在开始录音时创建"""
+        with self._lock:
+            self.last_handoff[name] = {"state": state, "build_time": elapsed, "wait": waited}
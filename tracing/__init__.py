@@ -0,0 +1 @@
+"""端到端延迟追踪"""
@@ -0,0 +1,303 @@
+import argparse
+import bisect
+import datetime
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# 一句话从采集到显示经过的阶段，按先后顺序
+STAGES = [
+    "vad",              # 语音在音频中开始 -> 服务端检测到句子开始
+    "network_send",     # 音频块采集完成 -> 发送完成（句子中最后一块）
+    "partial_result",   # 检测到句子开始 -> 第一个中间识别结果
+    "sentence_end",     # 语音在音频中结束 -> 收到句子结束事件
+    "llm_first_token",  # 识别结果交给控制器 -> 第一个可见token
+    "llm_complete",     # 识别结果交给控制器 -> 回答完成
+    "ui_render",        # 第一个token放入消息队列 -> 界面显示
+    "end_to_end",       # 语音在音频中结束 -> 第一个token显示
+]
+
+
+class Tracer:
+    """记录每句话在各阶段的耗时
+
+    每句话在被采集时分配一个关联ID，各模块用同一个ID记录阶段（span），
+    识别回调通过use()把ID传给同一线程上的下游回调。span只保存在内存中，
+    停止录音时可以导出为JSONL和Chrome trace（chrome://tracing 或 Perfetto 打开）。
+    """
+
+    def __init__(self, enabled: bool = True, max_spans: int = 20000):
+        """
+        Args:
+            enabled: 是否记录
+            max_spans: 内存中最多保留的span数
+        """
+        self.enabled = enabled
+        self._spans = deque(maxlen=max_spans)
+        # 每句话的时间锚点（如语音结束时间），用于计算跨模块的阶段
+        self._anchors = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def new_trace(self) -> str:
+        """分配一个新的关联ID"""
+        return uuid.uuid4().hex[:12]
+
+    def span(self, trace_id: Optional[str], stage: str, start: float, end: float = None, **args):
+        """记录一个阶段，start、end为time.time()，end为空时为当前时间"""
+        if not self.enabled or not trace_id or start is None:
+            return
+        end = time.time() if end is None else end
+        record = {"trace_id": trace_id, "stage": stage, "start": start, "end": end,
+                  "duration": max(0.0, end - start)}
+        record.update(args)
+        with self._lock:
+            self._spans.append(record)
+
+    def mark(self, trace_id: Optional[str], name: str, timestamp: float = None):
+        """记录一句话的时间锚点"""
+        if not self.enabled or not trace_id:
+            return
+        with self._lock:
+            anchors = self._anchors.setdefault(trace_id, {})
+            anchors[name] = time.time() if timestamp is None else timestamp
+            self._anchors.move_to_end(trace_id)
+            while len(self._anchors) > 256:
+                self._anchors.popitem(last=False)
+
+    def anchor(self, trace_id: Optional[str], name: str) -> Optional[float]:
+        with self._lock:
+            return self._anchors.get(trace_id, {}).get(name)
+
+    @contextmanager
+    def use(self, trace_id: Optional[str]):
+        """在with块内把trace_id设为当前线程的关联ID"""
+        previous = getattr(self._local, "trace_id", None)
+        self._local.trace_id = trace_id
+        try:
+            yield trace_id
+        finally:
+            self._local.trace_id = previous
+
+    @property
+    def current(self) -> Optional[str]:
+        """当前线程的关联ID"""
+        return getattr(self._local, "trace_id", None)
+
+    @property
+    def spans(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+            self._anchors.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return summarize(self.spans)
+
+    def export(self, directory: str = "traces") -> Optional[Dict[str, str]]:
+        """
+        把已记录的span导出为JSONL和Chrome trace文件
+        Args:
+            directory: 导出目录
+        Returns:
+            {"jsonl": 路径, "chrome": 路径}，没有span时返回None
+        """
+        spans = self.spans
+        if not spans:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        name = "trace_" + datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        jsonl_path = os.path.join(directory, name + ".jsonl")
+        chrome_path = os.path.join(directory, name + ".json")
+        with open(jsonl_path, "w", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span, ensure_ascii=False) + "\n")
+        with open(chrome_path, "w", encoding="utf-8") as f:
+            json.dump(to_chrome_trace(spans), f, ensure_ascii=False)
+        return {"jsonl": jsonl_path, "chrome": chrome_path}
+
+
+class UtteranceTracer:
+    """把一路识别流上的事件归到各句话上
+
+    识别服务的事件带有句子在音频流中的开始和结束时间（毫秒）。音频流只包含实际发送的字节，
+    按发送的字节累计每块音频在流中的结束位置，对应到这块音频最后一个发送的采样的采集时间，
+    就能得到语音实际开始、结束的时刻。
+    """
+
+    def __init__(self, tracer: Tracer, sample_rate: int = 16000):
+        """
+        Args:
+            tracer: 记录span的Tracer
+            sample_rate: 发送的16位单声道PCM的采样率
+        """
+        self.tracer = tracer
+        self.sample_rate = sample_rate
+        self.reset()
+
+    def reset(self):
+        """开始新的识别流"""
+        self.trace_id = None
+        self._begin_received = None
+        self._partial_seen = False
+        self._sends = []
+        self._stream_ms = 0.0
+        # [(块在音频流中的结束毫秒, 块最后一个发送的采样的采集时间)]
+        self._anchors = []
+
+    def on_audio_sent(self, captured_at: Optional[float], nbytes: int, skipped: int = 0):
+        """
+        一块音频发送完成
+        Args:
+            captured_at: 这块音频采集完成的时间
+            nbytes: 实际发送的字节数
+            skipped: 块末尾没有发送的字节数，不在识别服务的音频流中
+        """
+        if not self.tracer.enabled:
+            return
+        # 没有采集时间的块也占用音频流的位置
+        self._stream_ms += nbytes / 2 / self.sample_rate * 1000
+        if captured_at is None:
+            return
+        if nbytes:
+            self._anchors.append((self._stream_ms, captured_at - skipped / 2 / self.sample_rate))
+            if len(self._anchors) > 5000:
+                del self._anchors[:-5000]
+        self._sends.append((captured_at, time.time()))
+        if len(self._sends) > 1000:
+            del self._sends[:-1000]
+
+    def on_sentence_begin(self, begin_ms: Optional[float] = None) -> str:
+        """服务端检测到句子开始，分配关联ID"""
+        now = time.time()
+        self.trace_id = self.tracer.new_trace()
+        self._begin_received = now
+        self._partial_seen = False
+        self._sends = self._sends[-1:]
+        self.tracer.span(self.trace_id, "vad", self._audio_time(begin_ms), now)
+        return self.trace_id
+
+    def on_partial(self) -> Optional[str]:
+        """收到中间识别结果"""
+        if self.trace_id is None:
+            self.on_sentence_begin()
+        if not self._partial_seen:
+            self._partial_seen = True
+            self.tracer.span(self.trace_id, "partial_result", self._begin_received)
+        return self.trace_id
+
+    def on_sentence_end(self, end_ms: Optional[float] = None) -> str:
+        """收到句子结束事件，返回这句话的关联ID"""
+        now = time.time()
+        trace_id = self.trace_id or self.on_sentence_begin()
+        speech_end = self._audio_time(end_ms)
+        self.tracer.span(trace_id, "sentence_end", speech_end, now)
+        self.tracer.mark(trace_id, "speech_end", speech_end)
+        if self._sends:
+            delays = [sent - captured for captured, sent in self._sends]
+            captured, sent = self._sends[-1]
+            self.tracer.span(trace_id, "network_send", captured, sent, chunks=len(delays),
+                             avg=sum(delays) / len(delays), max=max(delays))
+        self.trace_id = None
+        return trace_id
+
+    def _audio_time(self, ms: Optional[float]) -> Optional[float]:
+        """音频流中的毫秒对应的采集时间，按包含它的那块音频换算"""
+        if not self._anchors or ms is None:
+            return None
+        # 正好在块边界上的位置属于后一块
+        i = min(bisect.bisect_right(self._anchors, (ms, math.inf)), len(self._anchors) - 1)
+        end_ms, end_time = self._anchors[i]
+        return end_time - (end_ms - ms) / 1000
+
+
+def to_chrome_trace(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """转换为Chrome trace事件格式，每句话一行"""
+    if not spans:
+        return {"traceEvents": []}
+    origin = min(span["start"] for span in spans)
+    rows = {}
+    events = []
+    for span in sorted(spans, key=lambda s: s["start"]):
+        row = rows.get(span["trace_id"])
+        if row is None:
+            row = rows[span["trace_id"]] = len(rows) + 1
+            events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": row,
+                           "args": {"name": f"utterance {span['trace_id']}"}})
+        args = {k: v for k, v in span.items() if k not in ("stage", "start", "end", "duration")}
+        events.append({"name": span["stage"], "cat": "latency", "ph": "X", "pid": 1, "tid": row,
+                       "ts": round((span["start"] - origin) * 1e6), "dur": round(span["duration"] * 1e6),
+                       "args": args})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def summarize(spans: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """按阶段统计次数和p50/p95/p99/最大耗时（秒）"""
+    durations = {}
+    for span in spans:
+        durations.setdefault(span["stage"], []).append(span["duration"])
+    order = {stage: i for i, stage in enumerate(STAGES)}
+    summary = {}
+    for stage in sorted(durations, key=lambda s: order.get(s, len(order))):
+        values = sorted(durations[stage])
+        summary[stage] = {
+            "count": len(values),
+            "p50": _percentile(values, 0.5),
+            "p95": _percentile(values, 0.95),
+            "p99": _percentile(values, 0.99),
+            "max": values[-1]
+        }
+    return summary
+
+
+def format_summary(summary: Dict[str, Dict[str, float]]) -> str:
+    lines = [f"{'阶段':<16}{'次数':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'最大(ms)':>10}"]
+    for stage, stats in summary.items():
+        lines.append(f"{stage:<16}{stats['count']:>6}" + "".join(
+            f"{stats[key] * 1000:>10.0f}" for key in ("p50", "p95", "p99", "max")))
+    return "\n".join(lines)
+
+
+def load_jsonl(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+# 全局Tracer，录音、识别、LLM和界面共用
+tracer = Tracer()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="统计导出的延迟追踪文件中各阶段的p50/p95/p99")
+    parser.add_argument("paths", nargs="+", help="导出的trace_*.jsonl文件")
+    parser.add_argument("--chrome", help="合并后另存为Chrome trace文件")
+    args = parser.parse_args(argv)
+
+    spans = []
+    for path in args.paths:
+        spans.extend(load_jsonl(path))
+    print(f"共{len({span['trace_id'] for span in spans})}句话，{len(spans)}个span")
+    print(format_summary(summarize(spans)))
+    if args.chrome:
+        with open(args.chrome, "w", encoding="utf-8") as f:
+            json.dump(to_chrome_trace(spans), f, ensure_ascii=False)
+        print(f"已保存到{args.chrome}")
+
+
+if __name__ == "__main__":
+    main()
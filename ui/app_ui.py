@@ -10,6 +10,7 @@ from ctypes import windll, wintypes
 import win32gui
 import win32con
 from screenshot.screenshot_tool import ScreenshotTool
+from tracing.tracer import tracer
 
 class InterviewAssistantUI:
     def __init__(self, root):
@@ -35,6 +36,7 @@ class InterviewAssistantUI:
         self.start_recording_callback = None
         self.stop_recording_callback = None
         self.screenshot_callback = None
+        self.settings_changed_callback = None
         
         # 状态变量
         self.is_recording = False
@@ -111,6 +113,11 @@ class InterviewAssistantUI:
         ttk.Radiobutton(model_frame, text="OpenAI", variable=self.model_var, value="openai").pack(side=tk.LEFT, padx=(0, 10))
         ttk.Radiobutton(model_frame, text="Deepseek", variable=self.model_var, value="deepseek").pack(side=tk.LEFT)
         
+        # 设置变化后在后台准备录音需要的资源
+        self._settings_timer = None
+        self.interview_type_var.trace_add("write", self._on_settings_edited)
+        self.model_var.trace_add("write", self._on_settings_edited)
+        
         # 中间区域 - 识别结果和AI回答
         middle_frame = ttk.Frame(main_frame)
         middle_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
@@ -241,11 +248,30 @@ class InterviewAssistantUI:
         self.recognition_text.delete(1.0, tk.END)
         self.ai_response_text.delete(1.0, tk.END)
     
-    def set_callbacks(self, start_recording_callback, stop_recording_callback, on_sentence_end_callback, screenshot_callback=None):
+    def set_callbacks(self, start_recording_callback, stop_recording_callback, on_sentence_end_callback, screenshot_callback=None,
+                      settings_changed_callback=None):
         self.start_recording_callback = start_recording_callback
         self.stop_recording_callback = stop_recording_callback
         self.on_sentence_end_callback = on_sentence_end_callback
         self.screenshot_callback = screenshot_callback
+        self.settings_changed_callback = settings_changed_callback
+    
+    def record_render(self, trace_id, queued_at):
+        """回答的第一个token已经显示，记录界面显示和从说完话到看到回答的延迟"""
+        tracer.span(trace_id, "ui_render", queued_at)
+        tracer.span(trace_id, "end_to_end", tracer.anchor(trace_id, "speech_end"))
+    
+    def notify_settings_changed(self):
+        """把当前的面试类型和模型交给控制器，在后台准备开始录音需要的资源"""
+        self._settings_timer = None
+        if self.settings_changed_callback and not self.is_recording:
+            self.settings_changed_callback(self.interview_type_var.get(), self.model_var.get())
+    
+    def _on_settings_edited(self, *args):
+        """面试类型或模型变化，停止输入0.8秒后再通知，避免每输入一个字就重新准备"""
+        if self._settings_timer is not None:
+            self.root.after_cancel(self._settings_timer)
+        self._settings_timer = self.root.after(800, self.notify_settings_changed)
     
     def add_recognition_text(self, text):
         text = self.add_separator(text)
@@ -262,6 +288,21 @@ class InterviewAssistantUI:
             self.ai_response_text.insert(tk.END, text + "\n")
         self.ai_response_text.see(tk.END)
     
+    def begin_ai_stream(self):
+        """开始一段流式输出的AI回答"""
+        self.ai_response_text.insert(tk.END, "==============================\n")
+        self.ai_response_text.see(tk.END)
+    
+    def append_ai_stream(self, text):
+        """追加流式回答的增量文本"""
+        self.ai_response_text.insert(tk.END, text)
+        self.ai_response_text.see(tk.END)
+    
+    def end_ai_stream(self):
+        """结束一段流式输出的AI回答"""
+        self.ai_response_text.insert(tk.END, "\n==============================\n\n\n")
+        self.ai_response_text.see(tk.END)
+    
     def show_error(self, error_message):
         messagebox.showerror("错误", error_message)
         self.status_var.set("发生错误")
@@ -278,10 +319,24 @@ class InterviewAssistantUI:
                     self.add_recognition_text(message)
                 elif message_type == "ai_result":
                     self.add_ai_response("result", message)
+                elif message_type == "ai_stream_begin":
+                    self.begin_ai_stream()
+                elif message_type == "ai_stream":
+                    self.append_ai_stream(message)
+                elif message_type == "ai_stream_end":
+                    self.end_ai_stream()
                 elif message_type == "not_interview":
                     self.add_ai_response("not_interview", "")
+                elif message_type == "trace_render":
+                    self.record_render(*message)
                 elif message_type == "screenshot_result":
                     self.add_screenshot_result(message)
+                elif message_type == "screenshot_stream_begin":
+                    self.begin_screenshot_stream()
+                elif message_type == "screenshot_stream":
+                    self.append_screenshot_stream(message)
+                elif message_type == "screenshot_stream_end":
+                    self.end_screenshot_stream()
                 elif message_type == "error":
                     self.show_error(message)
                 elif message_type == "status":
@@ -300,11 +355,11 @@ class InterviewAssistantUI:
         """启动截图过程"""
         self.screenshot_tool.take_screenshot()
     
-    def on_screenshot_taken(self, screenshot_path):
-        """截图完成后的回调函数"""
-        if screenshot_path and os.path.exists(screenshot_path):
-            # 更新UI显示截图已保存
-            self.status_var.set(f"截图已保存: {screenshot_path}")
+    def on_screenshot_taken(self, screenshot, captured_at=None):
+        """截图完成后的回调函数，screenshot为内存中的PIL图像"""
+        if screenshot is not None:
+            # 更新UI显示截图尺寸
+            self.status_var.set(f"已截图: {screenshot.size[0]}x{screenshot.size[1]}")
             
             # 显示截图
             try:
@@ -314,8 +369,8 @@ class InterviewAssistantUI:
                 for widget in self.screenshot_frame.winfo_children():
                     widget.destroy()
                 
-                # 加载图像
-                img = Image.open(screenshot_path)
+                # 缩放用于显示的副本，原图交给识别
+                img = screenshot
                 
                 # 调整图像大小以适应窗口
                 frame_width = self.screenshot_frame.winfo_width() - 10
@@ -341,9 +396,9 @@ class InterviewAssistantUI:
                 img_label.image = photo  # 保持引用
                 img_label.pack(padx=5, pady=5)
                 
-                # 添加路径标签
-                path_label = ttk.Label(self.screenshot_frame, text=f"截图路径: {screenshot_path}")
-                path_label.pack(padx=5, pady=5)
+                # 添加尺寸标签
+                size_label = ttk.Label(self.screenshot_frame, text=f"截图尺寸: {img_width}x{img_height}")
+                size_label.pack(padx=5, pady=5)
                 
                 # 调用截图分析回调函数
                 if self.screenshot_callback:
@@ -354,12 +409,12 @@ class InterviewAssistantUI:
                     # 在新线程中分析截图
                     threading.Thread(
                         target=self.screenshot_callback,
-                        args=(screenshot_path,)
+                        args=(screenshot, captured_at)
                     ).start()
                 
             except Exception as e:
                 print(f"显示截图错误: {str(e)}")
-                self.screenshot_label.config(text=f"截图已保存但无法显示: {str(e)}")
+                self.screenshot_label.config(text=f"截图无法显示: {str(e)}")
     
     def add_screenshot_result(self, text):
         """添加截图分析结果"""
@@ -367,6 +422,21 @@ class InterviewAssistantUI:
         self.screenshot_result_text.delete(1.0, tk.END)
         self.screenshot_result_text.insert(tk.END, text + "\n")
         self.screenshot_result_text.see(tk.END)
+    
+    def begin_screenshot_stream(self):
+        """开始一段流式输出的截图分析结果"""
+        self.screenshot_result_text.delete(1.0, tk.END)
+        self.screenshot_result_text.insert(tk.END, "==============================\n")
+    
+    def append_screenshot_stream(self, text):
+        """追加截图分析结果的增量文本"""
+        self.screenshot_result_text.insert(tk.END, text)
+        self.screenshot_result_text.see(tk.END)
+    
+    def end_screenshot_stream(self):
+        """结束一段流式输出的截图分析结果"""
+        self.screenshot_result_text.insert(tk.END, "\n==============================\n")
+        self.screenshot_result_text.see(tk.END)
 
 def resource_path(relative_path):
     """ 获取资源的绝对路径，用于处理PyInstaller打包后的资源路径 """
@@ -1,27 +1,148 @@
 import threading
 import time
 import os
-from sound_capture.sound_capture import AudioRecorder
+import json
+import queue
+import asyncio
 from config.config_loader import ConfigLoader
+from llm.base.image_payload import ImagePayload, estimate_image_tokens, scaled_size
+from llm.base.token_counter import TokenCounter
+from screenshot.ocr import ScreenshotOCR
+from screenshot.image_cache import ImageAnalysisCache
 from speech_recognition.factory.speech_recognizer_factory import SpeechRecognizerFactory
+from speech_recognition.base.sentence_aggregator import SentenceAggregator
 from llm.factory.llm_factory import LLMFactory
 import llm.base.functions as functions
+from llm.cache.answer_cache import AnswerCache
+from llm.base.request_tracker import RequestTracker
+from ui.dispatcher import SentenceDispatcher, OrderedMessageQueue
+from startup.warmup import WarmupManager
+from tracing.tracer import tracer, format_summary
+
+class AnswerStreamPresenter:
+    """把流式到达的函数调用参数增量展示到UI
+
+    is_interview_question或简略答案一出现就开始输出，简略答案写完后再输出详细答案，
+    同时把简略答案的增量送去朗读。
+    """
+
+    def __init__(self, ui, start_time, start_readback=None, on_visible=None, trace_id=None):
+        self.ui = ui
+        self.start_time = start_time
+        self.start_readback = start_readback
+        self.on_visible = on_visible
+        self.trace_id = trace_id
+        self.first_token_time = None
+        self.started = False
+        self.closed = False
+        self.readback_queue = None
+        self._simplified_len = 0
+        self._detailed_len = 0
+
+    def update(self, partial):
+        """收到新的部分参数"""
+        if self.closed or not isinstance(partial, dict):
+            return
+        flag = partial.get("is_interview_question")
+        simplified = partial.get("simplified_answer") or ""
+        if flag is False or not (flag or simplified):
+            return
+        self._begin()
+        self._emit_simplified(simplified)
+        # 简略答案之后已经出现了其他字段，说明简略答案已经写完
+        keys = list(partial.keys())
+        simplified_done = "simplified_answer" in partial and keys.index("simplified_answer") < len(keys) - 1
+        if simplified_done:
+            self._emit_detailed(partial.get("detailed_answer") or "")
+
+    def finish(self, simplified, detailed):
+        """函数调用完成，补齐剩余内容并结束本次输出"""
+        self._begin()
+        self._emit_simplified(simplified)
+        self._emit_detailed(detailed)
+        self.close()
+
+    def close(self):
+        """结束本次输出，可重复调用"""
+        if self.closed:
+            return
+        self.closed = True
+        if self.started:
+            self.ui.add_to_message_queue("ai_stream_end", "")
+        if self.readback_queue is not None:
+            self.readback_queue.put(None)
+
+    def _begin(self):
+        if not self.started:
+            self.started = True
+            if self.on_visible:
+                self.on_visible()
+            self.ui.add_to_message_queue("ai_stream_begin", "")
+
+    def _emit_simplified(self, simplified):
+        delta = simplified[self._simplified_len:]
+        if not delta:
+            return
+        if self.first_token_time is None:
+            self.first_token_time = time.time()
+            print(f"首个可见token耗时: {self.first_token_time - self.start_time}秒")
+        self._simplified_len = len(simplified)
+        self.ui.add_to_message_queue("ai_stream", delta)
+        if self.trace_id and self._simplified_len == len(delta):
+            # 界面处理到这条消息时第一个token已经显示，记录界面显示的延迟
+            self.ui.add_to_message_queue("trace_render", (self.trace_id, self.first_token_time))
+        if self.readback_queue is None and self.start_readback:
+            self.readback_queue = self.start_readback()
+            self.start_readback = None
+        if self.readback_queue is not None:
+            self.readback_queue.put(delta)
+
+    def _emit_detailed(self, detailed):
+        delta = detailed[self._detailed_len:]
+        if not delta:
+            return
+        if self._detailed_len == 0:
+            self.ui.add_to_message_queue("ai_stream", "\n\n\n")
+        self._detailed_len = len(detailed)
+        self.ui.add_to_message_queue("ai_stream", delta)
+
 
 class InterviewAssistantController:
     def __init__(self, ui):
         self.ui = ui
         self.audio_recorder = None
         self.recognizer = None
+        self.sentence_aggregator = None
         self.llm_client = None
         self.image_recognition_client = None
+        self.screenshot_ocr = None
+        self.screenshot_cache = None
+        # 按识别方式统计截图识别的平均延迟、首字延迟和提示词token数
+        self.screenshot_stats = {}
+        self.question_detector = None
+        self.answer_cache = None
         self.config = ConfigLoader()
+        tracer.enabled = self.config.tracing_config['enabled']
+        # 识别结果交给后台事件循环并发处理，回答按句子顺序输出
+        self.ordered_messages = OrderedMessageQueue(ui)
+        self.dispatcher = SentenceDispatcher(self.answer_sentence, max_concurrency=3,
+                                             on_dropped=self.drop_sentence)
+        # 跟踪进行中的请求，补充同一问题的新句子会取代尚未输出的旧请求
+        self.request_tracker = RequestTracker()
+        # 同一时间只朗读一个回答
+        self.tts_lock = threading.Lock()
+        # 在后台并行准备开始录音需要的资源，开始录音时直接取用
+        self.warmup = WarmupManager(on_ready=self.on_resource_ready)
+        # 最近一次录音的(面试类型, 模型)，停止后按它准备下一次录音
+        self.session_settings = None
         
         # 设置UI回调
         self.ui.set_callbacks(
             start_recording_callback=self.start_recording,
             stop_recording_callback=self.stop_recording,
             on_sentence_end_callback=self.on_sentence_end,
-            screenshot_callback=self.analyze_screenshot
+            screenshot_callback=self.analyze_screenshot,
+            settings_changed_callback=self.on_settings_changed
         )
         
         # 默认系统提示词
@@ -34,39 +155,41 @@ class InterviewAssistantController:
     
     def start_recording(self, interview_type, model_choice):
         try:
+            start_time = time.perf_counter()
             self.ui.add_to_message_queue("status", "正在初始化...")
             
-            # 初始化LLM客户端
-            if model_choice == "openai":
-                self.llm_client = LLMFactory.create_llm_client(
-                    "openai",
-                    interview_type=interview_type,
-                    model=os.getenv("OPENAI_MODEL"),
-                    system_message=self.DEFAULT_SYSTEM_PROMPT
-                )
-            else:
-                self.llm_client = LLMFactory.create_llm_client(
-                    "deepseek",
-                    interview_type=interview_type,
-                    model=os.getenv("DEEPSEEK_MODEL"),
-                    system_message=self.DEFAULT_SYSTEM_PROMPT
-                )
+            # 还没有在后台准备的资源现在并行创建，已经准备好的直接取用
+            key = (interview_type, model_choice)
+            self.prepare_session(interview_type, model_choice)
+            self.session_settings = key
+            
+            # 初始化LLM客户端并注册函数
+            self.llm_client = self.warmup.take(
+                "llm", lambda: self.create_llm_client(interview_type, model_choice), key)
+            
+            # 初始化问题预判器
+            self.init_question_detector(interview_type, model_choice)
+            
+            # 初始化答案缓存
+            self.warmup.take("answer_cache", self.init_answer_cache)
             
             # 初始化图像识别客户端
             self.init_image_recognition_client(model_choice)
             
-            # 注册函数
-            functions.register_answer_interview_question_function(self.llm_client, functions.answer_interview_question)
+            self.dispatcher.start()
             
-            # 使用工厂类创建语音识别器
-            self.recognizer = SpeechRecognizerFactory.create_recognizer('aliyun', self.on_sentence_end)
+            # 创建语音识别器，开启聚合时被拆开的句子合并后再处理
+            self.sentence_aggregator, self.recognizer = self.warmup.take("recognizer", self.create_recognizer)
             self.recognizer.start_recognition()
             
             # 录制音频
-            self.audio_recorder = AudioRecorder(self.recognizer)
+            self.audio_recorder = self.warmup.take("audio", self.create_audio_recorder)
+            self.audio_recorder.recognizer = self.recognizer
             self.audio_recorder.start_recording(30*60) # 30分钟
             
-            self.ui.add_to_message_queue("status", "正在监听录音...")
+            listening_time = time.perf_counter() - start_time
+            print(f"开始录音用时{listening_time:.2f}秒，资源准备情况: {self.warmup.last_handoff}")
+            self.ui.add_to_message_queue("status", f"正在监听录音...（准备用时{listening_time:.1f}秒）")
             
         except Exception as e:
             error_message = f"启动错误: {str(e)}"
@@ -74,20 +197,167 @@ class InterviewAssistantController:
             self.ui.add_to_message_queue("error", error_message)
             self.stop_recording()
     
+    def on_settings_changed(self, interview_type, model_choice):
+        """界面打开或面试类型、模型变化时在后台准备下一次录音需要的资源"""
+        if not self.config.startup_config['warmup'] or self.recognizer:
+            return
+        try:
+            self.prepare_session(interview_type, model_choice)
+        except Exception as e:
+            print(f"后台准备资源出错: {str(e)}")
+    
+    def prepare_session(self, interview_type=None, model_choice=None):
+        """
+        提交开始录音需要的资源，各资源在后台并行创建
+        
+        录音设备、语音识别令牌和答案缓存与设置无关，总是准备；面试类型填写后才准备LLM相关的客户端。
+        """
+        self.warmup.prepare("audio", self.create_audio_recorder)
+        self.warmup.prepare("recognizer", self.create_recognizer)
+        self.warmup.prepare("answer_cache", self.init_answer_cache)
+        if not interview_type or not interview_type.strip() or interview_type == "例如：Java后端开发工程师":
+            return
+        key = (interview_type, model_choice)
+        self.warmup.prepare("llm", lambda: self.create_llm_client(interview_type, model_choice), key)
+        if self.config.question_filter_config['enabled']:
+            self.warmup.prepare("question_detector",
+                                lambda: self.create_question_detector(interview_type, model_choice), key)
+        provider = "openai" if model_choice == "openai" else "deepseek"
+        self.warmup.prepare("image_recognition",
+                            lambda: LLMFactory.create_image_recognition_client(provider), provider)
+    
+    def on_resource_ready(self, name, resource):
+        """后台资源准备完成"""
+        if resource.error is not None:
+            print(f"后台准备{name}失败（开始录音时会重试）: {resource.error}")
+            return
+        print(f"后台准备{name}完成，用时{resource.elapsed:.2f}秒")
+        readiness = self.warmup.readiness
+        if not self.ui.is_recording and readiness and all(r["state"] == "ready" for r in readiness.values()):
+            self.ui.add_to_message_queue("status", "准备就绪，可以开始录音")
+    
+    def create_llm_client(self, interview_type, model_choice):
+        """创建回答问题的LLM客户端并注册函数，开启多后端路由时界面选择的提供商优先"""
+        if self.config.llm_routing_config['enabled']:
+            llm_client = LLMFactory.create_routing_client(
+                model_choice,
+                interview_type=interview_type,
+                system_message=self.DEFAULT_SYSTEM_PROMPT
+            )
+        elif model_choice == "openai":
+            llm_client = LLMFactory.create_llm_client(
+                "openai",
+                interview_type=interview_type,
+                model=os.getenv("OPENAI_MODEL"),
+                system_message=self.DEFAULT_SYSTEM_PROMPT
+            )
+        else:
+            llm_client = LLMFactory.create_llm_client(
+                "deepseek",
+                interview_type=interview_type,
+                model=os.getenv("DEEPSEEK_MODEL"),
+                system_message=self.DEFAULT_SYSTEM_PROMPT
+            )
+        
+        # 注册函数
+        functions.register_answer_interview_question_function(llm_client, functions.answer_interview_question)
+        return llm_client
+    
+    def create_recognizer(self):
+        """
+        创建语音识别器并提前获取访问令牌
+        
+        Returns:
+            (句子聚合器或None, 语音识别器)
+        """
+        aggregation_config = self.config.sentence_aggregation_config
+        if aggregation_config['enabled']:
+            sentence_aggregator = SentenceAggregator(
+                self.on_sentence_end,
+                silence_gap=aggregation_config['silence_gap'],
+                max_wait=aggregation_config['max_wait']
+            )
+            recognizer = SpeechRecognizerFactory.create_recognizer(
+                'aliyun',
+                sentence_aggregator.on_sentence_end,
+                sentence_aggregator.on_result_changed
+            )
+        else:
+            sentence_aggregator = None
+            recognizer = SpeechRecognizerFactory.create_recognizer('aliyun', self.on_sentence_end)
+        recognizer.prepare()
+        return sentence_aggregator, recognizer
+    
+    def create_audio_recorder(self):
+        """打开系统音频的录音设备，soundcard等录音模块在这里才导入，识别器在开始录音时设置"""
+        from sound_capture.sound_capture import AudioRecorder
+        return AudioRecorder(None)
+    
+    def init_question_detector(self, interview_type, model_choice):
+        """初始化问题预判器，只有被接受的句子才会交给回答模型"""
+        filter_config = self.config.question_filter_config
+        if not filter_config['enabled']:
+            self.question_detector = None
+            return
+        try:
+            self.question_detector = self.warmup.take(
+                "question_detector",
+                lambda: self.create_question_detector(interview_type, model_choice),
+                (interview_type, model_choice)
+            )
+        except Exception as e:
+            print(f"问题预判初始化错误: {str(e)}")
+            self.question_detector = None
+    
+    def create_question_detector(self, interview_type, model_choice):
+        """创建问题预判器，面试类型作为额外的关键词"""
+        filter_config = self.config.question_filter_config
+        keywords = list(filter_config['keywords']) + [interview_type]
+        return LLMFactory.create_question_detector(
+            filter_config['type'],
+            provider=model_choice,
+            model=filter_config['model'],
+            keywords=keywords
+        )
+    
+    def init_answer_cache(self):
+        """初始化答案缓存，同一进程内多次开始录音复用同一个缓存"""
+        cache_config = self.config.answer_cache_config
+        if not cache_config['enabled']:
+            self.answer_cache = None
+            return
+        if self.answer_cache:
+            return
+        try:
+            self.answer_cache = AnswerCache(
+                path=cache_config['path'],
+                max_entries=cache_config['max_entries'],
+                ttl=cache_config['ttl_days'] * 24 * 3600,
+                similarity=cache_config['similarity']
+            )
+            if cache_config['warmup_file']:
+                count = self.answer_cache.warm_up(cache_config['warmup_file'])
+                print(f"答案缓存预热完成，共{count}条")
+        except Exception as e:
+            print(f"答案缓存初始化错误: {str(e)}")
+            self.answer_cache = None
+    
     def init_image_recognition_client(self, model_choice):
         """初始化图像识别客户端"""
         try:
             # 尝试创建图像识别客户端
             provider = "openai" if model_choice == "openai" else "deepseek"
-            self.image_recognition_client = LLMFactory.create_image_recognition_client(provider)
+            self.image_recognition_client = self.warmup.take(
+                "image_recognition", lambda: LLMFactory.create_image_recognition_client(provider), provider)
         except Exception as e:
             error_message = f"图像识别初始化错误: {str(e)}"
             print(error_message)
             self.ui.add_to_message_queue("error", error_message)
     
-    def analyze_screenshot(self, screenshot_path):
-        """分析截图内容"""
+    def analyze_screenshot(self, screenshot, captured_at=None):
+        """分析截图内容，screenshot为内存中的PIL图像或图像文件路径"""
         try:
+            captured_at = captured_at or time.time()
             # 检查是否已初始化图像识别客户端
             if not self.image_recognition_client:
                 # 如果没有，尝试使用OpenAI初始化
@@ -103,12 +373,91 @@ class InterviewAssistantController:
                 if interview_type == "例如：Java后端开发工程师":
                     interview_type = ""
             
-            # 调用图像识别客户端分析图像
+            screenshot_config = self.config.screenshot_config
+            if isinstance(screenshot, str):
+                from PIL import Image
+                with Image.open(screenshot) as image:
+                    screenshot = image.convert("RGB")
+            
             prompt = "你是一个面试助手，给你一个面试过程中遇到的难题，请你解答。用户面试的岗位是：" + interview_type
-            result = self.image_recognition_client.analyze_image(screenshot_path, prompt)
+            
+            # 与之前的截图几乎相同时直接复用分析结果
+            fingerprint = None
+            if screenshot_config['cache']:
+                if self.screenshot_cache is None:
+                    self.screenshot_cache = ImageAnalysisCache(max_entries=screenshot_config['cache_size'],
+                                                               max_distance=screenshot_config['cache_distance'])
+                fingerprint = self.screenshot_cache.fingerprint(screenshot)
+                cached = self.screenshot_cache.get(fingerprint, prompt)
+                if cached is not None:
+                    self.ui.add_to_message_queue("screenshot_result", cached)
+                    latency = time.time() - captured_at
+                    self._record_screenshot("cache", latency, latency, 0)
+                    print(f"截图与之前的截图相同，复用分析结果，用时{latency:.2f}秒，缓存统计: {self.screenshot_cache.stats}")
+                    self.ui.add_to_message_queue("status", f"截图与之前相同，已复用分析结果（命中率{self.screenshot_cache.stats['hit_rate']:.0%}）")
+                    return
+            
+            # 文字截图先在本地识别文字，置信度足够时交给文本模型，否则使用视觉模型
+            ocr_result = None
+            if screenshot_config['ocr']:
+                if self.screenshot_ocr is None:
+                    self.screenshot_ocr = ScreenshotOCR()
+                ocr_result = self.screenshot_ocr.recognize(screenshot)
+                if ocr_result:
+                    print(f"截图文字识别: {ocr_result}")
+            use_ocr = (ocr_result is not None
+                       and ocr_result.confidence >= screenshot_config['ocr_min_confidence']
+                       and len(ocr_result.text.strip()) >= screenshot_config['ocr_min_chars'])
+            
+            # 流式分析，结果边生成边显示
+            request_time = time.time()
+            first_token_time = None
+            
+            def on_delta(text):
+                nonlocal first_token_time
+                if first_token_time is None:
+                    first_token_time = time.time()
+                    print(f"截图识别首个token耗时: {first_token_time - request_time:.2f}秒（从截图起{first_token_time - captured_at:.2f}秒）")
+                    self.ui.add_to_message_queue("screenshot_stream_begin", "")
+                self.ui.add_to_message_queue("screenshot_stream", text)
+            
+            # 视觉模型按图像计费，用于和文字识别对比
+            image_tokens = estimate_image_tokens(scaled_size(screenshot.size))
+            if use_ocr:
+                path = "ocr"
+                text_client = self.llm_client or self.image_recognition_client
+                prompt_tokens = TokenCounter().count(prompt + ocr_result.text)
+                success, result = text_client.analyze_text_stream(ocr_result.text, prompt, on_delta)
+                detail = f"文字{len(ocr_result.text)}字，约{prompt_tokens}个提示词token，按图像识别约需{image_tokens}个"
+            else:
+                path = "vision"
+                if ocr_result is not None:
+                    print(f"文字识别置信度不足，改用视觉模型: {ocr_result}")
+                # 在内存中缩放并编码一次
+                payload = ImagePayload.from_image(screenshot, screenshot_config['image_format'], screenshot_config['quality'],
+                                                  captured_at=captured_at)
+                prompt_tokens = image_tokens
+                success, result = self.image_recognition_client.analyze_image_stream(payload, prompt, on_delta)
+                print(f"截图图像: {payload.stats}")
+                detail = f"图像{len(payload.data) // 1024}KB，约{image_tokens}个token"
             
             # 将结果发送到UI
-            self.ui.add_to_message_queue("screenshot_result", result)
+            if first_token_time is None:
+                self.ui.add_to_message_queue("screenshot_result", result)
+            else:
+                self.ui.add_to_message_queue("screenshot_stream_end", "")
+            latency = time.time() - captured_at
+            ttft = first_token_time - captured_at if first_token_time else None
+            self._record_screenshot(path, latency, ttft, prompt_tokens)
+            print(f"截图识别（{path}）: {detail}，从截图到回答完成{latency:.2f}秒")
+            print(f"截图识别统计: {self.screenshot_stats}")
+            # 失败的结果不缓存，下次截图重新请求
+            if fingerprint is not None and success and result:
+                self.screenshot_cache.put(fingerprint, prompt, result)
+                print(f"截图缓存统计: {self.screenshot_cache.stats}")
+            ttft_text = f"首字{ttft:.1f}秒，" if ttft is not None else ""
+            path_text = "文字识别" if use_ocr else "图像识别"
+            self.ui.add_to_message_queue("status", f"截图{path_text}完成，{ttft_text}用时{latency:.1f}秒（{detail}）")
             
         except Exception as e:
             error_message = f"图像分析错误: {str(e)}"
@@ -116,6 +465,47 @@ class InterviewAssistantController:
             self.ui.add_to_message_queue("error", error_message)
             self.ui.add_to_message_queue("screenshot_result", f"无法分析图像: {str(e)}")
     
+    def _record_screenshot(self, path, latency, ttft, prompt_tokens):
+        """按识别方式（cache/ocr/vision）累计截图识别的延迟和提示词token数"""
+        stats = self.screenshot_stats.setdefault(path, {"count": 0, "latency": 0.0, "ttft": 0.0, "prompt_tokens": 0})
+        count = stats["count"]
+        stats["count"] = count + 1
+        stats["latency"] = (stats["latency"] * count + latency) / (count + 1)
+        if ttft is not None:
+            stats["ttft"] = (stats["ttft"] * count + ttft) / (count + 1)
+        stats["prompt_tokens"] = (stats["prompt_tokens"] * count + prompt_tokens) // (count + 1)
+    
+    def start_answer_readback(self):
+        """开始朗读一个回答，返回用于送入文本的队列（放入None表示结束）；未开启tts时返回None"""
+        tts_config = self.config.tts_config
+        if not tts_config['enabled']:
+            return None
+        text_queue = queue.Queue()
+        threading.Thread(target=self._read_answer_worker, args=(text_queue, tts_config), daemon=True).start()
+        return text_queue
+    
+    def _read_answer_worker(self, text_queue, tts_config):
+        with self.tts_lock:
+            reader = None
+            try:
+                from speech_synthesis.ali.stream_tts import AliyunStreamAnswerReader
+                reader = AliyunStreamAnswerReader(
+                    voice=tts_config['voice'],
+                    sample_rate=tts_config['sample_rate']
+                )
+                reader.start()
+                while True:
+                    text = text_queue.get()
+                    if text is None:
+                        break
+                    reader.feed(text)
+                # finish等待播放完，之后才释放tts_lock开始朗读下一个回答
+                reader.finish()
+            except Exception as e:
+                print(f"朗读回答错误: {str(e)}")
+                if reader:
+                    reader.stop()
+    
     def stop_recording(self):
         try:
             if self.audio_recorder:
@@ -126,14 +516,63 @@ class InterviewAssistantController:
                 self.recognizer.stop_recognition()
                 self.recognizer = None
             
+            if self.sentence_aggregator:
+                self.sentence_aggregator.flush()
+                print(f"句子聚合统计: {self.sentence_aggregator.stats}")
+                self.sentence_aggregator = None
+            
+            if self.question_detector:
+                print(f"问题预判统计: {self.question_detector.stats}")
+            
+            self.dispatcher.stop()
+            print(f"识别结果分发统计: {self.dispatcher.stats}")
+            print(f"回答请求统计: {self.request_tracker.stats}")
+            if self.llm_client and hasattr(self.llm_client, "usage_stats"):
+                print(f"提示词token统计: {self.llm_client.usage_stats.stats}")
+                if hasattr(self.llm_client, "backends"):
+                    print(f"LLM后端路由统计: {self.llm_client.stats}")
+                else:
+                    print(f"LLM请求重试统计: {self.llm_client.retry_policy.stats}")
+            
+            from llm.base.http_pool import timing_stats
+            print(f"LLM请求连接统计: {timing_stats.stats}")
+            from llm.base.rate_limiter import rate_limiter_stats
+            print(f"LLM请求限流统计: {rate_limiter_stats()}")
+            
+            if self.answer_cache:
+                print(f"答案缓存统计: {self.answer_cache.stats}")
+                self.answer_cache.save()
+            
+            self.export_traces()
+            
             self.ui.add_to_message_queue("status", "已停止录音")
             
+            # 为下一次录音重新准备资源
+            if self.session_settings:
+                self.on_settings_changed(*self.session_settings)
+            
         except Exception as e:
             error_message = f"停止错误: {str(e)}"
             print(error_message)
             self.ui.add_to_message_queue("error", error_message)
     
+    def export_traces(self):
+        """输出本次录音各阶段延迟的p50/p95/p99并导出追踪文件"""
+        if not tracer.spans:
+            return
+        print(f"各阶段延迟统计:\n{format_summary(tracer.summary())}")
+        export_dir = self.config.tracing_config['export_dir']
+        if export_dir:
+            try:
+                paths = tracer.export(export_dir)
+                print(f"延迟追踪已导出: {paths}")
+            except Exception as e:
+                print(f"导出延迟追踪出错: {str(e)}")
+        tracer.clear()
+    
     def on_sentence_end(self, result):
+        """识别回调，运行在SDK的websocket线程上，只做投递，不等待模型"""
+        callback_start = time.perf_counter()
         try:
             # 将识别结果添加到UI
             self.ui.add_to_message_queue("recognition", result)
@@ -142,38 +581,101 @@ class InterviewAssistantController:
             if not self.llm_client:
                 return
             
-            # 调用LLM处理结果
-            start_time = time.time()
-            response = self.llm_client.on_function_call(message=result)
-            end_time = time.time()
-            print(f"ai调用时间: {end_time - start_time}秒")
-            
-            if response[0]:  # 如果有函数名
-                try:
-                    # 将字符串转换为字典
-                    import json
-                    parameters = json.loads(response[1])
-                    
-                    result = self.llm_client.use_function(
-                        name=response[0],
-                        parameters=parameters
-                    )
-                    
-                    if not result[0]:
-                        self.ui.add_to_message_queue("not_interview", "")
-                    else:
-                        self.ui.add_to_message_queue("ai_result", str(result[1]) + "\n\n\n" + str(result[2]))
+            request = self.request_tracker.begin(result, time.time())
+            request.trace_id = tracer.current
+            channel = self.ordered_messages.open()
+            if not self.dispatcher.submit(request, channel):
+                # 录音已经停止，没有投递出去
+                self.drop_sentence(request, channel)
+                return
+            self.dispatcher.record_callback(time.perf_counter() - callback_start)
+        
+        except Exception as e:
+            error_message = f"处理识别结果错误: {str(e)}"
+            print(error_message)
+            self.ui.add_to_message_queue("error", error_message)
+    
+    def drop_sentence(self, request, channel):
+        """请求没有被处理（未投递或排队时被取消），结束请求并关闭通道，后面的回答才能按顺序输出"""
+        self.request_tracker.finish(request)
+        channel.close()
+    
+    async def answer_sentence(self, request, channel):
+        """在后台事件循环中处理一个回答请求，UI消息通过channel按提交顺序输出"""
+        answered = False
+        try:
+            # 请求在开始前已被新句子取代
+            if not request.attach(asyncio.current_task(), asyncio.get_running_loop()):
+                return
+            result = request.message
+            start_time = request.start_time
+            
+            # 预判不需要回答的句子只加入上下文，不调用回答模型
+            if self.question_detector and not await asyncio.to_thread(self.question_detector.accept, result):
+                self.llm_client.add_context(result)
+                channel.add_to_message_queue("not_interview", "")
+                return
+            
+            presenter = AnswerStreamPresenter(channel, start_time, self.start_answer_readback,
+                                              on_visible=request.mark_visible,
+                                              trace_id=request.trace_id)
+            
+            # 命中答案缓存时直接给出答案，问题只加入上下文
+            cached = self.answer_cache.get(result, self.llm_client.interview_type) if self.answer_cache else None
+            if cached:
+                print(f"命中答案缓存，耗时: {time.time() - start_time}秒")
+                self.llm_client.add_context(result)
+                presenter.finish(cached[0], cached[1])
+                answered = True
+                return
+            
+            # 调用LLM处理结果，参数流式到达时增量展示
+            try:
+                question = result
+                response = await self.llm_client.on_function_call_stream_async(message=question, on_update=presenter.update, request=request)
+                end_time = time.time()
+                print(f"ai调用时间: {end_time - start_time}秒")
+                if presenter.first_token_time:
+                    tracer.span(request.trace_id, "llm_first_token", start_time, presenter.first_token_time)
+                tracer.span(request.trace_id, "llm_complete", start_time, end_time, chunks=request.chunks)
+                
+                if response[0]:  # 如果有函数名
+                    try:
+                        # 将字符串转换为字典
+                        parameters = json.loads(response[1])
+                        
+                        result = self.llm_client.use_function(
+                            name=response[0],
+                            parameters=parameters
+                        )
                         
-                except json.JSONDecodeError as e:
-                    error_message = f"参数解析错误: {e}"
-                    print(error_message)
-                    self.ui.add_to_message_queue("error", error_message)
-                except Exception as e:
-                    error_message = f"处理错误: {e}"
-                    print(error_message)
-                    self.ui.add_to_message_queue("error", error_message)
+                        if not result[0]:
+                            presenter.close()
+                            channel.add_to_message_queue("not_interview", "")
+                        else:
+                            presenter.finish(str(result[1]), str(result[2]))
+                            answered = True
+                            if self.answer_cache:
+                                self.answer_cache.put(question, str(result[1]), str(result[2]),
+                                                      self.llm_client.interview_type)
+                            
+                    except json.JSONDecodeError as e:
+                        error_message = f"参数解析错误: {e}"
+                        print(error_message)
+                        channel.add_to_message_queue("error", error_message)
+                    except Exception as e:
+                        error_message = f"处理错误: {e}"
+                        print(error_message)
+                        channel.add_to_message_queue("error", error_message)
+            finally:
+                presenter.close()
         
         except Exception as e:
             error_message = f"处理识别结果错误: {str(e)}"
             print(error_message)
-            self.ui.add_to_message_queue("error", error_message) 
\ No newline at end of file
+            channel.add_to_message_queue("error", error_message)
+        finally:
+            if request.cancelled:
+                print(f"请求已被新句子取代，丢弃{request.chunks}个响应块")
+            self.request_tracker.finish(request, answered)
+            channel.close()
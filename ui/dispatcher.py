@@ -0,0 +1,204 @@
+import asyncio
+import threading
+import time
+
+
+class OrderedMessageChannel:
+    """一个请求的UI消息通道，接口与InterviewAssistantUI.add_to_message_queue相同"""
+
+    def __init__(self, queue, seq):
+        self.queue = queue
+        self.seq = seq
+
+    def add_to_message_queue(self, message_type, message):
+        self.queue.put(self.seq, message_type, message)
+
+    def close(self):
+        self.queue.close(self.seq)
+
+
+class OrderedMessageQueue:
+    """按提交顺序把并发请求的UI消息转发给界面
+
+    最早的未完成请求的消息直接转发，后面请求的消息先缓存，
+    前面的请求全部完成后再依次放出，回答不会交错出现。
+    """
+
+    def __init__(self, ui):
+        self.ui = ui
+        self._lock = threading.Lock()
+        self._next_seq = 0
+        self._head = 0
+        self._buffers = {}
+        self._closed = set()
+
+    def open(self) -> OrderedMessageChannel:
+        """为一个新请求分配通道，必须按提交顺序调用"""
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._buffers[seq] = []
+        return OrderedMessageChannel(self, seq)
+
+    def put(self, seq, message_type, message):
+        with self._lock:
+            if seq == self._head:
+                self.ui.add_to_message_queue(message_type, message)
+            elif seq in self._buffers:
+                self._buffers[seq].append((message_type, message))
+
+    def close(self, seq):
+        """请求结束，可重复调用"""
+        with self._lock:
+            if seq < self._head:
+                return
+            self._closed.add(seq)
+            while self._head in self._closed:
+                self._closed.discard(self._head)
+                self._buffers.pop(self._head, None)
+                self._head += 1
+                for message_type, message in self._buffers.get(self._head, ()):
+                    self.ui.add_to_message_queue(message_type, message)
+                if self._head in self._buffers:
+                    self._buffers[self._head] = []
+
+
+class SentenceDispatcher:
+    """把识别结果从SDK回调线程转交给后台事件循环处理
+
+    NLS SDK的回调运行在websocket读循环线程上，回调阻塞期间识别结果无法送达。
+    submit只把任务投递到事件循环后立即返回，最多max_concurrency个问题同时请求模型。
+    """
+
+    def __init__(self, handler, max_concurrency=3, on_dropped=None):
+        """
+        Args:
+            handler: 协程函数，以submit的参数调用
+            max_concurrency: 同时处理的最大请求数
+            on_dropped: 已投递的任务在handler开始前被取消（停止时超时）时以submit的参数调用，用于释放任务占用的资源
+        """
+        self.handler = handler
+        self.max_concurrency = max_concurrency
+        self.on_dropped = on_dropped
+        self.loop = None
+        self.thread = None
+        self._semaphore = None
+        self._tasks = set()
+        self._lock = threading.Lock()
+        # 统计
+        self.submitted = 0
+        self.started = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.queue_delay_total = 0.0
+        self.callback_count = 0
+        self.callback_time_total = 0.0
+        self.callback_time_max = 0.0
+        self.busy_callback_count = 0
+        self.busy_callback_time_max = 0.0
+
+    def start(self):
+        """启动事件循环线程"""
+        if self.loop and not self.loop.is_closed():
+            return
+        # 上一次stop的事件循环可能还在等待剩余任务，新会话使用新的事件循环
+        self.loop = asyncio.new_event_loop()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._tasks = set()
+        self.thread = threading.Thread(target=self._run_loop, args=(self.loop,), daemon=True)
+        self.thread.start()
+
+    def submit(self, *args) -> bool:
+        """
+        投递一个任务，立即返回
+        Returns:
+            bool: 是否已投递，事件循环没有运行时返回False，任务不会执行，由调用方释放资源
+        """
+        with self._lock:
+            # 与stop互斥，投递的任务总是排在关闭之前
+            if not self.loop or self.loop.is_closed():
+                return False
+            self.submitted += 1
+            self.loop.call_soon_threadsafe(self._spawn, args, time.perf_counter())
+        return True
+
+    def record_callback(self, elapsed):
+        """记录一次识别回调占用SDK线程的时间，区分是否有请求正在进行"""
+        with self._lock:
+            self.callback_count += 1
+            self.callback_time_total += elapsed
+            self.callback_time_max = max(self.callback_time_max, elapsed)
+            if self.in_flight:
+                self.busy_callback_count += 1
+                self.busy_callback_time_max = max(self.busy_callback_time_max, elapsed)
+
+    def stop(self, timeout=30):
+        """不再接收新任务，已提交的任务完成（或超时取消）后关闭事件循环，不阻塞调用线程"""
+        with self._lock:
+            loop = self.loop
+            if not loop or loop.is_closed():
+                return
+            self.loop = None
+            asyncio.run_coroutine_threadsafe(self._shutdown(loop, self._tasks, timeout), loop)
+
+    @property
+    def stats(self):
+        with self._lock:
+            started = self.started
+            return {
+                "submitted": self.submitted,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "avg_queue_delay": self.queue_delay_total / started if started else 0.0,
+                "avg_callback_time": self.callback_time_total / self.callback_count if self.callback_count else 0.0,
+                "max_callback_time": self.callback_time_max,
+                "callbacks_while_busy": self.busy_callback_count,
+                "max_callback_time_while_busy": self.busy_callback_time_max
+            }
+
+    def _run_loop(self, loop):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def _spawn(self, args, submitted_at):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        tasks = self._tasks
+        task = asyncio.get_running_loop().create_task(self._run(args, submitted_at))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    async def _run(self, args, submitted_at):
+        started = False
+        try:
+            async with self._semaphore:
+                started = True
+                with self._lock:
+                    self.started += 1
+                    self.queue_delay_total += time.perf_counter() - submitted_at
+                await self.handler(*args)
+        except asyncio.CancelledError:
+            # 还在排队时被取消，handler没有机会释放资源
+            if not started and self.on_dropped:
+                try:
+                    self.on_dropped(*args)
+                except Exception as e:
+                    print(f"释放未处理的识别结果任务出错: {str(e)}")
+        except Exception as e:
+            print(f"处理识别结果任务出错: {str(e)}")
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    async def _shutdown(self, loop, tasks, timeout):
+        if tasks:
+            done, pending = await asyncio.wait(list(tasks), timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+        loop.stop()
@@ -0,0 +1,4 @@
+import re
+
+# 以问号或句末疑问语气词结尾时认为问题已经说完
+QUESTION_END = re.compile(r"([？?]|[吗呢吧][。！.!]?)\s*$")